@@ -41,20 +41,32 @@ echo "6️⃣ Iniciando aplicação..."
 docker-compose up -d web
 
 echo ""
-echo "7️⃣ Aplicando migrations..."
+echo "7️⃣ Removendo migration de IPs permitidos gerada localmente (versões antigas deste script)..."
+# As tabelas de IPs permitidos / sistema da OLT vêm na migration 0023 do repositório.
+# Onde a migration local já foi aplicada as tabelas e o ClienteFibraIxc.is_active existem:
+# a 0015 (is_active) e a 0023 são só registradas (--fake).
 sleep 10
-docker-compose exec web python manage.py migrate
-
-echo ""
-echo "8️⃣ Criando migration para IPs permitidos..."
-docker-compose exec web python manage.py makemigrations olt --name add_allowed_ip_model
+if ls olt/migrations/*_add_allowed_ip_model.py >/dev/null 2>&1; then
+    rm -f olt/migrations/*_add_allowed_ip_model.py
+    REMOVED=$(docker-compose exec -T web python manage.py shell -c "
+from django.db import connection
+with connection.cursor() as cursor:
+    cursor.execute(\"DELETE FROM django_migrations WHERE app = 'olt' AND name LIKE '%_add_allowed_ip_model'\")
+    print(cursor.rowcount)
+" | tail -n 1 | tr -d '\r')
+    if [ "${REMOVED:-0}" -gt 0 ]; then
+        docker-compose exec web python manage.py migrate olt 0015 --fake
+        docker-compose exec web python manage.py migrate olt 0022
+        docker-compose exec web python manage.py migrate olt 0023 --fake
+    fi
+fi
 
 echo ""
-echo "9️⃣ Aplicando nova migration..."
+echo "8️⃣ Aplicando migrations..."
 docker-compose exec web python manage.py migrate
 
 echo ""
-echo "🔟 Importando IPs permitidos..."
+echo "9️⃣ Importando IPs permitidos..."
 docker-compose exec web python manage.py import_allowed_ips
 
 echo ""
@@ -3,9 +3,8 @@ Middleware para controle de acesso por IP.
 Este middleware verifica se o IP do cliente está na lista de IPs permitidos.
 """
 from django.http import HttpResponseForbidden
-from django.conf import settings
-from django.core.cache import cache
-import ipaddress
+
+from olt.ip_utils import get_allowed_ips_matcher
 
 
 class IPWhitelistMiddleware:
@@ -53,83 +52,23 @@ class IPWhitelistMiddleware:
             if ip_list:
                 # Pega o primeiro IP da lista (IP original do cliente)
                 ip = ip_list.split(',')[0].strip()
-                print(f'IP original do cliente: {ip}')
                 if ip and ip != 'unknown':
                     return ip
         
         # Fallback para REMOTE_ADDR
         return request.META.get('REMOTE_ADDR', '')
 
-    def get_allowed_ips(self):
-        """
-        Obtém a lista de IPs permitidos do banco de dados com cache.
-        Fallback para settings.ALLOWED_IPS se não houver IPs no banco.
-        """
-        # Verifica o cache primeiro (cache por 5 minutos)
-        cached_ips = cache.get('allowed_ips_list')
-        if cached_ips is not None:
-            return cached_ips
-        
-        try:
-            # Importa aqui para evitar problemas de circular import
-            from django.apps import apps
-            
-            # Verifica se a app e modelo existem (evita erros durante migrations)
-            if apps.ready:
-                AllowedIP = apps.get_model('olt', 'AllowedIP')
-                
-                # Busca IPs ativos do banco de dados
-                db_ips = list(AllowedIP.objects.filter(is_active=True).values_list('ip_address', flat=True))
-                
-                if db_ips:
-                    # Cache por 5 minutos
-                    cache.set('allowed_ips_list', db_ips, 300)
-                    return db_ips
-                else:
-                    # Fallback para settings se não há IPs no banco
-                    settings_ips = getattr(settings, 'ALLOWED_IPS', [])
-                    cache.set('allowed_ips_list', settings_ips, 300)
-                    return settings_ips
-            else:
-                # Durante inicialização, usa settings
-                settings_ips = getattr(settings, 'ALLOWED_IPS', [])
-                return settings_ips
-                
-        except Exception as e:
-            # Em caso de erro (ex: tabela não existe ainda), usa settings
-            settings_ips = getattr(settings, 'ALLOWED_IPS', [])
-            return settings_ips
-
     def is_ip_allowed(self, request):
         """
         Verifica se o IP do cliente está na lista de IPs permitidos.
         Suporta IPs individuais e ranges (CIDR).
         """
-        client_ip = self.get_client_ip(request)
-        allowed_ips = self.get_allowed_ips()
-        
+        # Matcher em memória no processo, invalidado via Redis (ver olt.ip_utils.AllowedIPsCache)
+        matcher = get_allowed_ips_matcher()
+
         # Se não há IPs configurados, permite acesso (para evitar lockout)
-        if not allowed_ips:
+        if matcher.empty:
             return True
-            
-        try:
-            client_ip_obj = ipaddress.ip_address(client_ip)
-            
-            for allowed_ip in allowed_ips:
-                try:
-                    # Tenta como um IP individual primeiro
-                    if ipaddress.ip_address(allowed_ip) == client_ip_obj:
-                        return True
-                except ValueError:
-                    try:
-                        # Tenta como uma rede/range CIDR
-                        if client_ip_obj in ipaddress.ip_network(allowed_ip, strict=False):
-                            return True
-                    except ValueError:
-                        # IP inválido na configuração, ignora
-                        continue
-        except ValueError:
-            # IP do cliente inválido, nega acesso
-            return False
-            
-        return False
\ No newline at end of file
+
+        # IP do cliente inválido nunca casa (acesso negado)
+        return matcher.matches(self.get_client_ip(request))
@@ -1,11 +1,8 @@
 import time
-import json
 import logging
-from django.utils.deprecation import MiddlewareMixin
-from django.urls import resolve
-from django.contrib.auth.models import AnonymousUser
-from django.core.cache import cache
-from datetime import datetime, timedelta
+from olt import prometheus_views as metrics
+from olt.activity import aggregator as activity
+from olt.metrics_store import request_metrics
 
 # Configurar loggers específicos
 api_logger = logging.getLogger('olt.api_access')
@@ -13,317 +10,212 @@ security_logger = logging.getLogger('olt.security')
 performance_logger = logging.getLogger('olt.performance')
 user_activity_logger = logging.getLogger('olt.user_activity')
 
+# Requisições acima deste tempo entram no log de performance
+SLOW_REQUEST_NS = 1_000_000_000
 
-class MonitoringMiddleware(MiddlewareMixin):
-    """
-    Middleware para monitoramento de APIs, performance e segurança
-    """
-    
-    def process_request(self, request):
-        """Processar início da requisição"""
-        request.start_time = time.time()
-        request.monitoring_data = {
-            'ip_address': self.get_client_ip(request),
-            'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-            'method': request.method,
-            'path': request.path,
-            'query_params': dict(request.GET),
-        }
-        return None
-    
-    def process_response(self, request, response):
-        """Processar fim da requisição"""
-        if not hasattr(request, 'start_time'):
-            return response
-        
-        # Calcular tempo de resposta
-        response_time = time.time() - request.start_time
-        
-        # Obter informações do usuário
-        user_info = self.get_user_info(request)
-        
-        # Resolver view name
-        try:
-            resolver_match = resolve(request.path)
-            view_name = f"{resolver_match.app_name}:{resolver_match.url_name}" if resolver_match.app_name else resolver_match.url_name
-        except:
-            view_name = "unknown"
-        
-        # Dados completos do monitoramento
-        monitoring_data = {
-            **request.monitoring_data,
-            'response_time': round(response_time * 1000, 2),  # em milissegundos
-            'status_code': response.status_code,
-            'content_length': len(response.content) if hasattr(response, 'content') else 0,
-            'user': user_info,
-            'view_name': view_name,
-            'timestamp': time.time(),
-        }
-        
-        # Rastrear atividade do usuário
-        self.track_user_activity(monitoring_data)
-        
-        # Log de acesso à API
-        if request.path.startswith('/api/'):
-            self.log_api_access(monitoring_data)
-        
-        # Log de performance para requisições lentas
-        if response_time > 1.0:  # > 1 segundo
-            self.log_slow_request(monitoring_data)
-        
-        # Log de segurança para tentativas suspeitas
-        if self.is_suspicious_request(monitoring_data):
-            self.log_security_event(monitoring_data)
-        
-        return response
-    
-    def track_user_activity(self, data):
-        """Rastrear atividade do usuário para métricas"""
-        user_id = data['user'].get('id') or 'anonymous'
-        username = data['user'].get('username', 'anonymous')
-        
-        # Chave única para o usuário
-        cache_key = f"user_activity:{user_id}"
-        
-        # Obter dados existentes do cache
-        user_data = cache.get(cache_key, {
-            'user_id': user_id,
-            'username': username,
-            'first_seen': datetime.now().isoformat(),
-            'last_seen': datetime.now().isoformat(),
-            'request_count': 0,
-            'endpoints': set(),
-            'ip_addresses': set(),
-            'status_codes': [],
-            'avg_response_time': 0,
-            'total_response_time': 0
-        })
-        
-        # Atualizar dados
-        user_data['last_seen'] = datetime.now().isoformat()
-        user_data['request_count'] += 1
-        user_data['endpoints'].add(data['path'])
-        user_data['ip_addresses'].add(data['ip_address'])
-        user_data['status_codes'].append(data['status_code'])
-        user_data['total_response_time'] += data['response_time']
-        user_data['avg_response_time'] = user_data['total_response_time'] / user_data['request_count']
-        
-        # Converter sets para listas para serialização
-        if isinstance(user_data['endpoints'], set):
-            user_data['endpoints'] = list(user_data['endpoints'])
-        if isinstance(user_data['ip_addresses'], set):
-            user_data['ip_addresses'] = list(user_data['ip_addresses'])
-        
-        # Manter apenas os últimos 100 status codes
-        if len(user_data['status_codes']) > 100:
-            user_data['status_codes'] = user_data['status_codes'][-100:]
-        
-        # Salvar no cache por 1 hora
-        cache.set(cache_key, user_data, 3600)
-        
-        # Log de atividade do usuário para APIs
-        if data['path'].startswith('/api/'):
-            user_activity_logger.info(
-                f"USER_ACTIVITY: user={username} "
-                f"user_id={user_id} "
-                f"endpoint={data['path']} "
-                f"method={data['method']} "
-                f"status={data['status_code']} "
-                f"response_time={data['response_time']}ms "
-                f"ip={data['ip_address']} "
-                f"total_requests={user_data['request_count']}"
-            )
-
-
-class MonitoringMiddleware(MiddlewareMixin):
-    """
-    Middleware para monitoramento de APIs, performance e segurança
-    """
-    
-    def process_request(self, request):
-        """Processar início da requisição"""
-        request.start_time = time.time()
-        request.monitoring_data = {
-            'ip_address': self.get_client_ip(request),
-            'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-            'method': request.method,
-            'path': request.path,
-            'query_params': dict(request.GET),
-        }
-        return None
-    
-    def process_response(self, request, response):
-        """Processar fim da requisição"""
-        if not hasattr(request, 'start_time'):
-            return response
-        
-        # Calcular tempo de resposta
-        response_time = time.time() - request.start_time
-        
-        # Obter informações do usuário
-        user_info = self.get_user_info(request)
-        
-        # Resolver view name
-        try:
-            resolver_match = resolve(request.path)
-            view_name = f"{resolver_match.app_name}:{resolver_match.url_name}" if resolver_match.app_name else resolver_match.url_name
-        except:
-            view_name = "unknown"
-        
-        # Dados completos do monitoramento
-        monitoring_data = {
-            **request.monitoring_data,
-            'response_time': round(response_time * 1000, 2),  # em milissegundos
-            'status_code': response.status_code,
-            'content_length': len(response.content) if hasattr(response, 'content') else 0,
-            'user': user_info,
-            'view_name': view_name,
-            'timestamp': time.time(),
-        }
-        
-        # Log de acesso à API
-        if request.path.startswith('/api/'):
-            self.log_api_access(monitoring_data)
-        
-        # Log de performance para requisições lentas
-        if response_time > 1.0:  # > 1 segundo
-            self.log_slow_request(monitoring_data)
-        
-        # Log de segurança para tentativas suspeitas
-        if self.is_suspicious_request(monitoring_data):
-            self.log_security_event(monitoring_data)
-        
-        return response
-    
-    def get_client_ip(self, request):
-        """Obter IP real do cliente"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
+SUSPICIOUS_STATUS = frozenset({401, 403, 404, 429})
+SUSPICIOUS_AGENTS = ('bot', 'crawler', 'scanner', 'hack')
+SUSPICIOUS_PATHS = ('.php', '.asp', 'admin', 'wp-', 'phpmyadmin')
+MAX_QUERY_PARAMS = 10
+
+
+class RequestRecord:
+    """Dados de uma requisição, coletados uma única vez e usados por métricas, logs e atividade"""
+
+    __slots__ = (
+        'method', 'path', 'endpoint', 'status_code', 'duration_ns',
+        'ip_address', 'user_agent', 'query_params', 'user_id', 'username', 'is_api',
+    )
+
+    def __init__(self, request, response, duration_ns):
+        self.method = request.method
+        self.path = request.path
+        self.is_api = self.path.startswith('/api/')
+        self.status_code = response.status_code
+        self.duration_ns = duration_ns
+
+        # Rota resolvida pelo próprio handler do Django (sem um segundo resolve())
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            self.endpoint = 'unknown'
         else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-    
-    def get_user_info(self, request):
-        """Obter informações do usuário"""
-        if hasattr(request, 'user') and not isinstance(request.user, AnonymousUser):
-            return {
-                'id': request.user.id,
-                'username': request.user.username,
-                'is_staff': request.user.is_staff,
-                'is_authenticated': True
-            }
-        return {
-            'is_authenticated': False,
-            'username': 'anonymous'
-        }
-    
-    def log_api_access(self, data):
-        """Log específico para acessos à API"""
-        message = (
-            f"USER:{data['user']['username']} "
-            f"IP:{data['ip_address']} "
-            f"{data['method']} {data['path']} "
-            f"STATUS:{data['status_code']} "
-            f"TIME:{data['response_time']}ms"
-        )
-        
-        if data['query_params']:
-            message += f" PARAMS:{str(data['query_params'])}"
-        
-        api_logger.info(message)
-    
-    def log_slow_request(self, data):
-        """Log para requisições lentas"""
-        message = (
-            f"SLOW_REQUEST: {data['method']} {data['path']} "
-            f"TIME:{data['response_time']}ms "
-            f"STATUS:{data['status_code']} "
-            f"USER:{data['user']['username']} "
-            f"IP:{data['ip_address']} "
-            f"VIEW:{data['view_name']}"
-        )
-        
-        performance_logger.warning(message)
-    
-    def is_suspicious_request(self, data):
-        """Detectar requisições suspeitas"""
-        suspicious_patterns = [
-            # Status codes suspeitos
-            data['status_code'] in [401, 403, 404, 429],
-            # User agents suspeitos
-            any(pattern in data['user_agent'].lower() for pattern in ['bot', 'crawler', 'scanner', 'hack']),
-            # Paths suspeitos
-            any(pattern in data['path'].lower() for pattern in ['.php', '.asp', 'admin', 'wp-', 'phpmyadmin']),
-            # Muitos parâmetros (possível injeção)
-            len(data['query_params']) > 10,
-        ]
-        
-        return any(suspicious_patterns)
-    
-    def log_security_event(self, data):
-        """Log de eventos de segurança"""
-        message = (
-            f"SECURITY_EVENT: {data['method']} {data['path']} "
-            f"STATUS:{data['status_code']} "
-            f"IP:{data['ip_address']} "
-            f"USER_AGENT:{data['user_agent'][:100]} "
-            f"USER:{data['user']['username']}"
-        )
-        
-        if data['query_params']:
-            message += f" PARAMS:{str(data['query_params'])}"
-        
-        security_logger.warning(message)
+            self.endpoint = f"{match.app_name}:{match.url_name}" if match.app_name else match.url_name
 
+        meta = request.META
+        forwarded = meta.get('HTTP_X_FORWARDED_FOR')
+        self.ip_address = forwarded.split(',')[0].strip() if forwarded else meta.get('REMOTE_ADDR')
+        self.user_agent = meta.get('HTTP_USER_AGENT', '')
+        self.query_params = request.GET
 
-class MetricsCollectionMiddleware(MiddlewareMixin):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            self.user_id = user.id
+            self.username = user.username
+        else:
+            self.user_id = None
+            self.username = 'anonymous'
+
+    @property
+    def response_time_ms(self):
+        return round(self.duration_ns / 1_000_000, 2)
+
+    @property
+    def duration_seconds(self):
+        return self.duration_ns / 1_000_000_000
+
+
+class InstrumentationMiddleware:
     """
-    Middleware adicional para coleta de métricas agregadas
+    Middleware único de instrumentação: mede a requisição uma vez (perf_counter_ns)
+    e alimenta a partir do mesmo RequestRecord as métricas do Prometheus,
+    os logs de API/performance/segurança e a atividade dos usuários.
     """
-    
+
     def __init__(self, get_response):
         self.get_response = get_response
-        # Inicializar contadores em memória (em produção usar Redis)
-        self.metrics = {
-            'request_count': 0,
-            'error_count': 0,
-            'api_calls': 0,
-            'response_times': [],
-            'active_users': set(),
-            'user_requests': {}
-        }
-    
+
     def __call__(self, request):
-        # Incrementar contador de requisições
-        self.metrics['request_count'] += 1
-        
-        # Rastrear usuários ativos
-        if hasattr(request, 'user') and not isinstance(request.user, AnonymousUser):
-            user_key = f"{request.user.id}:{request.user.username}"
-            self.metrics['active_users'].add(user_key)
-            
-            # Contar requisições por usuário
-            if user_key not in self.metrics['user_requests']:
-                self.metrics['user_requests'][user_key] = 0
-            self.metrics['user_requests'][user_key] += 1
-        
-        if request.path.startswith('/api/'):
-            self.metrics['api_calls'] += 1
-        
-        start_time = time.time()
+        start = time.perf_counter_ns()
         response = self.get_response(request)
-        response_time = time.time() - start_time
-        
-        # Coletar métricas de resposta
-        self.metrics['response_times'].append(response_time)
-        
-        # Manter apenas os últimos 1000 tempos de resposta
-        if len(self.metrics['response_times']) > 1000:
-            self.metrics['response_times'] = self.metrics['response_times'][-1000:]
-        
-        # Contar erros
-        if response.status_code >= 400:
-            self.metrics['error_count'] += 1
-        
-        return response
\ No newline at end of file
+        duration_ns = time.perf_counter_ns() - start
+
+        try:
+            record = RequestRecord(request, response, duration_ns)
+            self.record_metrics(record)
+            self.record_logs(record)
+            if record.user_id is not None:
+                track_user_activity(record)
+        except Exception as e:
+            # A instrumentação nunca derruba a requisição
+            performance_logger.error(f"Erro na instrumentação da requisição: {str(e)}")
+
+        return response
+
+    def record_metrics(self, record):
+        # Totais e latências do processo (memória fixa)
+        request_metrics.record(
+            record.duration_seconds,
+            record.status_code,
+            record.is_api,
+            record.user_id,
+            record.username,
+        )
+
+        metrics.django_requests_total.labels(
+            method=record.method,
+            endpoint=record.endpoint,
+            status=record.status_code
+        ).inc()
+        metrics.django_request_duration.labels(
+            method=record.method,
+            endpoint=record.endpoint
+        ).observe(record.duration_seconds)
+
+        # Métricas específicas de usuários para APIs
+        if record.is_api and record.user_id is not None:
+            metrics.api_requests_by_user.labels(
+                user_id=str(record.user_id),
+                username=record.username,
+                endpoint=record.endpoint,
+                method=record.method,
+                status=str(record.status_code)
+            ).inc()
+            metrics.api_users_response_time.labels(
+                username=record.username,
+                endpoint=record.endpoint
+            ).observe(record.duration_seconds)
+
+    def record_logs(self, record):
+        # Log de acesso à API
+        if record.is_api and api_logger.isEnabledFor(logging.INFO):
+            log_api_access(record)
+
+        # Log de performance para requisições lentas
+        if record.duration_ns > SLOW_REQUEST_NS:
+            log_slow_request(record)
+
+        # Log de segurança para tentativas suspeitas
+        if is_suspicious_request(record):
+            log_security_event(record)
+
+
+def log_api_access(record):
+    """Log específico para acessos à API"""
+    message = (
+        f"USER:{record.username} "
+        f"IP:{record.ip_address} "
+        f"{record.method} {record.path} "
+        f"STATUS:{record.status_code} "
+        f"TIME:{record.response_time_ms}ms"
+    )
+
+    if record.query_params:
+        message += f" PARAMS:{str(dict(record.query_params))}"
+
+    api_logger.info(message)
+
+
+def log_slow_request(record):
+    """Log para requisições lentas"""
+    performance_logger.warning(
+        f"SLOW_REQUEST: {record.method} {record.path} "
+        f"TIME:{record.response_time_ms}ms "
+        f"STATUS:{record.status_code} "
+        f"USER:{record.username} "
+        f"IP:{record.ip_address} "
+        f"VIEW:{record.endpoint}"
+    )
+
+
+def is_suspicious_request(record):
+    """Detectar requisições suspeitas"""
+    if record.status_code in SUSPICIOUS_STATUS:
+        return True
+    # Muitos parâmetros (possível injeção)
+    if len(record.query_params) > MAX_QUERY_PARAMS:
+        return True
+    user_agent = record.user_agent.lower()
+    if any(pattern in user_agent for pattern in SUSPICIOUS_AGENTS):
+        return True
+    path = record.path.lower()
+    return any(pattern in path for pattern in SUSPICIOUS_PATHS)
+
+
+def log_security_event(record):
+    """Log de eventos de segurança"""
+    message = (
+        f"SECURITY_EVENT: {record.method} {record.path} "
+        f"STATUS:{record.status_code} "
+        f"IP:{record.ip_address} "
+        f"USER_AGENT:{record.user_agent[:100]} "
+        f"USER:{record.username}"
+    )
+
+    if record.query_params:
+        message += f" PARAMS:{str(dict(record.query_params))}"
+
+    security_logger.warning(message)
+
+
+def track_user_activity(record):
+    """Rastrear atividade do usuário autenticado (acumulada em memória e gravada no Redis em lote)"""
+    activity.record(
+        record.user_id,
+        record.username,
+        record.path,
+        record.ip_address,
+        record.status_code,
+        record.response_time_ms,
+    )
+
+    # Log de atividade do usuário para APIs
+    if record.is_api and user_activity_logger.isEnabledFor(logging.INFO):
+        user_activity_logger.info(
+            f"USER_ACTIVITY: user={record.username} "
+            f"user_id={record.user_id} "
+            f"endpoint={record.path} "
+            f"method={record.method} "
+            f"status={record.status_code} "
+            f"response_time={record.response_time_ms}ms "
+            f"ip={record.ip_address}"
+        )
@@ -58,6 +58,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # OpClass (gin_trgm_ops) nos índices de busca
     'rest_framework',
     'rest_framework_simplejwt',
     'django_rq',  # Move this before your apps
@@ -68,9 +69,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'isp.middleware.IPWhitelistMiddleware',  # IP Whitelist - reabilitado
     'olt.security.OltSecurityMiddleware',  # Segurança OLT - NOVO
-    'olt.prometheus_views.PrometheusMiddleware',  # Métricas Prometheus
-    'isp.monitoring_middleware.MonitoringMiddleware',  # Monitoramento de APIs
-    'isp.monitoring_middleware.MetricsCollectionMiddleware',  # Coleta de métricas
+    'isp.monitoring_middleware.InstrumentationMiddleware',  # Métricas Prometheus, logs de API e atividade
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Whitenoise para arquivos estáticos
     'django.contrib.sessions.middleware.SessionMiddleware',
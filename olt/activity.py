@@ -0,0 +1,318 @@
+"""
+Atividade dos usuários agregada em memória e gravada no Redis em lote.
+A requisição só atualiza contadores locais; uma thread por processo grava a cada
+poucos segundos com operações atômicas (HINCRBY, PFADD, ZADD), sem sobrescrever
+o que outros workers gravaram.
+
+Estruturas no Redis:
+  olt:activity:last_seen                 ZSET user_id -> último acesso (epoch)
+  olt:activity:user:{id}                 HASH username, first_seen, requests, total_ms, status:{código}
+  olt:activity:user:{id}:endpoints|ips   HyperLogLog (quantidade de endpoints / IPs distintos)
+  olt:activity:user:{id}:recent_endpoints|recent_ips   ZSET valor -> último uso (últimos N)
+  olt:activity:hour:{AAAAMMDDHH}:requests|endpoints    total e ZSET de endpoints por hora
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import django_rq
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'olt:activity'
+LAST_SEEN_KEY = f'{KEY_PREFIX}:last_seen'
+
+# Intervalo de gravação e quantidade de eventos que antecipa a gravação
+ACTIVITY_FLUSH_INTERVAL = 5
+ACTIVITY_FLUSH_EVENTS = 1000
+# Dados de um usuário expiram após este tempo sem acessos
+ACTIVITY_TTL = 24 * 3600
+# Horas mantidas nos contadores por hora
+ACTIVITY_HOURS = 24
+# Endpoints / IPs mais recentes guardados por usuário
+ACTIVITY_RECENT_ITEMS = 20
+
+
+def user_key(user_id):
+    return f'{KEY_PREFIX}:user:{user_id}'
+
+
+def hour_key(timestamp):
+    return f'{KEY_PREFIX}:hour:{datetime.fromtimestamp(timestamp):%Y%m%d%H}'
+
+
+class UserActivity:
+    """Eventos de um usuário acumulados desde a última gravação"""
+
+    __slots__ = ('username', 'first_seen', 'last_seen', 'requests', 'total_ms', 'statuses', 'endpoints', 'ips')
+
+    def __init__(self, username, timestamp):
+        self.username = username
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.requests = 0
+        self.total_ms = 0.0
+        self.statuses = {}
+        self.endpoints = {}
+        self.ips = {}
+
+    def add(self, path, ip_address, status_code, response_time_ms, timestamp):
+        self.last_seen = timestamp
+        self.requests += 1
+        self.total_ms += response_time_ms
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        self.endpoints[path] = timestamp
+        if ip_address:
+            self.ips[ip_address] = timestamp
+
+    def merge(self, newer):
+        """Incorpora os eventos de `newer`, acumulados depois destes"""
+        self.username = newer.username
+        self.first_seen = min(self.first_seen, newer.first_seen)
+        self.last_seen = max(self.last_seen, newer.last_seen)
+        self.requests += newer.requests
+        self.total_ms += newer.total_ms
+        for status_code, count in newer.statuses.items():
+            self.statuses[status_code] = self.statuses.get(status_code, 0) + count
+        self.endpoints.update(newer.endpoints)
+        self.ips.update(newer.ips)
+
+
+class HourActivity:
+    """Requisições e acessos por endpoint de uma hora, desde a última gravação"""
+
+    __slots__ = ('requests', 'endpoints')
+
+    def __init__(self):
+        self.requests = 0
+        self.endpoints = {}
+
+    def add(self, path):
+        self.requests += 1
+        self.endpoints[path] = self.endpoints.get(path, 0) + 1
+
+    def merge(self, newer):
+        self.requests += newer.requests
+        for path, count in newer.endpoints.items():
+            self.endpoints[path] = self.endpoints.get(path, 0) + count
+
+
+class ActivityAggregator:
+    """Buffer de atividade do processo; a gravação no Redis roda em uma thread própria"""
+
+    def __init__(self, flush_interval=ACTIVITY_FLUSH_INTERVAL, flush_events=ACTIVITY_FLUSH_EVENTS):
+        self.flush_interval = flush_interval
+        self.flush_events = flush_events
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._users = {}
+        self._hours = {}
+        self._pending = 0
+        self._flusher_pid = None
+
+    def record(self, user_id, username, path, ip_address, status_code, response_time_ms, timestamp=None):
+        """Registra um acesso (só memória, sem I/O)"""
+        self._ensure_flusher()
+        timestamp = timestamp or time.time()
+        with self._lock:
+            activity = self._users.get(user_id)
+            if activity is None:
+                activity = self._users[user_id] = UserActivity(username, timestamp)
+            activity.add(path, ip_address, status_code, response_time_ms, timestamp)
+
+            hour = hour_key(timestamp)
+            if hour not in self._hours:
+                self._hours[hour] = HourActivity()
+            self._hours[hour].add(path)
+
+            self._pending += 1
+            pending = self._pending
+        if pending >= self.flush_events:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Grava no Redis o que foi acumulado; retorna a quantidade de eventos gravados.
+        Se o Redis falhar, os eventos voltam para o buffer e o retorno é None.
+        """
+        with self._lock:
+            users, self._users = self._users, {}
+            hours, self._hours = self._hours, {}
+            pending, self._pending = self._pending, 0
+        if not pending:
+            return 0
+
+        try:
+            pipe = django_rq.get_connection('default').pipeline(transaction=False)
+            for user_id, activity in users.items():
+                self._write_user(pipe, user_id, activity)
+            for hour, activity in hours.items():
+                self._write_hour(pipe, hour, activity)
+            pipe.zremrangebyscore(LAST_SEEN_KEY, '-inf', time.time() - ACTIVITY_TTL)
+            pipe.execute()
+        except Exception:
+            logger.exception("Erro ao gravar atividade dos usuários")
+            self._restore(users, hours, pending)
+            return None
+        return pending
+
+    def _restore(self, users, hours, pending):
+        """Devolve ao buffer os eventos de uma gravação que falhou"""
+        with self._lock:
+            for buffered, drained in ((self._users, users), (self._hours, hours)):
+                for key, activity in drained.items():
+                    if key in buffered:
+                        activity.merge(buffered[key])
+                    buffered[key] = activity
+            self._pending += pending
+
+    def _write_user(self, pipe, user_id, activity):
+        key = user_key(user_id)
+        pipe.hsetnx(key, 'first_seen', activity.first_seen)
+        pipe.hset(key, 'username', activity.username)
+        pipe.hincrby(key, 'requests', activity.requests)
+        pipe.hincrbyfloat(key, 'total_ms', activity.total_ms)
+        for status_code, count in activity.statuses.items():
+            pipe.hincrby(key, f'status:{status_code}', count)
+
+        for name, values in (('endpoints', activity.endpoints), ('ips', activity.ips)):
+            if not values:
+                continue
+            pipe.pfadd(f'{key}:{name}', *values)
+            recent = f'{key}:recent_{name}'
+            pipe.zadd(recent, values, gt=True)
+            pipe.zremrangebyrank(recent, 0, -(ACTIVITY_RECENT_ITEMS + 1))
+
+        for suffix in ('', ':endpoints', ':ips', ':recent_endpoints', ':recent_ips'):
+            pipe.expire(f'{key}{suffix}', ACTIVITY_TTL)
+        # GT: um worker com dados mais antigos não recua o último acesso
+        pipe.zadd(LAST_SEEN_KEY, {user_id: activity.last_seen}, gt=True)
+
+    def _write_hour(self, pipe, hour, activity):
+        ttl = (ACTIVITY_HOURS + 1) * 3600
+        pipe.incrby(f'{hour}:requests', activity.requests)
+        pipe.expire(f'{hour}:requests', ttl)
+        for path, count in activity.endpoints.items():
+            pipe.zincrby(f'{hour}:endpoints', count, path)
+        pipe.expire(f'{hour}:endpoints', ttl)
+
+    def _ensure_flusher(self):
+        """Inicia a thread de gravação uma vez por processo (após o fork do gunicorn)"""
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            threading.Thread(target=self._run, name='activity-flusher', daemon=True).start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self.flush() is None:
+                # Redis indisponível: espera o intervalo inteiro antes da próxima tentativa
+                time.sleep(self.flush_interval)
+
+
+aggregator = ActivityAggregator()
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(float(timestamp)).isoformat() if timestamp else None
+
+
+def _read_users(connection, entries):
+    """Monta o resumo de cada (user_id, último acesso) com um único pipeline"""
+    pipe = connection.pipeline(transaction=False)
+    for user_id, _ in entries:
+        key = user_key(user_id)
+        pipe.hgetall(key)
+        pipe.pfcount(f'{key}:endpoints')
+        pipe.pfcount(f'{key}:ips')
+        pipe.zrevrange(f'{key}:recent_endpoints', 0, -1)
+        pipe.zrevrange(f'{key}:recent_ips', 0, -1)
+    results = pipe.execute()
+
+    users = []
+    for index, (user_id, last_seen) in enumerate(entries):
+        data, endpoints, ips, recent_endpoints, recent_ips = results[index * 5:index * 5 + 5]
+        data = {_decode(key): _decode(value) for key, value in data.items()}
+        if not data:
+            continue
+        requests = int(data.get('requests', 0))
+        statuses = {
+            int(key.split(':', 1)[1]): int(value)
+            for key, value in data.items() if key.startswith('status:')
+        }
+        users.append({
+            'user_id': int(user_id),
+            'username': data.get('username', 'unknown'),
+            'first_seen': _iso(data.get('first_seen')),
+            'last_seen': _iso(last_seen),
+            'request_count': requests,
+            'avg_response_time': float(data.get('total_ms', 0)) / requests if requests else 0,
+            'unique_endpoints': endpoints,
+            'unique_ip_addresses': ips,
+            'endpoints': [_decode(value) for value in recent_endpoints],
+            'ip_addresses': [_decode(value) for value in recent_ips],
+            'status_codes': statuses,
+        })
+    return users
+
+
+def get_active_users(since):
+    """Usuários com acesso desde o timestamp since, do mais recente para o mais antigo"""
+    aggregator.flush()
+    connection = django_rq.get_connection('default')
+    entries = connection.zrevrangebyscore(LAST_SEEN_KEY, '+inf', since, withscores=True)
+    return _read_users(connection, [(_decode(user_id), score) for user_id, score in entries])
+
+
+def get_user_activity(user_id):
+    """Resumo de um usuário (None se não houver atividade recente)"""
+    aggregator.flush()
+    connection = django_rq.get_connection('default')
+    last_seen = connection.zscore(LAST_SEEN_KEY, user_id)
+    if last_seen is None:
+        return None
+    users = _read_users(connection, [(user_id, last_seen)])
+    return users[0] if users else None
+
+
+def count_active_users(since):
+    return django_rq.get_connection('default').zcount(LAST_SEEN_KEY, since, '+inf')
+
+
+def get_usage_by_hour(hours=ACTIVITY_HOURS):
+    """[(hora, requisições, {endpoint: acessos})] das últimas horas, da mais antiga para a atual"""
+    aggregator.flush()
+    connection = django_rq.get_connection('default')
+    current = datetime.now().replace(minute=0, second=0, microsecond=0)
+    starts = [current - timedelta(hours=offset) for offset in reversed(range(hours))]
+    keys = [hour_key(start.timestamp()) for start in starts]
+
+    pipe = connection.pipeline(transaction=False)
+    for key in keys:
+        pipe.get(f'{key}:requests')
+        pipe.zrange(f'{key}:endpoints', 0, -1, withscores=True)
+    results = pipe.execute()
+
+    usage = []
+    for index, start in enumerate(starts):
+        requests, endpoints = results[index * 2], results[index * 2 + 1]
+        usage.append((
+            start.isoformat(),
+            int(requests or 0),
+            {_decode(path): int(count) for path, count in endpoints},
+        ))
+    return usage
@@ -235,12 +235,12 @@ class AlertManager:
         Verificar alertas relacionados às ONUs
         """
         try:
-            from .models import ONU
+            from .rollups import totals
             
-            # Verificar ONUs com sinal baixo
-            low_signal_onus = ONU.objects.filter(olt_rx_sig__lt=-25.0)
+            # Verificar ONUs com sinal baixo (a partir dos resumos por slot)
+            low_signal = totals()['low_signal']
             
-            if low_signal_onus.exists():
+            if low_signal:
                 alert = {
                     'labels': {
                         'alertname': 'ONULowSignal',
@@ -248,8 +248,8 @@ class AlertManager:
                         'component': 'onu'
                     },
                     'annotations': {
-                        'summary': f'{low_signal_onus.count()} ONUs com sinal baixo',
-                        'description': f'Detectadas {low_signal_onus.count()} ONUs com sinal abaixo de -25 dBm'
+                        'summary': f'{low_signal} ONUs com sinal baixo',
+                        'description': f'Detectadas {low_signal} ONUs com sinal abaixo de -25 dBm'
                     },
                     'status': 'firing',
                     'startsAt': timezone.now().isoformat()
@@ -263,6 +263,58 @@ class AlertManager:
         except Exception as e:
             logger.error(f"Erro ao verificar alertas das ONUs: {str(e)}")
     
+    @staticmethod
+    def check_degradation_alerts():
+        """
+        Verificar quedas de sinal detectadas pela análise do histórico.
+        Chamado só pelo detect_signal_degradation_task, logo após cada análise.
+        """
+        try:
+            from .models import SignalDegradation
+            
+            # PON inteira caindo indica fibra alimentadora: um alerta crítico por PON
+            pons = SignalDegradation.objects.filter(kind=SignalDegradation.KIND_PON)
+            for degradation in pons:
+                process_alert({
+                    'labels': {
+                        'alertname': 'PONSignalDrop',
+                        'severity': 'critical',
+                        'component': 'pon',
+                        'pon': degradation.pon
+                    },
+                    'annotations': {
+                        'summary': f'Queda de sinal na PON {degradation.pon}',
+                        'description': (
+                            f'{degradation.onus_affected} de {degradation.onus_total} ONUs caíram '
+                            f'(mediana {degradation.delta:+.1f} dB); possível problema na fibra alimentadora'
+                        )
+                    },
+                    'status': 'firing',
+                    'startsAt': degradation.first_detected.isoformat()
+                })
+            
+            # ONUs em queda fora dessas PONs: um alerta agregado
+            onus = SignalDegradation.objects.filter(kind=SignalDegradation.KIND_ONU).exclude(
+                pon__in=pons.values('pon')
+            ).count()
+            if onus:
+                process_alert({
+                    'labels': {
+                        'alertname': 'ONUSignalDegrading',
+                        'severity': 'warning',
+                        'component': 'onu'
+                    },
+                    'annotations': {
+                        'summary': f'{onus} ONUs com sinal em queda',
+                        'description': f'Detectadas {onus} ONUs com tendência ou variação de sinal acima do limite'
+                    },
+                    'status': 'firing',
+                    'startsAt': timezone.now().isoformat()
+                })
+            
+        except Exception as e:
+            logger.error(f"Erro ao verificar alertas de degradação de sinal: {str(e)}")
+    
     @staticmethod
     def check_temperature_alerts():
         """
@@ -21,6 +21,7 @@ urlpatterns = [
     path('monitoring/users/active/', user_activity_views.active_users_list, name='active_users_list'),
     path('monitoring/users/<int:user_id>/activity/', user_activity_views.user_activity_details, name='user_activity_details'),
     path('monitoring/api/usage-stats/', user_activity_views.api_usage_stats, name='api_usage_stats'),
+    path('monitoring/process/', user_activity_views.process_metrics, name='process_metrics'),
     
     # Autenticação JWT
     path('auth/login/', api_views.CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -29,9 +30,13 @@ urlpatterns = [
     # ONUs
     path('onus/', api_views.ONUListAPIView.as_view(), name='onu_list'),
     path('onus/<int:pk>/', api_views.ONUDetailAPIView.as_view(), name='onu_detail'),
+    path('onus/<int:pk>/history/', api_views.onu_history, name='onu_history'),
     path('onus/stats/', api_views.onu_stats, name='onu_stats'),
+    path('onus/stats/pons/', api_views.PonRollupListAPIView.as_view(), name='onu_stats_pons'),
     path('onus/pon/<str:pon>/', api_views.onu_by_pon, name='onu_by_pon'),
     path('onus/search/', api_views.onu_search, name='onu_search'),
+    path('onus/duplicates/', api_views.ONUDuplicatesAPIView.as_view(), name='onu_duplicates'),
+    path('onus/degradation/', api_views.SignalDegradationListAPIView.as_view(), name='onu_degradation'),
     
     # Portas OLT
     path('olt-users/', api_views.OltUsersListAPIView.as_view(), name='olt_users_list'),
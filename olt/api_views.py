@@ -4,10 +4,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg, Max, Min
+from django.db.models import Count, Avg, Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
+import math
 from .models import (
     ONU, OltUsers, PlacaOnu, ClienteFibraIxc,
-    OltSystemInfo, OltSlot, OltTemperature, OltSfpDiagnostics
+    OltSystemInfo, OltSlot, OltTemperature, OltSfpDiagnostics, PonRollup, SignalDegradation, OnuSignalRollup
 )
 from .serializers import (
     ONUSerializer, 
@@ -19,10 +23,24 @@ from .serializers import (
     OltSlotSerializer,
     OltTemperatureSerializer,
     OltSfpDiagnosticsSerializer,
-    OltSystemStatsSerializer
+    OltSystemStatsSerializer,
+    PonRollupSerializer,
+    SignalDegradationSerializer
 )
 from .utils import OltSystemCollector
 from .security import frontend_only, olt_admin_required
+from .search import search_onus
+from .onu_utils import get_duplicated_onus
+from .stats import get_stats, STATS_SLOTS
+from .history import get_series, retention_days, RESOLUTIONS
+
+
+class ONUSearchFilter(filters.SearchFilter):
+    """SearchFilter que usa a busca compartilhada de ONUs (olt.search)"""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        return search_onus(query, queryset, ranked=False)
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -47,12 +65,25 @@ class ONUListAPIView(generics.ListAPIView):
     queryset = ONU.objects.all().order_by('pon', 'position')
     serializer_class = ONUSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ONUSearchFilter, filters.OrderingFilter]
     filterset_fields = ['oper_state', 'admin_state', 'cliente_fibra']
     search_fields = ['serial', 'mac', 'desc1', 'desc2', 'pon']
     ordering_fields = ['position', 'olt_rx_sig', 'pon']
 
 
+class ONUDuplicatesAPIView(generics.ListAPIView):
+    """
+    Lista ONUs com serial cadastrado em mais de uma posição
+    """
+    serializer_class = ONUSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [ONUSearchFilter, filters.OrderingFilter]
+    ordering_fields = ['serial', 'pon', 'position', 'olt_rx_sig']
+
+    def get_queryset(self):
+        return get_duplicated_onus().order_by('serial', 'pon', 'position')
+
+
 class ONUDetailAPIView(generics.RetrieveAPIView):
     """
     Detalhes de uma ONU específica com informações do cliente
@@ -62,6 +93,31 @@ class ONUDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
 
 
+class PonRollupListAPIView(generics.ListAPIView):
+    """
+    Resumo por PON (contadores e sinal mínimo/médio/máximo), atualizado a cada coleta
+    """
+    queryset = PonRollup.objects.all().order_by('slot', 'port')
+    serializer_class = PonRollupSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['slot']
+    ordering_fields = ['pon', 'total', 'offline', 'low_signal', 'rx_avg', 'rx_min']
+
+
+class SignalDegradationListAPIView(generics.ListAPIView):
+    """
+    ONUs e PONs com queda de sinal detectada na última análise do histórico
+    """
+    queryset = SignalDegradation.objects.all().order_by('delta')
+    serializer_class = SignalDegradationSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['kind', 'pon']
+    ordering_fields = ['delta', 'slope', 'first_detected', 'pon']
+
+
 class OltUsersListAPIView(generics.ListAPIView):
     """
     Lista informações das portas OLT
@@ -91,30 +147,25 @@ def onu_stats(request):
     """
     Estatísticas gerais das ONUs
     """
-    total_onus = ONU.objects.count()
-    onus_online = ONU.objects.filter(oper_state='up').count()
-    onus_offline = ONU.objects.filter(oper_state='down').count()
-    clientes_fibra = ONU.objects.filter(cliente_fibra=True).count()
+    onus = get_stats()['onus']
+    total_onus = onus['total']
+    onus_online = onus['online']
     
     # Estatísticas por slot
     slot_stats = {}
-    for slot in [1, 2]:
-        slot_onus = ONU.objects.filter(pon__contains=f'/1/{slot}/')
+    for slot in STATS_SLOTS:
         slot_stats[f'slot_{slot}'] = {
-            'total': slot_onus.count(),
-            'online': slot_onus.filter(oper_state='up').count(),
-            'offline': slot_onus.filter(oper_state='down').count()
+            'total': onus[f'slot_{slot}_total'],
+            'online': onus[f'slot_{slot}_online'],
+            'offline': onus[f'slot_{slot}_offline']
         }
     
-    # ONUs com sinal baixo (menor que -25 dBm)
-    low_signal = ONU.objects.filter(olt_rx_sig__lt=-25.0).count()
-    
     return Response({
         'total_onus': total_onus,
         'onus_online': onus_online,
-        'onus_offline': onus_offline,
-        'clientes_fibra': clientes_fibra,
-        'onus_sinal_baixo': low_signal,
+        'onus_offline': onus['offline'],
+        'clientes_fibra': onus['clientes_fibra'],
+        'onus_sinal_baixo': onus['low_signal'],
         'estatisticas_por_slot': slot_stats,
         'percentual_online': round((onus_online / total_onus * 100), 2) if total_onus > 0 else 0
     })
@@ -151,14 +202,8 @@ def onu_search(request):
     if not query:
         return Response({'error': 'Parâmetro de busca "q" é obrigatório'}, status=400)
     
-    # Busca por serial, MAC, descrição ou PON
-    onus = ONU.objects.filter(
-        Q(serial__icontains=query) |
-        Q(mac__icontains=query) |
-        Q(desc1__icontains=query) |
-        Q(desc2__icontains=query) |
-        Q(pon__icontains=query)
-    ).order_by('pon', 'position')
+    # Busca por serial, MAC, descrição ou PON, ordenada por relevância
+    onus = search_onus(query)
     
     serializer = ONUDetailSerializer(onus, many=True)
     return Response({
@@ -168,6 +213,78 @@ def onu_search(request):
     })
 
 
+def _parse_history_time(value):
+    """Data ISO 8601 da query string (sem fuso = fuso atual); None se inválida"""
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        # Formato certo, data impossível (ex.: mês 13)
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _parse_history_hours(value):
+    """Janela em horas da query string, limitada à retenção do rollup diário; None se inválida"""
+    try:
+        hours = float(value)
+    except ValueError:
+        return None
+    # inf/nan ou valores enormes estourariam o timedelta
+    if not math.isfinite(hours) or hours <= 0:
+        return None
+    return min(hours, retention_days(OnuSignalRollup.DAY) * 24)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def onu_history(request, pk):
+    """
+    Histórico de sinal e estado de uma ONU.
+    Parâmetros: start/end (ISO 8601) ou hours (padrão 24) e resolution (raw, hour ou day).
+    Sem resolution, usa a mais fina disponível para o intervalo.
+    """
+    onu = ONU.objects.filter(pk=pk).values('id', 'pon', 'position', 'serial').first()
+    if onu is None:
+        return Response({'error': 'ONU não encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+    resolution = request.GET.get('resolution') or None
+    if resolution is not None and resolution not in RESOLUTIONS:
+        return Response(
+            {'error': f'Parâmetro "resolution" deve ser um de: {", ".join(RESOLUTIONS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    end = timezone.now()
+    if request.GET.get('end'):
+        end = _parse_history_time(request.GET['end'])
+    if request.GET.get('start'):
+        start = _parse_history_time(request.GET['start'])
+    else:
+        hours = _parse_history_hours(request.GET.get('hours', 24))
+        try:
+            start = end - timedelta(hours=hours) if end and hours else None
+        except OverflowError:
+            # end muito próximo de datetime.min
+            start = None
+    if start is None or end is None or start >= end:
+        return Response(
+            {'error': 'Intervalo inválido: use start/end em ISO 8601 (start < end) ou hours'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    resolution, points = get_series(onu['id'], start, end, resolution)
+    return Response({
+        'onu': onu,
+        'start': start,
+        'end': end,
+        'resolution': resolution,
+        'total_pontos': len(points),
+        'pontos': points,
+    })
+
+
 # =========== OLT SYSTEM API VIEWS ===========
 
 class OltSystemInfoAPIView(generics.RetrieveAPIView):
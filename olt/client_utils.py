@@ -1,79 +1,212 @@
 import base64
 import json
+import math
 # from .models import ONU, ClienteFibraIxc
 import requests
 import os
-from .models import ONU, ClienteFibraIxc
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .models import ONU, ClienteFibraIxc, IxcSyncState
+from .stats import mark_ingest
+from .rollups import refresh_rollups
 
-def update_clientes():
-    """Função para atualizar a lista de clientes fibra do IXC e atualizar o campo cliente_fibra nas ONUs."""
+# Registros por página pedidos ao IXC (o webservice aceita valores bem maiores que 100)
+IXC_PAGE_SIZE = 1000
+# Páginas buscadas em paralelo
+IXC_MAX_WORKERS = 4
+IXC_RESOURCE = 'radpop_radio_cliente_fibra'
+# Intervalo (horas) entre sincronizações completas no modo automático
+IXC_FULL_SYNC_HOURS = 24
 
-    response = search_ixc_page(1)
-    # if response.status_code != 200:
-    #     print(f"Error: {response.status_code} - {response.text}")
-    #     return
+# Linhas por INSERT ... ON CONFLICT no upsert de clientes
+UPSERT_BATCH_SIZE = 500
+CLIENTE_UPSERT_FIELDS = ['nome', 'latitude', 'longitude', 'endereco', 'id_caixa_ftth', 'is_active', 'last_synced']
 
-    data = response.json()
 
-    total_de_paginas = int(data['total'])/100
+class IxcClient:
+    """
+    Cliente do webservice do IXC com sessão HTTP reaproveitada, retry com backoff
+    e busca concorrente das páginas. Host e esquema são configuráveis para permitir
+    apontar para um servidor IXC de teste local (ex.: IXC_SCHEME=http, IXC_HOST=127.0.0.1:8001).
+    """
+
+    def __init__(self, host=None, token=None, scheme=None, page_size=None, max_workers=None,
+                 retries=3, backoff_factor=0.5, timeout=30):
+        self.host = host or os.getenv('IXC_HOST')
+        self.token = token if token is not None else os.getenv('IXC_TOKEN', '')
+        self.scheme = scheme or os.getenv('IXC_SCHEME', 'https')
+        self.page_size = page_size or int(os.getenv('IXC_PAGE_SIZE', IXC_PAGE_SIZE))
+        self.max_workers = max(1, max_workers or int(os.getenv('IXC_MAX_WORKERS', IXC_MAX_WORKERS)))
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            # "listar" é uma consulta, então repetir o POST é seguro
+            allowed_methods=frozenset(['POST']),
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'ixcsoft': 'listar',
+            'Authorization': 'Basic {}'.format(base64.b64encode(self.token.encode('utf-8')).decode('utf-8')),
+            'Content-Type': 'application/json'
+        })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    @property
+    def url(self):
+        return f"{self.scheme}://{self.host}/webservice/v1/{IXC_RESOURCE}"
+
+    def post_page(self, page, query='', oper='>'):
+        payload = {
+            'qtype': f'{IXC_RESOURCE}.id',
+            'query': query,
+            'oper': oper,
+            'page': page,
+            'rp': str(self.page_size),
+            'sortname': f'{IXC_RESOURCE}.id',
+            'sortorder': 'asc'
+        }
+        return self.session.post(self.url, data=json.dumps(payload), timeout=self.timeout)
+
+    def fetch_page(self, page, **kwargs):
+        response = self.post_page(page, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def iter_pages(self, **kwargs):
+        """
+        Gera a lista de registros de cada página, em ordem. A primeira página é
+        buscada uma única vez e informa o total; as demais são buscadas em paralelo.
+        """
+        first = self.fetch_page(1, **kwargs)
+        yield first.get('registros') or []
+
+        total_pages = math.ceil(int(first.get('total') or 0) / self.page_size)
+        if total_pages <= 1:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pages = executor.map(lambda page: self.fetch_page(page, **kwargs), range(2, total_pages + 1))
+            for data in pages:
+                yield data.get('registros') or []
+
+
+def update_clientes(mode='auto'):
+    """
+    Função para atualizar a lista de clientes fibra do IXC e atualizar o campo cliente_fibra nas ONUs.
+
+    mode='full' baixa toda a tabela e desativa quem sumiu do IXC; mode='incremental' busca só
+    registros com id acima do último importado; mode='auto' faz a completa quando a última
+    tem mais de IXC_FULL_SYNC_HOURS horas e a incremental nos demais casos.
+    """
+    state = IxcSyncState.load()
+    if mode == 'auto':
+        mode = 'full' if full_sync_due(state) else 'incremental'
+
+    synced_at = timezone.now()
+    query = '' if mode == 'full' else str(state.last_id)
+    total = 0
+    last_id = state.last_id
+
+    # Cada página é gravada em sua própria transação curta (upsert em lote)
+    with IxcClient() as client:
+        for registros in client.iter_pages(query=query, oper='>'):
+            total += upsert_clientes(registros, synced_at)
+            last_id = max([last_id] + [int(registro['id']) for registro in registros if str(registro.get('id', '')).isdigit()])
+
+    if mode == 'full':
+        # Com a varredura completa, quem não apareceu nela deixou de existir no IXC
+        # (mantém o histórico marcando como inativo em vez de remover)
+        ClienteFibraIxc.objects.filter(is_active=True).exclude(last_synced__gte=synced_at).update(is_active=False)
+        state.last_full_sync = synced_at
+    else:
+        state.last_incremental_sync = synced_at
+    state.last_id = last_id
+    state.save()
+
+    if mode == 'full' or total:
+        refresh_cliente_fibra()
+        refresh_rollups()
+        mark_ingest()
+
+    return {'mode': mode, 'clientes': total, 'last_id': last_id}
+
+
+def full_sync_due(state):
+    if state.last_full_sync is None:
+        return True
+    hours = float(os.getenv('IXC_FULL_SYNC_HOURS', IXC_FULL_SYNC_HOURS))
+    return timezone.now() - state.last_full_sync >= timedelta(hours=hours)
+
+
+def build_cliente(registro, synced_at):
+    return ClienteFibraIxc(
+        mac=registro['mac'],
+        nome=registro['nome'],
+        latitude=registro.get('latitude', ''),
+        longitude=registro.get('longitude', ''),
+        endereco=f"{registro.get('endereco', '')}, {registro.get('numero', '')}, {registro.get('bairro', '')}, {registro.get('cidade', '')}",
+        id_caixa_ftth=registro.get('id_caixa_ftth', ''),
+        is_active=True,
+        last_synced=synced_at,
+    )
+
+
+def upsert_clientes(registros, synced_at):
+    """
+    Grava uma página de registros do IXC com INSERT ... ON CONFLICT (mac) DO UPDATE.
+    MACs repetidos na mesma página ficam com o último registro, como no update_or_create.
+    """
+    clientes = {}
+    for registro in registros:
+        clientes[registro['mac']] = build_cliente(registro, synced_at)
+
+    if not clientes:
+        return 0
 
-    # Usar transação atômica para evitar perda de dados
-    from django.db import transaction
     with transaction.atomic():
-        # Marcar todos como inativos primeiro
-        ClienteFibraIxc.objects.all().update(is_active=False)
-        
-        for page in range(1, int(total_de_paginas+1)):
-            response = search_ixc_page(page)
-            data = response.json()
-            
-            for registro in data['registros']:
-                cliente_data = {
-                    'mac': registro['mac'],
-                    'nome': registro['nome'],
-                    'latitude': registro.get('latitude', ''),
-                    'longitude': registro.get('longitude', ''),
-                    'endereco': f"{registro.get('endereco', '')}, {registro.get('numero', '')}, {registro.get('bairro', '')}, {registro.get('cidade', '')}",
-                    'id_caixa_ftth': registro.get('id_caixa_ftth', ''),
-                    'is_active': True
-                }
-                ClienteFibraIxc.objects.update_or_create(
-                    mac=registro['mac'],
-                    defaults=cliente_data
-                )
-        
-        # Remover apenas os que realmente não existem mais
-        # (opcional - pode manter histórico marcando como inativo)
-        # ClienteFibraIxc.objects.filter(is_active=False).delete()
-
-    onus = ONU.objects.all()
-    for onu in onus:
-        onu.update_cliente_fibra_status()
+        ClienteFibraIxc.objects.bulk_create(
+            list(clientes.values()),
+            batch_size=UPSERT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['mac'],
+            update_fields=CLIENTE_UPSERT_FIELDS,
+        )
+    return len(clientes)
 
 
-def search_ixc_page(page):
+def refresh_cliente_fibra():
+    """
+    Recalcula ONU.cliente_fibra para todas as ONUs em duas UPDATEs no banco.
+    Uma ONU é cliente fibra quando existe ClienteFibraIxc com mac == serial e nome == desc1;
+    só as linhas cujo valor muda são escritas. Retorna (marcadas, desmarcadas).
+    """
+    cliente = ClienteFibraIxc.objects.filter(mac=OuterRef('serial'), nome=OuterRef('desc1'))
 
-    host = os.getenv('IXC_HOST')
-    url = f"https://{host}/webservice/v1/radpop_radio_cliente_fibra"
-    token = os.getenv('IXC_TOKEN').encode('utf-8')
-
-    payload = {
-        'qtype': 'radpop_radio_cliente_fibra.id',
-        'query': '',
-        'oper': '>',
-        'page': page,
-        'rp': '100',
-        'sortname': 'radpop_radio_cliente_fibra.id',
-        'sortorder': 'asc'
-    }
-
-    headers = {
-        'ixcsoft': 'listar',
-        'Authorization': 'Basic {}'.
-        format(base64.b64encode(token).decode('utf-8')),
-        'Content-Type': 'application/json'
-    }
-
-    response = requests.post(url, data=json.dumps(payload), headers=headers)
-
-    return response
\ No newline at end of file
+    marcadas = ONU.objects.filter(cliente_fibra=False).filter(Exists(cliente)).update(cliente_fibra=True)
+    desmarcadas = ONU.objects.filter(cliente_fibra=True).filter(~Exists(cliente)).update(cliente_fibra=False)
+    return marcadas, desmarcadas
+
+
+def search_ixc_page(page):
+    """Busca uma única página de clientes fibra no IXC (mantido por compatibilidade)"""
+    with IxcClient(page_size=100) as client:
+        return client.post_page(page)
@@ -0,0 +1,188 @@
+"""
+Detecção de degradação de sinal sobre a janela recente do histórico das ONUs.
+Toda a frota é analisada em uma única passada vetorizada (pandas/NumPy):
+uma consulta traz as leituras da janela e tendência/variação saem de somas por ONU.
+"""
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.utils import timezone
+
+from .history import SIGNAL_SCALE
+from .models import ONU, OnuSignalSample, SignalDegradation
+
+# Janela analisada (horas) e mínimo de leituras para uma ONU entrar na análise
+DEGRADATION_WINDOW_HOURS = 24
+DEGRADATION_MIN_SAMPLES = 4
+
+# ONU em queda: tendência (dB/dia) ou variação da última leitura sobre a mediana (dB)
+DEGRADATION_SLOPE_DB_DAY = -2.0
+DEGRADATION_DELTA_DB = -3.0
+
+# PON em queda: ao menos N ONUs e esta fração das ONUs analisadas caindo juntas
+PON_DROP_DELTA_DB = -2.0
+PON_DROP_MIN_ONUS = 3
+PON_DROP_MIN_FRACTION = 0.5
+
+READ_CHUNK_SIZE = 10000
+
+
+def _setting(name, default):
+    return type(default)(os.getenv(name, default))
+
+
+def load_window(start):
+    """Leituras com sinal desde start como DataFrame (onu_id, hours, rx) em dBm"""
+    rows = (
+        OnuSignalSample.objects
+        .filter(time__gte=start, rx_sig__isnull=False)
+        .order_by()
+        .values_list('onu_id', 'time', 'rx_sig')
+    )
+    frame = pd.DataFrame.from_records(
+        rows.iterator(chunk_size=READ_CHUNK_SIZE),
+        columns=['onu_id', 'time', 'rx_sig'],
+    )
+    if frame.empty:
+        return pd.DataFrame(columns=['onu_id', 'hours', 'rx'])
+
+    frame['hours'] = (pd.to_datetime(frame['time'], utc=True) - pd.Timestamp(start)).dt.total_seconds() / 3600
+    frame['rx'] = frame['rx_sig'].to_numpy(dtype=np.float64) / SIGNAL_SCALE
+    return frame[['onu_id', 'hours', 'rx']].sort_values(['onu_id', 'hours'], kind='stable')
+
+
+def onu_trends(frame):
+    """
+    Tendência (regressão linear, dB/dia) e variação (última leitura - mediana) por ONU.
+    As somas da regressão saem de um único groupby, sem laço por ONU.
+    """
+    frame = frame.assign(hours_rx=frame['hours'] * frame['rx'], hours_sq=frame['hours'] ** 2)
+    trends = frame.groupby('onu_id').agg(
+        samples=('rx', 'size'),
+        sum_t=('hours', 'sum'),
+        sum_x=('rx', 'sum'),
+        sum_tx=('hours_rx', 'sum'),
+        sum_tt=('hours_sq', 'sum'),
+        rx_baseline=('rx', 'median'),
+        rx_last=('rx', 'last'),
+    )
+
+    n = trends['samples'].to_numpy(dtype=np.float64)
+    denominator = n * trends['sum_tt'].to_numpy() - trends['sum_t'].to_numpy() ** 2
+    numerator = n * trends['sum_tx'].to_numpy() - trends['sum_t'].to_numpy() * trends['sum_x'].to_numpy()
+    # Leituras todas no mesmo instante não definem tendência
+    slope = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 1e-9)
+
+    trends['slope'] = slope * 24
+    trends['delta'] = trends['rx_last'] - trends['rx_baseline']
+    return trends[['samples', 'slope', 'delta', 'rx_baseline', 'rx_last']]
+
+
+def pon_drops(trends):
+    """PONs em que várias ONUs caíram juntas (medianas das ONUs analisadas)"""
+    dropping = trends['delta'] <= _setting('PON_DROP_DELTA_DB', PON_DROP_DELTA_DB)
+    pons = trends.assign(dropping=dropping).groupby('pon').agg(
+        onus_total=('delta', 'size'),
+        onus_affected=('dropping', 'sum'),
+        samples=('samples', 'sum'),
+        slope=('slope', 'median'),
+        delta=('delta', 'median'),
+        rx_baseline=('rx_baseline', 'median'),
+        rx_last=('rx_last', 'median'),
+    )
+    flagged = (
+        (pons['onus_affected'] >= _setting('PON_DROP_MIN_ONUS', PON_DROP_MIN_ONUS))
+        & (pons['onus_affected'] >= pons['onus_total'] * _setting('PON_DROP_MIN_FRACTION', PON_DROP_MIN_FRACTION))
+    )
+    return pons[flagged]
+
+
+def analyze(frame):
+    """Retorna (ONUs em queda, PONs em queda) como DataFrames indexados por onu_id / pon"""
+    if frame.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    trends = onu_trends(frame)
+    trends = trends[trends['samples'] >= _setting('DEGRADATION_MIN_SAMPLES', DEGRADATION_MIN_SAMPLES)]
+
+    # PON atual das ONUs (ONUs já removidas do inventário ficam de fora)
+    pons = pd.Series(dict(ONU.objects.filter(id__in=trends.index.tolist()).values_list('id', 'pon')), dtype=object)
+    trends = trends.assign(pon=pons.reindex(trends.index)).dropna(subset=['pon'])
+
+    degrading = (
+        (trends['slope'] <= _setting('DEGRADATION_SLOPE_DB_DAY', DEGRADATION_SLOPE_DB_DAY))
+        | (trends['delta'] <= _setting('DEGRADATION_DELTA_DB', DEGRADATION_DELTA_DB))
+    )
+    return trends[degrading], pon_drops(trends)
+
+
+def _degradation_fields(row):
+    return {
+        'samples': int(row.samples),
+        'slope': round(float(row.slope), 2),
+        'delta': round(float(row.delta), 2),
+        'rx_baseline': round(float(row.rx_baseline), 2),
+        'rx_last': round(float(row.rx_last), 2),
+    }
+
+
+def save_degradations(onus, pons, now):
+    """Substitui o estado anterior mantendo a data da primeira detecção de cada ONU/PON"""
+    existing = {}
+    for degradation in SignalDegradation.objects.all():
+        if degradation.kind == SignalDegradation.KIND_ONU:
+            existing[(degradation.kind, degradation.onu_id)] = degradation
+        else:
+            existing[(degradation.kind, degradation.pon)] = degradation
+
+    results = []
+    for onu_id, row in onus.iterrows():
+        fields = _degradation_fields(row)
+        fields.update(pon=row.pon, onu_id=int(onu_id))
+        results.append(((SignalDegradation.KIND_ONU, int(onu_id)), fields))
+    for pon, row in pons.iterrows():
+        fields = _degradation_fields(row)
+        fields.update(pon=pon, onus_affected=int(row.onus_affected), onus_total=int(row.onus_total))
+        results.append(((SignalDegradation.KIND_PON, pon), fields))
+
+    to_create = []
+    to_update = []
+    for key, fields in results:
+        degradation = existing.pop(key, None)
+        if degradation is None:
+            degradation = SignalDegradation(kind=key[0], first_detected=now)
+            to_create.append(degradation)
+        else:
+            to_update.append(degradation)
+        for name, value in fields.items():
+            setattr(degradation, name, value)
+        degradation.last_detected = now
+
+    with transaction.atomic():
+        SignalDegradation.objects.filter(id__in=[d.id for d in existing.values()]).delete()
+        SignalDegradation.objects.bulk_create(to_create)
+        SignalDegradation.objects.bulk_update(to_update, [
+            'pon', 'samples', 'slope', 'delta', 'rx_baseline', 'rx_last',
+            'onus_affected', 'onus_total', 'last_detected',
+        ])
+
+    return {
+        'onus': len(onus),
+        'pons': len(pons),
+        'new': len(to_create),
+        'resolved': len(existing),
+    }
+
+
+def detect_signal_degradation(window_hours=None):
+    """Analisa a janela do histórico e grava as degradações atuais"""
+    now = timezone.now()
+    window_hours = window_hours or _setting('DEGRADATION_WINDOW_HOURS', DEGRADATION_WINDOW_HOURS)
+    frame = load_window(now - timedelta(hours=window_hours))
+    onus, pons = analyze(frame)
+    result = save_degradations(onus, pons, now)
+    result['readings'] = len(frame)
+    return result
@@ -0,0 +1,204 @@
+"""
+Histórico de sinal e estado das ONUs: amostras gravadas a cada coleta,
+agregados por hora/dia e retenção por idade
+"""
+import os
+from datetime import timedelta
+
+from django.db.models import Avg, Count, Max, Min, Q
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import OnuSignalRollup, OnuSignalSample
+
+# Sinal gravado em décimos de dB (SmallInteger)
+SIGNAL_SCALE = 10
+SAMPLE_BATCH_SIZE = 1000
+
+# Retenção padrão (dias) de cada resolução; sobrescrita por variáveis de ambiente
+SIGNAL_RAW_RETENTION_DAYS = 7
+SIGNAL_HOURLY_RETENTION_DAYS = 90
+SIGNAL_DAILY_RETENTION_DAYS = 730
+
+# Janela recalculada a cada manutenção (tolera execuções perdidas)
+SIGNAL_DOWNSAMPLE_LOOKBACK_HOURS = 6
+
+# Maior intervalo servido com amostras brutas / agregados por hora
+RAW_SERIES_MAX_SPAN = timedelta(days=2)
+HOURLY_SERIES_MAX_SPAN = timedelta(days=60)
+
+RESOLUTIONS = ('raw', OnuSignalRollup.HOUR, OnuSignalRollup.DAY)
+
+
+def retention_days(resolution):
+    defaults = {
+        'raw': ('SIGNAL_RAW_RETENTION_DAYS', SIGNAL_RAW_RETENTION_DAYS),
+        OnuSignalRollup.HOUR: ('SIGNAL_HOURLY_RETENTION_DAYS', SIGNAL_HOURLY_RETENTION_DAYS),
+        OnuSignalRollup.DAY: ('SIGNAL_DAILY_RETENTION_DAYS', SIGNAL_DAILY_RETENTION_DAYS),
+    }
+    name, default = defaults[resolution]
+    return int(os.getenv(name, default))
+
+
+def to_tenths(value):
+    """-23.4 dBm -> -234 (None se não houver leitura)"""
+    if value is None:
+        return None
+    return int(round(value * SIGNAL_SCALE))
+
+
+def from_tenths(value):
+    return None if value is None else value / SIGNAL_SCALE
+
+
+def parse_distance(ont_olt):
+    """Distância da ONU informada pela OLT em km ('0.8') -> metros (800)"""
+    try:
+        return int(round(float(ont_olt) * 1000))
+    except (TypeError, ValueError):
+        return None
+
+
+def build_samples(onus, time):
+    """Amostras (sem salvar) das ONUs já gravadas no banco"""
+    return [
+        OnuSignalSample(
+            time=time,
+            onu_id=onu.id,
+            rx_sig=to_tenths(onu.olt_rx_sig),
+            distance=parse_distance(onu.ont_olt),
+            online=onu.oper_state == 'up',
+        )
+        for onu in onus
+    ]
+
+
+def record_samples(samples):
+    """Insere as amostras em lotes; retorna a quantidade gravada"""
+    if not samples:
+        return 0
+    OnuSignalSample.objects.bulk_create(samples, batch_size=SAMPLE_BATCH_SIZE)
+    return len(samples)
+
+
+def truncate(value, resolution):
+    """Início da hora/dia (no fuso atual, como o Trunc do banco) que contém value"""
+    value = timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+    if resolution == OnuSignalRollup.DAY:
+        value = value.replace(hour=0)
+    return value
+
+
+def downsample(resolution, since, until=None):
+    """
+    Recalcula os agregados (hora ou dia) a partir das amostras brutas entre since e until.
+    Os períodos são recalculados por inteiro, então a operação pode ser repetida.
+    """
+    until = until or timezone.now()
+    start = truncate(since, resolution)
+    rows = (
+        OnuSignalSample.objects
+        .filter(time__gte=start, time__lt=until)
+        .annotate(bucket=Trunc('time', resolution))
+        .values('onu_id', 'bucket')
+        .annotate(
+            samples=Count('id'),
+            online_samples=Count('id', filter=Q(online=True)),
+            rx_min=Min('rx_sig'),
+            rx_avg=Avg('rx_sig'),
+            rx_max=Max('rx_sig'),
+            distance=Max('distance'),
+        )
+        .order_by()
+    )
+
+    rollups = []
+    for row in rows.iterator(chunk_size=SAMPLE_BATCH_SIZE):
+        if row['rx_avg'] is not None:
+            row['rx_avg'] = int(round(row['rx_avg']))
+        rollups.append(OnuSignalRollup(resolution=resolution, **row))
+
+    if rollups:
+        OnuSignalRollup.objects.bulk_create(
+            rollups,
+            batch_size=SAMPLE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['onu', 'resolution', 'bucket'],
+            update_fields=['samples', 'online_samples', 'rx_min', 'rx_avg', 'rx_max', 'distance'],
+        )
+    return len(rollups)
+
+
+def prune_history(now=None):
+    """Remove o que passou da retenção de cada resolução (DELETE por intervalo de tempo, via BRIN)"""
+    now = now or timezone.now()
+    deleted = {}
+    cutoff = now - timedelta(days=retention_days('raw'))
+    deleted['raw'], _ = OnuSignalSample.objects.filter(time__lt=cutoff).delete()
+    for resolution in (OnuSignalRollup.HOUR, OnuSignalRollup.DAY):
+        cutoff = now - timedelta(days=retention_days(resolution))
+        deleted[resolution], _ = OnuSignalRollup.objects.filter(
+            resolution=resolution,
+            bucket__lt=cutoff,
+        ).delete()
+    return deleted
+
+
+def maintain_history(lookback_hours=SIGNAL_DOWNSAMPLE_LOOKBACK_HOURS):
+    """Atualiza os agregados das últimas horas (e do dia corrente) e aplica a retenção"""
+    now = timezone.now()
+    since = now - timedelta(hours=lookback_hours)
+    return {
+        'hourly': downsample(OnuSignalRollup.HOUR, since, now),
+        'daily': downsample(OnuSignalRollup.DAY, since, now),
+        'deleted': prune_history(now),
+    }
+
+
+def pick_resolution(start, end, now=None):
+    """Resolução mais fina que ainda cobre o intervalo e não passou da retenção"""
+    now = now or timezone.now()
+    span = end - start
+    if span <= RAW_SERIES_MAX_SPAN and start >= now - timedelta(days=retention_days('raw')):
+        return 'raw'
+    if span <= HOURLY_SERIES_MAX_SPAN and start >= now - timedelta(days=retention_days(OnuSignalRollup.HOUR)):
+        return OnuSignalRollup.HOUR
+    return OnuSignalRollup.DAY
+
+
+def get_series(onu_id, start, end, resolution=None):
+    """
+    Série de uma ONU entre start e end (lida pelo índice (onu, time) ou pela constraint única dos agregados).
+    Retorna (resolução, pontos) com o sinal já em dBm.
+    """
+    resolution = resolution or pick_resolution(start, end)
+    if resolution == 'raw':
+        rows = (
+            OnuSignalSample.objects
+            .filter(onu_id=onu_id, time__gte=start, time__lt=end)
+            .order_by('time')
+            .values_list('time', 'rx_sig', 'distance', 'online')
+        )
+        return resolution, [
+            {'time': time, 'rx_sig': from_tenths(rx_sig), 'distance': distance, 'online': online}
+            for time, rx_sig, distance, online in rows
+        ]
+
+    rows = (
+        OnuSignalRollup.objects
+        .filter(onu_id=onu_id, resolution=resolution, bucket__gte=truncate(start, resolution), bucket__lt=end)
+        .order_by('bucket')
+        .values_list('bucket', 'samples', 'online_samples', 'rx_min', 'rx_avg', 'rx_max', 'distance')
+    )
+    return resolution, [
+        {
+            'time': bucket,
+            'samples': samples,
+            'online_samples': online_samples,
+            'rx_min': from_tenths(rx_min),
+            'rx_avg': from_tenths(rx_avg),
+            'rx_max': from_tenths(rx_max),
+            'distance': distance,
+        }
+        for bucket, samples, online_samples, rx_min, rx_avg, rx_max, distance in rows
+    ]
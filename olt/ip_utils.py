@@ -2,8 +2,228 @@
 Funções de validação e utilitários para IPs
 """
 import ipaddress
+import os
+import threading
+import time
+from bisect import bisect_right
+from functools import lru_cache
+import django_rq
+from django.conf import settings
 from django.core.exceptions import ValidationError
 
+# Versão da lista de IPs permitidos no Redis e canal que avisa todos os processos
+ALLOWED_IPS_VERSION_KEY = 'olt:allowed_ips_version'
+ALLOWED_IPS_CHANNEL = 'olt:allowed_ips'
+
+# Sem o listener (Redis indisponível), a versão é consultada no máximo a cada N segundos
+ALLOWED_IPS_VERSION_CHECK_INTERVAL = 5
+# Recompila mesmo sem aviso (alterações feitas direto no banco, sem os sinais)
+ALLOWED_IPS_MAX_AGE = 300
+# Espera entre tentativas de reconectar o listener e intervalo do ping de verificação
+ALLOWED_IPS_LISTENER_RETRY = 5
+ALLOWED_IPS_LISTENER_PING = 60
+
+
+class IPMatcher:
+    """
+    Lista de IPs/CIDRs compilada em intervalos inteiros ordenados e mesclados,
+    separados por versão (IPv4/IPv6). A busca é um bisect: O(log n) por IP.
+    Entradas inválidas são ignoradas (contadas em `invalid`).
+    """
+
+    __slots__ = ('entries', 'invalid', '_starts', '_ends')
+
+    def __init__(self, entries):
+        self.entries = len(entries)
+        self.invalid = 0
+        intervals = {4: [], 6: []}
+        for entry in entries:
+            try:
+                network = ipaddress.ip_network(str(entry).strip(), strict=False)
+            except ValueError:
+                self.invalid += 1
+                continue
+            intervals[network.version].append(
+                (int(network.network_address), int(network.broadcast_address))
+            )
+
+        self._starts = {}
+        self._ends = {}
+        for version, ranges in intervals.items():
+            starts, ends = [], []
+            for start, end in sorted(ranges):
+                # Sobrepostos ou adjacentes viram um único intervalo
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._starts[version] = starts
+            self._ends[version] = ends
+
+    @property
+    def empty(self):
+        """Nenhuma entrada configurada (válida ou não)"""
+        return self.entries == 0
+
+    def matches(self, ip_str):
+        """True se o IP estiver em algum intervalo; IP inválido nunca casa"""
+        try:
+            address = ipaddress.ip_address(ip_str)
+        except ValueError:
+            return False
+        value = int(address)
+        starts = self._starts[address.version]
+        index = bisect_right(starts, value) - 1
+        return index >= 0 and value <= self._ends[address.version][index]
+
+    __contains__ = matches
+
+
+@lru_cache(maxsize=32)
+def compile_ip_matcher(entries):
+    """IPMatcher de uma tupla de entradas (compilado uma vez por lista)"""
+    return IPMatcher(entries)
+
+
+def load_allowed_ips():
+    """
+    IPs ativos do banco de dados.
+    Fallback para settings.ALLOWED_IPS se não houver IPs no banco.
+    """
+    try:
+        # Importa aqui para evitar problemas de circular import
+        from django.apps import apps
+
+        # Verifica se a app e modelo existem (evita erros durante migrations)
+        if apps.ready:
+            AllowedIP = apps.get_model('olt', 'AllowedIP')
+            db_ips = list(AllowedIP.objects.filter(is_active=True).values_list('ip_address', flat=True))
+            if db_ips:
+                return db_ips
+    except Exception:
+        # Em caso de erro (ex: tabela não existe ainda), usa settings
+        pass
+    return list(getattr(settings, 'ALLOWED_IPS', []))
+
+
+def get_allowed_ips_version():
+    """Versão atual no Redis (None se o Redis estiver indisponível)"""
+    try:
+        version = django_rq.get_connection('default').get(ALLOWED_IPS_VERSION_KEY)
+    except Exception:
+        return None
+    return int(version) if version else 0
+
+
+def invalidate_allowed_ips():
+    """
+    Incrementa a versão e avisa todos os processos (web e workers) pelo canal do Redis.
+    O processo atual é invalidado na hora, mesmo sem Redis.
+    """
+    allowed_ips_cache.invalidate()
+    try:
+        connection = django_rq.get_connection('default')
+        version = connection.incr(ALLOWED_IPS_VERSION_KEY)
+        connection.publish(ALLOWED_IPS_CHANNEL, version)
+    except Exception as e:
+        print(f"Erro ao invalidar IPs permitidos: {str(e)}")
+
+
+class AllowedIPsCache:
+    """
+    Cache em dois níveis da lista de IPs permitidos.
+    Nível local: o IPMatcher compilado, em memória no processo (sem I/O por requisição).
+    Nível Redis: versão + canal pub/sub; uma thread por processo escuta o canal e
+    marca o matcher como desatualizado. Sem Redis, a versão é consultada periodicamente.
+    """
+
+    def __init__(self, loader=load_allowed_ips):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._matcher = None
+        self._version = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._stale = True
+        self._listener_pid = None
+        self._listening = False
+
+    def invalidate(self):
+        self._stale = True
+
+    def matcher(self):
+        self._ensure_listener()
+        now = time.monotonic()
+        if not self._listening and now - self._checked_at > ALLOWED_IPS_VERSION_CHECK_INTERVAL:
+            self._checked_at = now
+            if get_allowed_ips_version() != self._version:
+                self._stale = True
+        if self._stale or self._matcher is None or now - self._built_at > ALLOWED_IPS_MAX_AGE:
+            self._rebuild(now)
+        return self._matcher
+
+    def _rebuild(self, now):
+        with self._lock:
+            if not self._stale and self._matcher is not None and now - self._built_at <= ALLOWED_IPS_MAX_AGE:
+                return
+            # Limpa a marca antes de ler: um aviso durante a leitura força nova compilação
+            self._stale = False
+            if not self._listening:
+                self._version = get_allowed_ips_version()
+            self._matcher = compile_ip_matcher(tuple(self._loader()))
+            self._built_at = now
+
+    def _ensure_listener(self):
+        """Inicia o listener uma vez por processo (após o fork do gunicorn/RQ)"""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            self._listening = False
+            self._stale = True
+            threading.Thread(target=self._listen, name='allowed-ips-listener', daemon=True).start()
+
+    def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = django_rq.get_connection('default').pubsub()
+                pubsub.subscribe(ALLOWED_IPS_CHANNEL)
+                # Avisos podem ter sido perdidos enquanto desconectado
+                self._listening = True
+                self._stale = True
+                last_ping = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=ALLOWED_IPS_LISTENER_PING)
+                    if message and message['type'] == 'message':
+                        self._stale = True
+                    if time.monotonic() - last_ping > ALLOWED_IPS_LISTENER_PING:
+                        pubsub.ping()
+                        last_ping = time.monotonic()
+            except Exception as e:
+                print(f"Listener de IPs permitidos desconectado: {str(e)}")
+            finally:
+                self._listening = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(ALLOWED_IPS_LISTENER_RETRY)
+
+
+allowed_ips_cache = AllowedIPsCache()
+
+
+def get_allowed_ips_matcher():
+    """IPMatcher da lista de IPs permitidos (ver AllowedIPsCache)"""
+    return allowed_ips_cache.matcher()
+
+
 def validate_ip_address(ip_str):
     """
     Valida se um IP ou range CIDR é válido
@@ -21,7 +241,6 @@ def validate_and_add_ip(ip_address, description="", force_active=True):
     Retorna (success, message, ip_object)
     """
     from .models import AllowedIP
-    from django.core.cache import cache
     
     # Validar formato
     if not validate_ip_address(ip_address):
@@ -39,11 +258,9 @@ def validate_and_add_ip(ip_address, description="", force_active=True):
                 existing_ip.is_active = True
                 if description:
                     existing_ip.description = description
+                # O sinal post_save invalida a lista em todos os processos
                 existing_ip.save()
                 
-                # Limpar cache
-                cache.delete('allowed_ips_cache')
-                
                 return True, f"🔄 IP {ip_address} reativado com sucesso", existing_ip
         else:
             # Criar novo IP
@@ -53,9 +270,6 @@ def validate_and_add_ip(ip_address, description="", force_active=True):
                 is_active=force_active
             )
             
-            # Limpar cache
-            cache.delete('allowed_ips_cache')
-            
             return True, f"✅ IP {ip_address} adicionado com sucesso", new_ip
             
     except Exception as e:
@@ -63,18 +277,17 @@ def validate_and_add_ip(ip_address, description="", force_active=True):
 
 def force_refresh_allowed_ips():
     """
-    Força a atualização do cache de IPs permitidos
+    Força a atualização do cache de IPs permitidos em todos os processos
     Útil após mudanças manuais na base de dados
     """
-    from django.core.cache import cache
     from .models import AllowedIP
     
     try:
         # Buscar todos os IPs ativos
         active_ips = list(AllowedIP.objects.filter(is_active=True).values_list('ip_address', flat=True))
         
-        # Atualizar cache
-        cache.set('allowed_ips_cache', active_ips, timeout=3600)  # 1 hora
+        # Invalida o matcher local e avisa os demais processos
+        invalidate_allowed_ips()
         
         return True, f"🔄 Cache atualizado com {len(active_ips)} IPs ativos", active_ips
         
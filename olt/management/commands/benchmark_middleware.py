@@ -0,0 +1,100 @@
+"""
+Comando para medir o custo por requisição da instrumentação (métricas, logs e atividade)
+Execução: docker compose exec web python manage.py benchmark_middleware --requests 20000
+
+A view é substituída por uma resposta fixa: o tempo medido é só o dos middlewares.
+Cada pilha é medida com um usuário anônimo e com um autenticado (atividade por usuário).
+
+Para comparar com a pilha anterior, rode o mesmo comando num checkout do commit base
+(o comando só depende do Django):
+    git worktree add ../isp-base <commit anterior ao InstrumentationMiddleware>
+    cp olt/management/commands/benchmark_middleware.py ../isp-base/olt/management/commands/
+    cd ../isp-base && python manage.py benchmark_middleware \
+        --middleware olt.prometheus_views.PrometheusMiddleware \
+        --middleware isp.monitoring_middleware.MonitoringMiddleware \
+        --middleware isp.monitoring_middleware.MetricsCollectionMiddleware
+"""
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+from django.utils.module_loading import import_string
+
+DEFAULT_MIDDLEWARE = ['isp.monitoring_middleware.InstrumentationMiddleware']
+
+
+class Command(BaseCommand):
+    help = 'Mede o overhead por requisição dos middlewares de instrumentação'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20000,
+            help='Quantidade de requisições simuladas (padrão: 20000)',
+        )
+        parser.add_argument(
+            '--path',
+            default='/api/health/liveness/',
+            help='Caminho resolvido nas requisições (padrão: /api/health/liveness/)',
+        )
+        parser.add_argument(
+            '--middleware',
+            action='append',
+            help='Middleware a medir (caminho completo; pode repetir). Padrão: InstrumentationMiddleware',
+        )
+        parser.add_argument(
+            '--streaming',
+            action='store_true',
+            help='Responde com StreamingHttpResponse',
+        )
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        if total <= 0:
+            raise CommandError('--requests deve ser maior que zero')
+
+        try:
+            match = resolve(options['path'])
+        except Resolver404:
+            match = None
+
+        # Usuário em memória: o AuthenticationMiddleware já o teria carregado da sessão
+        users = [
+            ('anônimo', AnonymousUser()),
+            ('autenticado', User(id=1, username='benchmark', is_staff=True)),
+        ]
+        middleware = options['middleware'] or DEFAULT_MIDDLEWARE
+        factory = RequestFactory()
+        self.stdout.write(f'Middlewares: {", ".join(middleware)}')
+
+        for label, user in users:
+            def view(request, user=user):
+                # Simula o handler do Django: a rota já resolvida e o usuário da autenticação
+                request.resolver_match = match
+                request.user = user
+                if options['streaming']:
+                    return StreamingHttpResponse(iter([b'ok']))
+                return HttpResponse(b'ok')
+
+            handler = view
+            for path in reversed(middleware):
+                handler = import_string(path)(handler)
+
+            baseline = self.measure(view, factory, options['path'], total)
+            instrumented = self.measure(handler, factory, options['path'], total)
+            overhead = (instrumented - baseline) / total
+            self.stdout.write(f'\nUsuário {label}')
+            self.stdout.write(f'Sem instrumentação: {baseline / total / 1000:8.2f} µs/req')
+            self.stdout.write(f'Com instrumentação: {instrumented / total / 1000:8.2f} µs/req')
+            self.stdout.write(self.style.SUCCESS(f'Overhead:           {overhead / 1000:8.2f} µs/req'))
+
+    def measure(self, handler, factory, path, total):
+        requests = [factory.get(path, {'page': '1'}, REMOTE_ADDR='10.0.0.1') for _ in range(total)]
+        start = time.perf_counter_ns()
+        for request in requests:
+            handler(request)
+        return time.perf_counter_ns() - start
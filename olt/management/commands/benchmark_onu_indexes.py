@@ -0,0 +1,186 @@
+"""
+Comando para comparar os planos das consultas de ONU com e sem os índices
+Execução: docker compose exec web python manage.py benchmark_onu_indexes --onus 50000
+
+As consultas rodam sobre uma cópia temporária da tabela (CREATE TEMP TABLE ... LIKE
+olt_onu INCLUDING ALL) com as ONUs do banco mais as sintéticas (PON 9/...). A tabela
+real só é lida: os índices removidos são os da cópia, que some no fim da transação.
+"""
+import random
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from olt.models import ONU
+from olt.search import search_onus
+
+SCRATCH_TABLE = 'onu_benchmark'
+INSERT_BATCH_SIZE = 1000
+
+
+def synthetic_onus(total, seed=42):
+    rng = random.Random(seed)
+    vendors = ['ALCL', 'RCMG', 'HWTC', 'TPLG', 'SHLN']
+    onus = []
+    for index in range(total):
+        slot, rest = divmod(index, 16 * 128)
+        pon, position = divmod(rest, 128)
+        down = rng.random() < 0.05
+        onus.append(ONU(
+            pon=f"9/1/{slot + 1}/{pon + 1}",
+            position=position + 1,
+            mac='',
+            serial=f"{rng.choice(vendors)}:{rng.getrandbits(32):08X}",
+            oper_state='down' if down else 'up',
+            admin_state='up',
+            olt_rx_sig=None if down else round(rng.gauss(-23.5, 2.5), 1),
+            ont_olt='0.5',
+            desc1=f"cliente{index:06d}",
+            desc2=f"cliente{index:06d}",
+        ))
+    return onus
+
+
+# (nome, função que monta o queryset)
+QUERIES = [
+    ('pon (listagem da porta)', lambda: ONU.objects.filter(pon='9/1/2/7').order_by('position')),
+    ('pon + position', lambda: ONU.objects.filter(pon='9/1/2/7', position=64)),
+    ('serial exato', lambda: ONU.objects.filter(serial='ALCL:00000000')),
+    ('oper_state = down', lambda: ONU.objects.filter(oper_state='down').values('pon')),
+    ('sinal < -29', lambda: ONU.objects.filter(olt_rx_sig__lt=-29)),
+    ('sinal entre -29 e -27', lambda: ONU.objects.filter(olt_rx_sig__gte=-29, olt_rx_sig__lte=-27)),
+    ('desc1 icontains', lambda: ONU.objects.filter(desc1__icontains='nte01234')),
+    ('serial icontains', lambda: ONU.objects.filter(serial__icontains='3a88')),
+    # A busca real das telas: OR de icontains nos cinco campos (só usa índice se todos tiverem)
+    ('search_onus (5 campos)', lambda: search_onus('nte01234', ranked=False)),
+    ('search_onus serial sem separador', lambda: search_onus('alcl3a88', ranked=False)),
+]
+
+EXECUTION_TIME = re.compile(r'Execution Time: ([\d.]+) ms')
+
+
+class Command(BaseCommand):
+    help = 'Mostra os planos (EXPLAIN ANALYZE) das consultas de ONU com e sem os índices'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--onus',
+            type=int,
+            default=50000,
+            help='Quantidade de ONUs sintéticas (padrão: 50000)',
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Mostra o plano completo em vez de só o nó principal',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Este benchmark depende do Postgres (índices parciais e trigram)')
+
+        with transaction.atomic():
+            self.create_scratch_table()
+            self.stdout.write(f'Criando {options["onus"]} ONUs sintéticas...')
+            self.insert_onus(synthetic_onus(options['onus']))
+            self.analyze()
+            with_indexes = self.run_queries()
+
+            self.drop_scratch_indexes()
+            self.analyze()
+            without_indexes = self.run_queries()
+
+            self.report(with_indexes, without_indexes, options['verbose_plans'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark concluído (tabela temporária descartada)'))
+
+    def create_scratch_table(self):
+        """Cópia de olt_onu com os mesmos índices e restrições, visível só nesta conexão"""
+        table = connection.ops.quote_name(ONU._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE {SCRATCH_TABLE} (LIKE {table} INCLUDING ALL) ON COMMIT DROP'
+            )
+            cursor.execute(f'INSERT INTO {SCRATCH_TABLE} SELECT * FROM {table}')
+            self.stdout.write(f'{cursor.rowcount} ONUs copiadas do banco')
+
+    def insert_onus(self, onus):
+        """
+        Insere as ONUs sintéticas com ids explícitos acima do maior id copiado: o default
+        da coluna copiado pelo LIKE (identity a partir de 1, ou o nextval da sequência
+        real em colunas serial) não é usado.
+        """
+        pk = ONU._meta.pk
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COALESCE(MAX({connection.ops.quote_name(pk.column)}), 0) FROM {SCRATCH_TABLE}')
+            (last_id,) = cursor.fetchone()
+        for offset, onu in enumerate(onus, start=1):
+            onu.pk = last_id + offset
+
+        fields = ONU._meta.concrete_fields
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        row = '(' + ', '.join(['%s'] * len(fields)) + ')'
+        with connection.cursor() as cursor:
+            for start in range(0, len(onus), INSERT_BATCH_SIZE):
+                batch = onus[start:start + INSERT_BATCH_SIZE]
+                params = [getattr(onu, field.attname) for onu in batch for field in fields]
+                cursor.execute(
+                    f'INSERT INTO {SCRATCH_TABLE} ({columns}) VALUES {", ".join([row] * len(batch))}',
+                    params,
+                )
+
+    def drop_scratch_indexes(self):
+        """Remove restrições únicas e índices da cópia (mantém só a chave primária)"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'u'",
+                [SCRATCH_TABLE],
+            )
+            for (name,) in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE {SCRATCH_TABLE} DROP CONSTRAINT {connection.ops.quote_name(name)}')
+            cursor.execute(
+                """
+                SELECT index_class.relname
+                FROM pg_index
+                JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+                WHERE pg_index.indrelid = %s::regclass AND NOT pg_index.indisprimary
+                """,
+                [SCRATCH_TABLE],
+            )
+            for (name,) in cursor.fetchall():
+                cursor.execute(f'DROP INDEX pg_temp.{connection.ops.quote_name(name)}')
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {SCRATCH_TABLE}')
+
+    def run_queries(self):
+        """EXPLAIN ANALYZE do SQL gerado pelo ORM, apontado para a cópia temporária"""
+        table = connection.ops.quote_name(ONU._meta.db_table)
+        results = []
+        with connection.cursor() as cursor:
+            for name, build in QUERIES:
+                sql, params = build().query.sql_with_params()
+                cursor.execute('EXPLAIN ANALYZE ' + sql.replace(table, SCRATCH_TABLE), params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+                match = EXECUTION_TIME.search(plan)
+                results.append((name, plan, float(match.group(1)) if match else 0.0))
+        return results
+
+    def report(self, with_indexes, without_indexes, verbose):
+        for (name, plan_on, time_on), (_, plan_off, time_off) in zip(with_indexes, without_indexes):
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{name}'))
+            self.stdout.write(f'  com índices: {time_on:9.3f} ms  {self.summary(plan_on, verbose)}')
+            self.stdout.write(f'  sem índices: {time_off:9.3f} ms  {self.summary(plan_off, verbose)}')
+
+    def summary(self, plan, verbose):
+        lines = [line for line in plan.splitlines() if line.strip()]
+        if verbose:
+            return '\n    ' + '\n    '.join(lines)
+        # Nós que acessam a tabela ou os índices (Seq Scan / Index Scan / Bitmap ...)
+        scans = [line.strip().lstrip('-> ').split('  (')[0] for line in lines if 'Scan' in line]
+        if scans:
+            return ' / '.join(scans)
+        return lines[0].split('  (')[0] if lines else ''
@@ -0,0 +1,86 @@
+"""
+Comando para medir a vazão dos parsers da CLI da OLT
+Execução: docker compose exec web python manage.py benchmark_parsers --lines 100000
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from olt import parsers
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(parsers.__file__), 'samples')
+
+# (nome, arquivo de amostra, função que consome o texto)
+BENCHMARKS = [
+    ('ont_status', 'ont_status_pon.txt', parsers.parse_ont_status),
+    ('bridge_port_fdb', 'bridge_port_fdb.txt', lambda text: list(parsers.parse_fdb(text.splitlines()))),
+    ('equipment_slot', 'equipment_slot.txt', parsers.parse_slots),
+    ('equipment_temperature', 'equipment_temperature.txt', parsers.parse_temperature),
+]
+
+
+def load_sample(filename):
+    with open(os.path.join(SAMPLES_DIR, filename), encoding='utf-8') as sample:
+        return sample.read()
+
+
+def replicate(text, total_lines):
+    """Repete o corpo da amostra até atingir aproximadamente total_lines linhas"""
+    lines = text.splitlines()
+    copies = max(1, total_lines // max(1, len(lines)))
+    return '\n'.join(lines * copies), len(lines) * copies
+
+
+class Command(BaseCommand):
+    help = 'Mede a vazão (linhas/s) dos parsers da OLT usando as amostras capturadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lines',
+            type=int,
+            default=50000,
+            help='Quantidade aproximada de linhas por amostra (padrão: 50000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Número de repetições; vale o melhor tempo (padrão: 5)',
+        )
+        parser.add_argument(
+            '--min-rate',
+            type=float,
+            default=0,
+            help='Falha se algum parser ficar abaixo desta vazão (linhas/s)',
+        )
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        failures = []
+
+        for name, filename, parse in BENCHMARKS:
+            text, line_count = replicate(load_sample(filename), options['lines'])
+
+            records = 0
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                records = len(parse(text))
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+
+            rate = line_count / best if best else float('inf')
+            self.stdout.write(
+                f'{name:<24} {line_count:>9} linhas  {records:>9} registros  '
+                f'{best * 1000:>9.1f} ms  {rate:>12,.0f} linhas/s'
+            )
+            if options['min_rate'] and rate < options['min_rate']:
+                failures.append(name)
+
+        if failures:
+            raise CommandError(
+                f'Vazão abaixo de {options["min_rate"]:,.0f} linhas/s: {", ".join(failures)}'
+            )
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark concluído'))
@@ -5,7 +5,7 @@ Execução: docker compose exec web python manage.py sync_allowed_ips
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from olt.models import AllowedIP
-from django.core.cache import cache
+from olt.ip_utils import invalidate_allowed_ips
 
 
 class Command(BaseCommand):
@@ -122,7 +122,7 @@ class Command(BaseCommand):
 
         # Limpar cache se solicitado
         if options['clear_cache']:
-            cache.delete('allowed_ips_list')
+            invalidate_allowed_ips()
             self.stdout.write(
                 self.style.SUCCESS('🗑️ Cache limpo!')
             )
@@ -113,8 +113,8 @@ class Command(BaseCommand):
         
         # Limpar cache
         try:
-            from django.core.cache import cache
-            cache.delete('allowed_ips_cache')
+            from olt.ip_utils import invalidate_allowed_ips
+            invalidate_allowed_ips()
             self.stdout.write("🧹 Cache de IPs limpo")
         except Exception as e:
             self.stdout.write(
@@ -0,0 +1,173 @@
+"""
+Métricas de requisições do processo em memória de tamanho fixo: o consumo não cresce
+com o tempo de vida do worker.
+
+- LatencyRing: últimos N tempos de resposta em um array('d') circular
+- LatencyHistogram: buckets logarítmicos (estilo HDR) para p50/p95/p99 desde o início
+- UserCounters: requisições por usuário limitadas aos N usuários mais recentes (LRU)
+"""
+import math
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+# Tempos de resposta recentes guardados no ring buffer
+METRICS_RING_SIZE = 1000
+# Faixa do histograma (segundos) e crescimento de cada bucket (erro relativo ~1%)
+HISTOGRAM_MIN_SECONDS = 0.0001
+HISTOGRAM_MAX_SECONDS = 120.0
+HISTOGRAM_GROWTH = 1.02
+# Usuários com contador próprio; os menos recentes são descartados
+METRICS_MAX_USERS = 500
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyRing:
+    """Últimos N valores em um buffer circular pré-alocado"""
+
+    def __init__(self, size=METRICS_RING_SIZE):
+        self.size = size
+        self.values = array('d', bytes(8 * size))
+        self.position = 0
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def snapshot(self):
+        """Valores guardados, do mais antigo para o mais recente"""
+        if self.count < self.size:
+            return self.values[:self.count]
+        return self.values[self.position:] + self.values[:self.position]
+
+
+class LatencyHistogram:
+    """
+    Contagens em buckets de largura logarítmica: o quantil sai com erro relativo
+    limitado pelo crescimento do bucket, com memória fixa (um array de contadores).
+    """
+
+    def __init__(self, minimum=HISTOGRAM_MIN_SECONDS, maximum=HISTOGRAM_MAX_SECONDS, growth=HISTOGRAM_GROWTH):
+        self.minimum = minimum
+        self.growth = growth
+        self.log_growth = math.log(growth)
+        # Bucket 0 recebe tudo abaixo do mínimo; o último, tudo acima do máximo
+        self.buckets = int(math.ceil(math.log(maximum / minimum) / self.log_growth)) + 2
+        self.counts = array('q', bytes(8 * self.buckets))
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        if value < self.minimum:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.minimum) / self.log_growth) + 1, self.buckets - 1)
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def upper_bound(self, index):
+        if index == 0:
+            return self.minimum
+        return self.minimum * self.growth ** index
+
+    def quantile(self, q):
+        """Limite superior do bucket que contém o quantil q (0 se vazio)"""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= rank:
+                return min(self.upper_bound(index), self.max)
+        return self.max
+
+
+class UserCounters:
+    """Requisições por usuário, limitadas aos usuários vistos mais recentemente"""
+
+    def __init__(self, max_users=METRICS_MAX_USERS):
+        self.max_users = max_users
+        self.counts = OrderedDict()
+        self.evicted = 0
+
+    def add(self, user_key):
+        count = self.counts.pop(user_key, 0) + 1
+        self.counts[user_key] = count
+        if len(self.counts) > self.max_users:
+            self.counts.popitem(last=False)
+            self.evicted += 1
+
+    def top(self, limit=10):
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class RequestMetricsStore:
+    """Totais, latências e requisições por usuário deste processo"""
+
+    def __init__(self, ring_size=METRICS_RING_SIZE, max_users=METRICS_MAX_USERS):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.request_count = 0
+        self.error_count = 0
+        self.api_calls = 0
+        self.recent = LatencyRing(ring_size)
+        self.histogram = LatencyHistogram()
+        self.users = UserCounters(max_users)
+
+    def record(self, duration_seconds, status_code, is_api, user_id=None, username=None):
+        with self._lock:
+            self.request_count += 1
+            if status_code >= 400:
+                self.error_count += 1
+            if is_api:
+                self.api_calls += 1
+            self.recent.add(duration_seconds)
+            self.histogram.add(duration_seconds)
+            if user_id is not None:
+                self.users.add(f"{user_id}:{username}")
+
+    def snapshot(self):
+        with self._lock:
+            recent = self.recent.snapshot()
+            histogram = self.histogram
+            return {
+                'pid': os.getpid(),
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'request_count': self.request_count,
+                'error_count': self.error_count,
+                'api_calls': self.api_calls,
+                'response_time': {
+                    'avg_ms': round(histogram.sum / histogram.total * 1000, 2) if histogram.total else 0,
+                    'max_ms': round(histogram.max * 1000, 2),
+                    'quantiles_ms': {
+                        f'p{int(q * 100)}': round(histogram.quantile(q) * 1000, 2) for q in QUANTILES
+                    },
+                },
+                'recent_response_time': {
+                    'samples': len(recent),
+                    'avg_ms': round(sum(recent) / len(recent) * 1000, 2) if recent else 0,
+                    'max_ms': round(max(recent) * 1000, 2) if recent else 0,
+                },
+                'users': {
+                    'tracked': len(self.users.counts),
+                    'evicted': self.users.evicted,
+                    'top': [
+                        {'user': user_key, 'request_count': count}
+                        for user_key, count in self.users.top()
+                    ],
+                },
+            }
+
+
+request_metrics = RequestMetricsStore()
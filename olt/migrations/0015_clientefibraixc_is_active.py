@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olt', '0014_alter_onu_olt_rx_sig'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientefibraixc',
+            name='is_active',
+            field=models.BooleanField(default=True, verbose_name='Ativo'),
+        ),
+    ]
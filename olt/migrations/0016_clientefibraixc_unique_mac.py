@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:50
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicated_macs(apps, schema_editor):
+    """Mantém apenas o registro mais recente (maior id) de cada MAC antes de criar a restrição única"""
+    ClienteFibraIxc = apps.get_model('olt', 'ClienteFibraIxc')
+    duplicated = (
+        ClienteFibraIxc.objects.values('mac')
+        .annotate(total=Count('id'), keep_id=Max('id'))
+        .filter(total__gt=1)
+    )
+    for row in duplicated:
+        ClienteFibraIxc.objects.filter(mac=row['mac']).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olt', '0015_clientefibraixc_is_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientefibraixc',
+            name='last_synced',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Última sincronização'),
+        ),
+        migrations.RunPython(remove_duplicated_macs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='clientefibraixc',
+            name='mac',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olt', '0016_clientefibraixc_unique_mac'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IxcSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Último ID importado')),
+                ('last_full_sync', models.DateTimeField(blank=True, null=True, verbose_name='Última sincronização completa')),
+                ('last_incremental_sync', models.DateTimeField(blank=True, null=True, verbose_name='Última sincronização incremental')),
+            ],
+            options={
+                'verbose_name': 'Estado da Sincronização IXC',
+                'verbose_name_plural': 'Estado da Sincronização IXC',
+            },
+        ),
+    ]
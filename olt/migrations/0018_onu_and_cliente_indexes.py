@@ -0,0 +1,75 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:53
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.functions.text
+
+
+def remove_duplicated_positions(apps, schema_editor):
+    """Mantém só a ONU mais recente (maior id) de cada (pon, position) antes da restrição única"""
+    ONU = apps.get_model('olt', 'ONU')
+    duplicated = (
+        ONU.objects.values('pon', 'position')
+        .annotate(total=Count('id'), keep_id=Max('id'))
+        .filter(total__gt=1)
+    )
+    for row in duplicated:
+        ONU.objects.filter(pon=row['pon'], position=row['position']).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olt', '0017_ixcsyncstate'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(remove_duplicated_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='clientefibraixc',
+            index=models.Index(fields=['nome'], name='olt_cliente_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientefibraixc',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nome'), name='gin_trgm_ops'), name='olt_cliente_nome_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='clientefibraixc',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('mac'), name='gin_trgm_ops'), name='olt_cliente_mac_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='onu',
+            index=models.Index(fields=['serial'], name='olt_onu_serial_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onu',
+            index=models.Index(condition=models.Q(('oper_state', 'down')), fields=['pon'], name='olt_onu_down_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onu',
+            index=models.Index(condition=models.Q(('olt_rx_sig__lt', -25)), fields=['olt_rx_sig'], name='olt_onu_low_signal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onu',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('serial'), name='gin_trgm_ops'), name='olt_onu_serial_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='onu',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('mac'), name='gin_trgm_ops'), name='olt_onu_mac_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='onu',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('desc1'), name='gin_trgm_ops'), name='olt_onu_desc1_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='onu',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('desc2'), name='gin_trgm_ops'), name='olt_onu_desc2_trgm'),
+        ),
+        migrations.AddConstraint(
+            model_name='onu',
+            constraint=models.UniqueConstraint(fields=('pon', 'position'), name='olt_onu_pon_position_uniq'),
+        ),
+    ]
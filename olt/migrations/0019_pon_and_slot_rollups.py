@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olt', '0018_onu_and_cliente_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PonRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+                ('online', models.IntegerField(default=0, verbose_name='Online')),
+                ('offline', models.IntegerField(default=0, verbose_name='Offline')),
+                ('clientes_fibra', models.IntegerField(default=0, verbose_name='Clientes Fibra')),
+                ('without_mac', models.IntegerField(default=0, verbose_name='Sem MAC')),
+                ('low_signal', models.IntegerField(default=0, verbose_name='Sinal < -25')),
+                ('signal_27_29', models.IntegerField(default=0, verbose_name='Sinal entre -27 e -29')),
+                ('signal_below_29', models.IntegerField(default=0, verbose_name='Sinal < -29')),
+                ('rx_count', models.IntegerField(default=0, verbose_name='ONUs com sinal')),
+                ('rx_min', models.FloatField(blank=True, null=True, verbose_name='Sinal mínimo')),
+                ('rx_avg', models.FloatField(blank=True, null=True, verbose_name='Sinal médio')),
+                ('rx_max', models.FloatField(blank=True, null=True, verbose_name='Sinal máximo')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('pon', models.CharField(max_length=20, unique=True, verbose_name='PON')),
+                ('slot', models.IntegerField(verbose_name='Slot')),
+                ('port', models.IntegerField(verbose_name='Porta')),
+            ],
+            options={
+                'verbose_name': 'Resumo por PON',
+                'verbose_name_plural': 'Resumos por PON',
+                'ordering': ['slot', 'port'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SlotRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+                ('online', models.IntegerField(default=0, verbose_name='Online')),
+                ('offline', models.IntegerField(default=0, verbose_name='Offline')),
+                ('clientes_fibra', models.IntegerField(default=0, verbose_name='Clientes Fibra')),
+                ('without_mac', models.IntegerField(default=0, verbose_name='Sem MAC')),
+                ('low_signal', models.IntegerField(default=0, verbose_name='Sinal < -25')),
+                ('signal_27_29', models.IntegerField(default=0, verbose_name='Sinal entre -27 e -29')),
+                ('signal_below_29', models.IntegerField(default=0, verbose_name='Sinal < -29')),
+                ('rx_count', models.IntegerField(default=0, verbose_name='ONUs com sinal')),
+                ('rx_min', models.FloatField(blank=True, null=True, verbose_name='Sinal mínimo')),
+                ('rx_avg', models.FloatField(blank=True, null=True, verbose_name='Sinal médio')),
+                ('rx_max', models.FloatField(blank=True, null=True, verbose_name='Sinal máximo')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('slot', models.IntegerField(unique=True, verbose_name='Slot')),
+                ('pons', models.IntegerField(default=0, verbose_name='PONs com ONUs')),
+            ],
+            options={
+                'verbose_name': 'Resumo por Slot',
+                'verbose_name_plural': 'Resumos por Slot',
+                'ordering': ['slot'],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olt', '0019_pon_and_slot_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OnuSignalSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('time', models.DateTimeField(verbose_name='Coletado em')),
+                ('rx_sig', models.SmallIntegerField(blank=True, null=True, verbose_name='OLT RX (décimos de dB)')),
+                ('distance', models.IntegerField(blank=True, null=True, verbose_name='Distância (m)')),
+                ('online', models.BooleanField(default=False, verbose_name='Online')),
+                ('onu', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='signal_samples', to='olt.onu', verbose_name='ONU')),
+            ],
+            options={
+                'verbose_name': 'Amostra de Sinal',
+                'verbose_name_plural': 'Amostras de Sinal',
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['time'], name='olt_signal_time_brin'), models.Index(fields=['onu', 'time'], name='olt_signal_onu_time_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OnuSignalRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('hour', 'Hora'), ('day', 'Dia')], max_length=4, verbose_name='Resolução')),
+                ('bucket', models.DateTimeField(verbose_name='Início do período')),
+                ('samples', models.IntegerField(default=0, verbose_name='Amostras')),
+                ('online_samples', models.IntegerField(default=0, verbose_name='Amostras online')),
+                ('rx_min', models.SmallIntegerField(blank=True, null=True, verbose_name='RX mínimo (décimos de dB)')),
+                ('rx_avg', models.SmallIntegerField(blank=True, null=True, verbose_name='RX médio (décimos de dB)')),
+                ('rx_max', models.SmallIntegerField(blank=True, null=True, verbose_name='RX máximo (décimos de dB)')),
+                ('distance', models.IntegerField(blank=True, null=True, verbose_name='Distância máxima (m)')),
+                ('onu', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='signal_rollups', to='olt.onu', verbose_name='ONU')),
+            ],
+            options={
+                'verbose_name': 'Histórico Agregado de Sinal',
+                'verbose_name_plural': 'Históricos Agregados de Sinal',
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['bucket'], name='olt_signal_rollup_bucket_brin')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='onusignalrollup',
+            constraint=models.UniqueConstraint(fields=('onu', 'resolution', 'bucket'), name='olt_signal_rollup_uniq'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olt', '0020_onu_signal_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignalDegradation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('onu', 'ONU'), ('pon', 'PON')], max_length=3, verbose_name='Tipo')),
+                ('pon', models.CharField(max_length=20, verbose_name='PON')),
+                ('samples', models.IntegerField(default=0, verbose_name='Leituras na janela')),
+                ('slope', models.FloatField(verbose_name='Tendência (dB/dia)')),
+                ('delta', models.FloatField(verbose_name='Variação (dB)')),
+                ('rx_baseline', models.FloatField(blank=True, null=True, verbose_name='Sinal de referência (mediana)')),
+                ('rx_last', models.FloatField(blank=True, null=True, verbose_name='Último sinal')),
+                ('onus_affected', models.IntegerField(default=0, verbose_name='ONUs em queda')),
+                ('onus_total', models.IntegerField(default=0, verbose_name='ONUs analisadas')),
+                ('first_detected', models.DateTimeField(verbose_name='Detectada em')),
+                ('last_detected', models.DateTimeField(verbose_name='Última detecção')),
+                ('onu', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='signal_degradations', to='olt.onu', verbose_name='ONU')),
+            ],
+            options={
+                'verbose_name': 'Degradação de Sinal',
+                'verbose_name_plural': 'Degradações de Sinal',
+                'ordering': ['delta'],
+            },
+        ),
+    ]
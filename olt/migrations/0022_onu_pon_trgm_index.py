@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:19
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('olt', '0021_signal_degradation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='onu',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('pon'), name='gin_trgm_ops'), name='olt_onu_pon_trgm'),
+        ),
+    ]
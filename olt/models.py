@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.core.exceptions import ValidationError
 import ipaddress
@@ -40,6 +43,22 @@ class ONU(models.Model):
     class Meta:
         verbose_name = "ONU"
         verbose_name_plural = ("ONUs")
+        constraints = [
+            # Uma posição da PON só pode ter uma ONU; também atende os filtros por pon
+            models.UniqueConstraint(fields=['pon', 'position'], name='olt_onu_pon_position_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['serial'], name='olt_onu_serial_idx'),
+            # Parciais: só as ONUs offline / com sinal baixo (contagens do dashboard e alertas)
+            models.Index(fields=['pon'], condition=Q(oper_state='down'), name='olt_onu_down_idx'),
+            models.Index(fields=['olt_rx_sig'], condition=Q(olt_rx_sig__lt=-25), name='olt_onu_low_signal_idx'),
+            # Trigram sobre UPPER(campo), a mesma expressão gerada pelo icontains no Postgres
+            GinIndex(OpClass(Upper('serial'), name='gin_trgm_ops'), name='olt_onu_serial_trgm'),
+            GinIndex(OpClass(Upper('mac'), name='gin_trgm_ops'), name='olt_onu_mac_trgm'),
+            GinIndex(OpClass(Upper('desc1'), name='gin_trgm_ops'), name='olt_onu_desc1_trgm'),
+            GinIndex(OpClass(Upper('desc2'), name='gin_trgm_ops'), name='olt_onu_desc2_trgm'),
+            GinIndex(OpClass(Upper('pon'), name='gin_trgm_ops'), name='olt_onu_pon_trgm'),
+        ]
     
     def __str__(self) -> str:
         return f"{ self.serial }"
@@ -77,22 +96,212 @@ class PlacaOnu(models.Model):
         return f"{self.chassi}/{self.position}"
     
 class ClienteFibraIxc(models.Model):
-    mac = models.CharField(max_length=255)
+    mac = models.CharField(max_length=255, unique=True)
     nome = models.CharField(max_length=255)
     latitude = models.CharField(max_length=50, blank=True, null=True)
     longitude = models.CharField(max_length=50, blank=True, null=True)
     endereco = models.TextField(blank=True, null=True)
     id_caixa_ftth = models.CharField(max_length=50, blank=True, null=True)
     is_active = models.BooleanField(default=True, verbose_name="Ativo")
+    last_synced = models.DateTimeField(blank=True, null=True, verbose_name="Última sincronização")
 
     class Meta:
         verbose_name = "Cliente Fibra"
         verbose_name_plural = "Clientes Fibra"
+        indexes = [
+            models.Index(fields=['nome'], name='olt_cliente_nome_idx'),
+            GinIndex(OpClass(Upper('nome'), name='gin_trgm_ops'), name='olt_cliente_nome_trgm'),
+            GinIndex(OpClass(Upper('mac'), name='gin_trgm_ops'), name='olt_cliente_mac_trgm'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.nome}"
 
 
+class IxcSyncState(models.Model):
+    """Estado da sincronização de clientes fibra com o IXC (registro único)"""
+
+    # Maior id de radpop_radio_cliente_fibra já importado (high-water mark)
+    last_id = models.BigIntegerField(default=0, verbose_name="Último ID importado")
+    last_full_sync = models.DateTimeField(blank=True, null=True, verbose_name="Última sincronização completa")
+    last_incremental_sync = models.DateTimeField(blank=True, null=True, verbose_name="Última sincronização incremental")
+
+    class Meta:
+        verbose_name = "Estado da Sincronização IXC"
+        verbose_name_plural = "Estado da Sincronização IXC"
+
+    def __str__(self):
+        return f"IXC Sync - último id {self.last_id}"
+
+    @classmethod
+    def load(cls):
+        state, _ = cls.objects.get_or_create(pk=1)
+        return state
+
+
+class OnuRollupBase(models.Model):
+    """Contadores de ONUs pré-agregados (atualizados a cada coleta)"""
+
+    total = models.IntegerField(verbose_name="Total", default=0)
+    online = models.IntegerField(verbose_name="Online", default=0)
+    offline = models.IntegerField(verbose_name="Offline", default=0)
+    clientes_fibra = models.IntegerField(verbose_name="Clientes Fibra", default=0)
+    without_mac = models.IntegerField(verbose_name="Sem MAC", default=0)
+    low_signal = models.IntegerField(verbose_name="Sinal < -25", default=0)
+    signal_27_29 = models.IntegerField(verbose_name="Sinal entre -27 e -29", default=0)
+    signal_below_29 = models.IntegerField(verbose_name="Sinal < -29", default=0)
+    rx_count = models.IntegerField(verbose_name="ONUs com sinal", default=0)
+    rx_min = models.FloatField(verbose_name="Sinal mínimo", null=True, blank=True)
+    rx_avg = models.FloatField(verbose_name="Sinal médio", null=True, blank=True)
+    rx_max = models.FloatField(verbose_name="Sinal máximo", null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        abstract = True
+
+
+class PonRollup(OnuRollupBase):
+    pon = models.CharField(verbose_name="PON", max_length=20, unique=True)
+    slot = models.IntegerField(verbose_name="Slot")
+    port = models.IntegerField(verbose_name="Porta")
+
+    class Meta:
+        verbose_name = "Resumo por PON"
+        verbose_name_plural = "Resumos por PON"
+        ordering = ['slot', 'port']
+
+    def __str__(self):
+        return f"{self.pon}: {self.online}/{self.total}"
+
+
+class SlotRollup(OnuRollupBase):
+    slot = models.IntegerField(verbose_name="Slot", unique=True)
+    pons = models.IntegerField(verbose_name="PONs com ONUs", default=0)
+
+    class Meta:
+        verbose_name = "Resumo por Slot"
+        verbose_name_plural = "Resumos por Slot"
+        ordering = ['slot']
+
+    def __str__(self):
+        return f"Slot {self.slot}: {self.online}/{self.total}"
+
+
+class OnuSignalSample(models.Model):
+    """
+    Histórico de sinal e estado das ONUs: uma linha por ONU a cada coleta, somente inserção.
+    Sinal em décimos de dB e distância em metros para manter as linhas pequenas.
+    Sem chave estrangeira no banco: remover ONUs não toca no histórico (limpo pela retenção).
+    """
+    time = models.DateTimeField(verbose_name="Coletado em")
+    onu = models.ForeignKey(
+        ONU,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='signal_samples',
+        verbose_name="ONU",
+    )
+    rx_sig = models.SmallIntegerField(verbose_name="OLT RX (décimos de dB)", null=True, blank=True)
+    distance = models.IntegerField(verbose_name="Distância (m)", null=True, blank=True)
+    online = models.BooleanField(verbose_name="Online", default=False)
+
+    class Meta:
+        verbose_name = "Amostra de Sinal"
+        verbose_name_plural = "Amostras de Sinal"
+        indexes = [
+            # BRIN: poucas páginas de índice para uma tabela inserida em ordem de tempo
+            BrinIndex(fields=['time'], name='olt_signal_time_brin'),
+            models.Index(fields=['onu', 'time'], name='olt_signal_onu_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.onu_id} @ {self.time}: {self.rx_sig}"
+
+
+class OnuSignalRollup(models.Model):
+    """Histórico de sinal agregado por hora ou por dia (retido por mais tempo que as amostras)"""
+    HOUR = 'hour'
+    DAY = 'day'
+    RESOLUTION_CHOICES = [
+        (HOUR, 'Hora'),
+        (DAY, 'Dia'),
+    ]
+
+    resolution = models.CharField(verbose_name="Resolução", max_length=4, choices=RESOLUTION_CHOICES)
+    bucket = models.DateTimeField(verbose_name="Início do período")
+    onu = models.ForeignKey(
+        ONU,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='signal_rollups',
+        verbose_name="ONU",
+    )
+    samples = models.IntegerField(verbose_name="Amostras", default=0)
+    online_samples = models.IntegerField(verbose_name="Amostras online", default=0)
+    rx_min = models.SmallIntegerField(verbose_name="RX mínimo (décimos de dB)", null=True, blank=True)
+    rx_avg = models.SmallIntegerField(verbose_name="RX médio (décimos de dB)", null=True, blank=True)
+    rx_max = models.SmallIntegerField(verbose_name="RX máximo (décimos de dB)", null=True, blank=True)
+    distance = models.IntegerField(verbose_name="Distância máxima (m)", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Histórico Agregado de Sinal"
+        verbose_name_plural = "Históricos Agregados de Sinal"
+        constraints = [
+            # Também atende a leitura da série de uma ONU (onu, resolution, intervalo de bucket)
+            models.UniqueConstraint(fields=['onu', 'resolution', 'bucket'], name='olt_signal_rollup_uniq'),
+        ]
+        indexes = [
+            BrinIndex(fields=['bucket'], name='olt_signal_rollup_bucket_brin'),
+        ]
+
+    def __str__(self):
+        return f"{self.onu_id} {self.resolution} {self.bucket}: {self.rx_avg}"
+
+
+class SignalDegradation(models.Model):
+    """
+    Queda de sinal detectada na janela recente do histórico, por ONU ou por PON inteira
+    (várias ONUs caindo juntas indicam problema na fibra alimentadora).
+    Reflete a última análise: a linha é removida quando o sinal normaliza.
+    """
+    KIND_ONU = 'onu'
+    KIND_PON = 'pon'
+    KIND_CHOICES = [
+        (KIND_ONU, 'ONU'),
+        (KIND_PON, 'PON'),
+    ]
+
+    kind = models.CharField(verbose_name="Tipo", max_length=3, choices=KIND_CHOICES)
+    pon = models.CharField(verbose_name="PON", max_length=20)
+    onu = models.ForeignKey(
+        ONU,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='signal_degradations',
+        verbose_name="ONU",
+    )
+    samples = models.IntegerField(verbose_name="Leituras na janela", default=0)
+    slope = models.FloatField(verbose_name="Tendência (dB/dia)")
+    delta = models.FloatField(verbose_name="Variação (dB)")
+    rx_baseline = models.FloatField(verbose_name="Sinal de referência (mediana)", null=True, blank=True)
+    rx_last = models.FloatField(verbose_name="Último sinal", null=True, blank=True)
+    onus_affected = models.IntegerField(verbose_name="ONUs em queda", default=0)
+    onus_total = models.IntegerField(verbose_name="ONUs analisadas", default=0)
+    first_detected = models.DateTimeField(verbose_name="Detectada em")
+    last_detected = models.DateTimeField(verbose_name="Última detecção")
+
+    class Meta:
+        verbose_name = "Degradação de Sinal"
+        verbose_name_plural = "Degradações de Sinal"
+        ordering = ['delta']
+
+    def __str__(self):
+        target = self.pon if self.kind == self.KIND_PON else f"{self.pon} ONU {self.onu_id}"
+        return f"{target}: {self.delta:+.1f} dB"
+
+
 class OltSystemInfo(models.Model):
     """Model para armazenar informações do sistema OLT"""
     
@@ -0,0 +1,26 @@
+"""
+Consultas sobre o inventário de ONUs
+"""
+from django.db.models import Count
+
+from .models import ONU
+
+
+def duplicated_serials():
+    """Subconsulta com os seriais que aparecem em mais de uma ONU (GROUP BY serial HAVING COUNT > 1)"""
+    return (
+        ONU.objects.values('serial')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .values('serial')
+    )
+
+
+def get_duplicated_onus(queryset=None):
+    """
+    ONUs cujo serial está cadastrado em mais de uma posição, em uma única consulta.
+    A duplicidade é sempre avaliada sobre todas as ONUs; queryset só restringe o resultado.
+    """
+    if queryset is None:
+        queryset = ONU.objects.all()
+    return queryset.filter(serial__in=duplicated_serials())
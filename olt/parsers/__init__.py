@@ -0,0 +1,14 @@
+"""
+Parsers da saída da CLI da OLT (Nokia ISAM)
+"""
+from .records import OntStatusRecord, FdbEntry, SlotRecord, TemperatureRecord
+from .nokia import (
+    parse_ont_status,
+    parse_fdb_line,
+    parse_fdb,
+    parse_mac_table,
+    parse_isam_release,
+    parse_uptime,
+    parse_slots,
+    parse_temperature,
+)
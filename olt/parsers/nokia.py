@@ -0,0 +1,189 @@
+"""
+Parsers da saída da CLI da Nokia ISAM.
+Os padrões são compilados uma única vez no carregamento do módulo e as
+tabelas de largura fixa são fatiadas pelas colunas do cabeçalho quando ele existe.
+"""
+import re
+
+from .records import OntStatusRecord, FdbEntry, SlotRecord, TemperatureRecord
+
+
+# Início de uma linha de ONU: pon, ont (com a posição) e sernum
+ONT_ROW_PATTERN = re.compile(r'^\s*(\d+/\d+/\d+/\d+)\s+\d+/\d+/\d+/\d+/(\d+)\s+\S+:\S+\s')
+
+# Bridge port rack/shelf/slot/pon/ont/x/y, vlan e MAC
+FDB_PATTERN = re.compile(
+    r'(\d+)/(\d+)/(\d+)/(\d+)/(\d+)/\d+/\d+\s+(\d+)\s+([0-9a-f]{2}(?::[0-9a-f]{2}){5})',
+    re.IGNORECASE
+)
+
+MAC_TABLE_PATTERN = re.compile(
+    r"(\d+/\d+/\d+/\d+/\d+/\d+/\d+)\s+(\d+)\s+([a-f0-9:]+)\s+(\d+)\s+(\w+)\s+([0-9:]+)"
+)
+
+ISAM_RELEASE_PATTERN = re.compile(r'isam-release\s*:\s*(\S+)')
+UPTIME_PATTERN = re.compile(r'(\d+)\s+days?,\s+(\d+):(\d+):(\d+)')
+
+SLOT_PREFIXES = ('acu:', 'nt-', 'lt:', 'vlt:')
+TEMPERATURE_PREFIXES = ('nt-', 'lt:', 'acu:')
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _desc_columns(header):
+    """Posições (início desc1, início desc2, fim desc2) a partir do cabeçalho da tabela"""
+    desc1 = header.find('desc1')
+    desc2 = header.find('desc2')
+    if desc1 < 0 or desc2 < desc1:
+        return None
+    next_column = re.search(r'\S', header[desc2 + len('desc2'):])
+    end = desc2 + len('desc2') + next_column.start() if next_column else None
+    return desc1, desc2, end
+
+
+def parse_ont_status(output):
+    """
+    Interpreta a tabela de `show equipment ont status pon 1/1/{slot}/{pon}`.
+
+    Exemplo de linha (ver samples/ont_status_pon.txt):
+        1/1/1/14   1/1/1/14/90    RCMG:3A88390E up       up       -23.0       0.5           tomazpaiva    tomazpaiva    undefined
+
+    As descrições podem vir vazias; com cabeçalho, elas são lidas pelas colunas
+    fixas dele, sem cabeçalho, pela quantidade de campos restantes na linha.
+    """
+    records = []
+    columns = None
+    for line in output.splitlines():
+        match = ONT_ROW_PATTERN.match(line)
+        if match is None:
+            if 'sernum' in line and 'desc1' in line:
+                columns = _desc_columns(line)
+            continue
+
+        fields = line.split(None, 7)
+        if len(fields) < 7:
+            continue
+        rest = fields[7] if len(fields) > 7 else ''
+
+        if columns is not None and len(line) > columns[0] and line[columns[0] - 1] == ' ':
+            desc1_start, desc2_start, desc2_end = columns
+            desc1 = line[desc1_start:desc2_start].strip()
+            desc2 = line[desc2_start:desc2_end].strip()
+        else:
+            # Sem cabeçalho: desc1, desc2 e o último campo (hostname)
+            extra = rest.split()
+            desc1 = extra[0] if len(extra) >= 2 else ''
+            desc2 = extra[1] if len(extra) >= 3 else ''
+
+        records.append(OntStatusRecord(
+            match.group(1),
+            int(match.group(2)),
+            fields[2],
+            fields[3],
+            fields[4],
+            _parse_float(fields[5]),
+            fields[6],
+            desc1,
+            desc2,
+        ))
+    return records
+
+
+def parse_fdb_line(line):
+    """Interpreta uma linha de `show vlan bridge-port-fdb` (None se não for de ONU)"""
+    if ':' not in line:
+        return None
+    match = FDB_PATTERN.search(line)
+    if match is None:
+        return None
+    rack, shelf, slot, pon, position, vlan, mac = match.groups()
+    return FdbEntry(
+        f"{rack}/{shelf}/{slot}/{pon}/{position}",
+        f"{rack}/{shelf}/{slot}/{pon}",
+        int(position),
+        int(vlan),
+        mac,
+    )
+
+
+def parse_fdb(lines):
+    """Gera as entradas do FDB a partir de qualquer iterável de linhas (inclusive streaming)"""
+    for line in lines:
+        entry = parse_fdb_line(line)
+        if entry is not None:
+            yield entry
+
+
+def parse_mac_table(data):
+    """Tabela de MACs indexada pela bridge port"""
+    data_dict = {}
+    for match in MAC_TABLE_PATTERN.findall(data):
+        parts = match[0].split('/')
+        data_dict[match[0]] = {
+            'pon': '/'.join(parts[:4]),
+            'position': parts[-3] if len(parts) > 3 else None,
+            'mac_address': match[2],
+            'status_2': match[3],
+            'learned': match[4],
+            'time': match[5]
+        }
+    return data_dict
+
+
+def parse_isam_release(output):
+    match = ISAM_RELEASE_PATTERN.search(output)
+    return match.group(1) if match else "Unknown"
+
+
+def parse_uptime(output):
+    match = UPTIME_PATTERN.search(output)
+    if match:
+        days, hours, minutes, seconds = (int(value) for value in match.groups())
+    else:
+        days = hours = minutes = seconds = 0
+    return {
+        'days': days,
+        'hours': hours,
+        'minutes': minutes,
+        'seconds': seconds,
+        'raw': output.strip()
+    }
+
+
+def parse_slots(output):
+    """Interpreta `show equipment slot`"""
+    slots = []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) < 6 or not parts[0].startswith(SLOT_PREFIXES):
+            continue
+        slots.append(SlotRecord(
+            parts[0],
+            parts[1],
+            parts[2].lower() == 'yes',
+            parts[3],
+            parts[4],
+            int(parts[5]) if parts[5].isdigit() else 0,
+        ))
+    return slots
+
+
+def parse_temperature(output):
+    """Interpreta `show equipment temperature`"""
+    temperatures = []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) < 7 or not parts[0].startswith(TEMPERATURE_PREFIXES):
+            continue
+        try:
+            values = [int(value) for value in parts[1:7]]
+        except ValueError:
+            # Pular linhas com valores não numéricos
+            continue
+        temperatures.append(TemperatureRecord(parts[0], *values))
+    return temperatures
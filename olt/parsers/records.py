@@ -0,0 +1,48 @@
+"""
+Registros leves (com __slots__) produzidos pelos parsers da saída da OLT
+"""
+
+
+class Record:
+    """Base dos registros: atributos fixos e conversão para dicionário"""
+
+    __slots__ = ()
+
+    def __init__(self, *args):
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
+
+
+class OntStatusRecord(Record):
+    """Linha de `show equipment ont status pon`"""
+
+    __slots__ = ('pon', 'position', 'sernum', 'admin_status', 'oper_status',
+                 'olt_rx_sig', 'ont_olt', 'desc1', 'desc2')
+
+
+class FdbEntry(Record):
+    """Linha de `show vlan bridge-port-fdb` associada a uma ONU"""
+
+    __slots__ = ('bridge_port', 'pon', 'position', 'vlan', 'mac')
+
+
+class SlotRecord(Record):
+    """Linha de `show equipment slot`"""
+
+    __slots__ = ('slot_name', 'actual_type', 'enabled', 'error_status', 'availability', 'restart_count')
+
+
+class TemperatureRecord(Record):
+    """Linha de `show equipment temperature`"""
+
+    __slots__ = ('slot_name', 'sensor_id', 'actual_temp', 'tca_low', 'tca_high', 'shutdown_low', 'shutdown_high')
@@ -1,16 +1,15 @@
-import time
 import logging
+import time
 from django.http import HttpResponse
-from django.urls import resolve
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 from prometheus_client.core import CollectorRegistry
 from django.db import connection
-from django.core.cache import cache
-from django.contrib.auth.models import User
 import psutil
 
+from . import activity
+
 # Registry personalizado para evitar conflitos
 registry = CollectorRegistry()
 
@@ -128,42 +127,8 @@ def prometheus_metrics(request):
 def update_user_metrics():
     """Atualizar métricas de usuários ativos"""
     try:
-        from datetime import datetime, timedelta
-        
-        # Obter todas as chaves de atividade de usuário do cache
-        cache_keys = []
-        if hasattr(cache, '_cache') and hasattr(cache._cache, 'keys'):
-            # Para backends que suportam keys()
-            try:
-                cache_keys = [k for k in cache._cache.keys() if k.startswith('user_activity:')]
-            except:
-                pass
-        
-        # Se não conseguir obter as chaves, usar uma abordagem alternativa
-        if not cache_keys:
-            # Buscar usuários que fizeram login recentemente
-            recent_users = User.objects.filter(
-                last_login__gte=datetime.now() - timedelta(hours=1)
-            ).values_list('id', flat=True)
-            
-            cache_keys = [f'user_activity:{user_id}' for user_id in recent_users]
-        
-        active_users = 0
-        current_time = datetime.now()
-        
-        for cache_key in cache_keys:
-            user_data = cache.get(cache_key)
-            if user_data:
-                # Verificar se o usuário esteve ativo na última hora
-                try:
-                    last_seen = datetime.fromisoformat(user_data['last_seen'])
-                    if current_time - last_seen <= timedelta(hours=1):
-                        active_users += 1
-                except (ValueError, KeyError):
-                    continue
-        
-        # Atualizar métrica de usuários ativos
-        active_users_count.set(active_users)
+        # Usuários com acesso na última hora (sorted set de último acesso no Redis)
+        active_users_count.set(activity.count_active_users(time.time() - 3600))
         
     except Exception as e:
         logger.error(f"Erro ao atualizar métricas de usuários: {str(e)}")
@@ -204,14 +169,14 @@ def update_system_metrics():
 def update_application_metrics():
     """Atualizar métricas específicas da aplicação"""
     try:
-        from .models import ONU, OltTemperature
+        from .models import OltTemperature
+        from .rollups import totals
         
-        # Métricas das ONUs
-        onus_online = ONU.objects.filter(oper_state='up').count()
-        onus_offline = ONU.objects.filter(oper_state='down').count()
+        # Métricas das ONUs (a partir dos resumos por slot)
+        onus = totals()
         
-        olt_onus_total.labels(status='online').set(onus_online)
-        olt_onus_total.labels(status='offline').set(onus_offline)
+        olt_onus_total.labels(status='online').set(onus['online'])
+        olt_onus_total.labels(status='offline').set(onus['offline'])
         
         # Métricas de temperatura da OLT
         temperatures = OltTemperature.objects.all()
@@ -223,61 +188,3 @@ def update_application_metrics():
             
     except Exception as e:
         logger.error(f"Erro ao atualizar métricas da aplicação: {str(e)}")
-
-
-class PrometheusMiddleware:
-    """
-    Middleware para coletar métricas do Prometheus
-    """
-    
-    def __init__(self, get_response):
-        self.get_response = get_response
-    
-    def __call__(self, request):
-        start_time = time.time()
-        
-        response = self.get_response(request)
-        
-        # Calcular duração
-        duration = time.time() - start_time
-        
-        # Obter endpoint
-        try:
-            resolver_match = resolve(request.path)
-            endpoint = f"{resolver_match.app_name}:{resolver_match.url_name}" if resolver_match.app_name else resolver_match.url_name
-        except:
-            endpoint = request.path
-        
-        # Registrar métricas gerais
-        django_requests_total.labels(
-            method=request.method,
-            endpoint=endpoint,
-            status=response.status_code
-        ).inc()
-        
-        django_request_duration.labels(
-            method=request.method,
-            endpoint=endpoint
-        ).observe(duration)
-        
-        # Registrar métricas específicas de usuários para APIs
-        if request.path.startswith('/api/') and hasattr(request, 'user'):
-            from django.contrib.auth.models import AnonymousUser
-            
-            if not isinstance(request.user, AnonymousUser):
-                # Métricas de requisições por usuário
-                api_requests_by_user.labels(
-                    user_id=str(request.user.id),
-                    username=request.user.username,
-                    endpoint=endpoint,
-                    method=request.method,
-                    status=str(response.status_code)
-                ).inc()
-                
-                # Métricas de tempo de resposta por usuário
-                api_users_response_time.labels(
-                    username=request.user.username,
-                    endpoint=endpoint
-                ).observe(duration)
-        
-        return response
\ No newline at end of file
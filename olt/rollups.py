@@ -0,0 +1,113 @@
+"""
+Resumos por PON e por slot recalculados a cada ingestão de ONUs.
+Dashboards, API, métricas e alertas leem estas poucas linhas em vez de varrer a tabela de ONUs.
+"""
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import ONU, PonRollup, SlotRollup
+
+ROLLUP_FIELDS = [
+    'total', 'online', 'offline', 'clientes_fibra', 'without_mac', 'low_signal',
+    'signal_27_29', 'signal_below_29', 'rx_count', 'rx_min', 'rx_avg', 'rx_max',
+]
+COUNTER_FIELDS = ROLLUP_FIELDS[:9]
+
+
+def _split_pon(pon):
+    """'1/1/2/7' -> (2, 7); None se o formato não for rack/shelf/slot/port"""
+    parts = pon.split('/')
+    try:
+        return int(parts[2]), int(parts[3])
+    except (IndexError, ValueError):
+        return None
+
+
+def pon_counters(queryset):
+    """Contadores por PON em uma única consulta GROUP BY pon"""
+    return queryset.values('pon').annotate(
+        total=Count('id'),
+        online=Count('id', filter=Q(oper_state='up')),
+        offline=Count('id', filter=Q(oper_state='down')),
+        clientes_fibra=Count('id', filter=Q(cliente_fibra=True)),
+        without_mac=Count('id', filter=Q(mac__isnull=True) | Q(mac='')),
+        low_signal=Count('id', filter=Q(olt_rx_sig__lt=-25.0)),
+        signal_27_29=Count('id', filter=Q(olt_rx_sig__gte=-29, olt_rx_sig__lte=-27)),
+        signal_below_29=Count('id', filter=Q(olt_rx_sig__lt=-29)),
+        rx_count=Count('olt_rx_sig'),
+        rx_min=Min('olt_rx_sig'),
+        rx_avg=Avg('olt_rx_sig'),
+        rx_max=Max('olt_rx_sig'),
+    ).order_by()
+
+
+def refresh_rollups(pons=None):
+    """
+    Recalcula os resumos das PONs informadas (todas se pons=None) e, em seguida,
+    os resumos por slot a partir dos resumos por PON.
+    """
+    queryset = ONU.objects.all() if pons is None else ONU.objects.filter(pon__in=pons)
+
+    rollups = []
+    for row in pon_counters(queryset):
+        position = _split_pon(row['pon'])
+        if position is None:
+            continue
+        rollups.append(PonRollup(slot=position[0], port=position[1], **row))
+
+    with transaction.atomic():
+        stale = PonRollup.objects.exclude(pon__in=[rollup.pon for rollup in rollups])
+        if pons is not None:
+            stale = stale.filter(pon__in=pons)
+        stale.delete()
+
+        if rollups:
+            PonRollup.objects.bulk_create(
+                rollups,
+                update_conflicts=True,
+                unique_fields=['pon'],
+                update_fields=ROLLUP_FIELDS + ['slot', 'port', 'updated_at'],
+            )
+        refresh_slot_rollups()
+
+
+def refresh_slot_rollups():
+    """Soma os resumos por PON em resumos por slot (média do sinal ponderada pelas ONUs com sinal)"""
+    counters = {field: Sum(field) for field in COUNTER_FIELDS}
+    rows = PonRollup.objects.values('slot').annotate(
+        pons=Count('id'),
+        rx_min=Min('rx_min'),
+        rx_max=Max('rx_max'),
+        rx_weighted=Sum(F('rx_avg') * F('rx_count')),
+        **counters,
+    ).order_by()
+
+    rollups = []
+    for row in rows:
+        rx_weighted = row.pop('rx_weighted')
+        row['rx_avg'] = rx_weighted / row['rx_count'] if row['rx_count'] else None
+        rollups.append(SlotRollup(**row))
+
+    SlotRollup.objects.exclude(slot__in=[rollup.slot for rollup in rollups]).delete()
+    if rollups:
+        SlotRollup.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=['slot'],
+            update_fields=ROLLUP_FIELDS + ['pons', 'updated_at'],
+        )
+
+
+def ensure_rollups():
+    """Gera os resumos na primeira leitura após a implantação (antes da primeira coleta)"""
+    if not SlotRollup.objects.exists() and ONU.objects.exists():
+        refresh_rollups()
+
+
+def totals():
+    """Totais de toda a OLT a partir dos resumos por slot"""
+    ensure_rollups()
+    return SlotRollup.objects.aggregate(
+        **{field: Coalesce(Sum(field), 0) for field in COUNTER_FIELDS}
+    )
@@ -0,0 +1,135 @@
+"""
+Busca de ONUs e clientes fibra compartilhada pelas views e pela API
+"""
+import re
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .models import ONU, ClienteFibraIxc
+
+ONU_SEARCH_FIELDS = ('serial', 'mac', 'desc1', 'desc2', 'pon')
+CLIENTE_SEARCH_FIELDS = ('nome', 'mac')
+# Termos de busca tratados como filtro exato de oper_state nas listagens
+ONU_STATES = ('up', 'down')
+
+HEX_SEPARATORS = re.compile(r'[\s:.\-]')
+MAC_LIKE = re.compile(r'^[0-9a-fA-F]{4,12}$')
+# Serial Nokia/GPON: 4 letras do fabricante + até 8 dígitos hexa, com ou sem ":"
+SERIAL_LIKE = re.compile(r'^([A-Za-z]{4}):?([0-9A-Fa-f]{1,8})$')
+
+
+def normalize_mac(query):
+    """'AABB.CC', 'aa-bb-cc' ou 'aabbcc' -> 'aa:bb:cc' (None se não parece MAC)"""
+    hexdigits = HEX_SEPARATORS.sub('', query)
+    if not MAC_LIKE.match(hexdigits):
+        return None
+    return ':'.join(hexdigits[i:i + 2] for i in range(0, len(hexdigits), 2)).lower()
+
+
+def normalize_serial(query):
+    """'alclb3fd' ou 'ALCL:B3FD' -> 'ALCL:B3FD' (None se não parece serial)"""
+    match = SERIAL_LIKE.match(query)
+    if not match:
+        return None
+    return f"{match.group(1)}:{match.group(2)}".upper()
+
+
+def _contains(fields, query):
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': query})
+    return condition
+
+
+def _supports_trigram(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def _rank(queryset, exact, prefix, similarity_fields, query):
+    """Exato > prefixo > demais; empates ordenados pela similaridade trigram (Postgres)"""
+    queryset = queryset.annotate(match_rank=Case(
+        When(exact, then=Value(2)),
+        When(prefix, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+    if not _supports_trigram(queryset):
+        return queryset, ['-match_rank']
+
+    similarities = [TrigramSimilarity(field, query) for field in similarity_fields]
+    similarity = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+    return queryset.annotate(similarity=similarity), ['-match_rank', '-similarity']
+
+
+def search_onus(query, queryset=None, fields=ONU_SEARCH_FIELDS, ranked=True, match_state=False):
+    """
+    Filtra ONUs por serial, MAC, descrições e PON (icontains, atendido pelos índices trigram).
+    Seriais e MACs digitados sem separador também casam ('alclb3fd', 'aabbcc').
+    Com match_state=True, 'up'/'down' filtram por oper_state exato em vez da busca textual.
+    Com ranked=True o resultado vem ordenado por relevância.
+    """
+    if queryset is None:
+        queryset = ONU.objects.all()
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    # Fora do OR: um braço sem índice trigram derrubaria o BitmapOr para seq scan
+    if match_state and query.lower() in ONU_STATES:
+        return queryset.filter(oper_state=query.lower())
+
+    mac = normalize_mac(query)
+    serial = normalize_serial(query)
+
+    condition = _contains(fields, query)
+    if mac:
+        condition |= Q(mac__icontains=mac)
+    if serial:
+        condition |= Q(serial__istartswith=serial)
+    queryset = queryset.filter(condition)
+
+    if not ranked:
+        return queryset
+
+    exact = Q(serial__iexact=query) | Q(mac__iexact=query)
+    prefix = Q(serial__istartswith=query) | Q(mac__istartswith=query) | Q(desc1__istartswith=query)
+    if mac:
+        exact |= Q(mac__iexact=mac)
+        prefix |= Q(mac__istartswith=mac)
+    if serial:
+        exact |= Q(serial__iexact=serial)
+        prefix |= Q(serial__istartswith=serial)
+
+    queryset, ordering = _rank(queryset, exact, prefix, ('serial', 'desc1', 'desc2'), query)
+    return queryset.order_by(*ordering, 'pon', 'position')
+
+
+def search_clientes(query, queryset=None, ranked=True):
+    """Filtra clientes fibra por nome e MAC (o MAC do IXC é o serial da ONU)"""
+    if queryset is None:
+        queryset = ClienteFibraIxc.objects.all()
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    serial = normalize_serial(query)
+
+    condition = _contains(CLIENTE_SEARCH_FIELDS, query)
+    if serial:
+        condition |= Q(mac__istartswith=serial)
+    queryset = queryset.filter(condition)
+
+    if not ranked:
+        return queryset
+
+    exact = Q(mac__iexact=query) | Q(nome__iexact=query)
+    prefix = Q(mac__istartswith=query) | Q(nome__istartswith=query)
+    if serial:
+        exact |= Q(mac__iexact=serial)
+        prefix |= Q(mac__istartswith=serial)
+
+    queryset, ordering = _rank(queryset, exact, prefix, ('nome',), query)
+    return queryset.order_by(*ordering, 'nome')
@@ -4,7 +4,8 @@ Middleware e decoradores para controlar acesso direto à OLT
 from django.http import JsonResponse
 from django.conf import settings
 from functools import wraps
-import ipaddress
+
+from .ip_utils import compile_ip_matcher
 
 
 def frontend_only(view_func):
@@ -90,25 +91,8 @@ def is_frontend_access(client_ip, allowed_ips):
     """
     Verifica se o IP é de acesso interno (frontend)
     """
-    try:
-        client_ip_obj = ipaddress.ip_address(client_ip)
-        
-        for allowed_ip in allowed_ips:
-            try:
-                # Tenta como IP individual
-                if ipaddress.ip_address(allowed_ip) == client_ip_obj:
-                    return True
-            except ValueError:
-                try:
-                    # Tenta como range CIDR
-                    if client_ip_obj in ipaddress.ip_network(allowed_ip, strict=False):
-                        return True
-                except ValueError:
-                    continue
-    except ValueError:
-        return False
-    
-    return False
+    # A lista é compilada uma única vez por processo (busca O(log n))
+    return compile_ip_matcher(tuple(allowed_ips)).matches(client_ip)
 
 
 class OltSecurityMiddleware:
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import (
     ONU, OltUsers, PlacaOnu, ClienteFibraIxc, 
-    OltSystemInfo, OltSlot, OltTemperature, OltSfpDiagnostics
+    OltSystemInfo, OltSlot, OltTemperature, OltSfpDiagnostics, PonRollup, SignalDegradation
 )
 
 
@@ -35,6 +35,25 @@ class ONUSerializer(serializers.ModelSerializer):
         return obj.get_port()
 
 
+class PonRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PonRollup
+        fields = [
+            'pon', 'slot', 'port', 'total', 'online', 'offline', 'clientes_fibra',
+            'without_mac', 'low_signal', 'signal_27_29', 'signal_below_29',
+            'rx_min', 'rx_avg', 'rx_max', 'updated_at'
+        ]
+
+
+class SignalDegradationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SignalDegradation
+        fields = [
+            'id', 'kind', 'pon', 'onu', 'samples', 'slope', 'delta', 'rx_baseline', 'rx_last',
+            'onus_affected', 'onus_total', 'first_detected', 'last_detected'
+        ]
+
+
 class OltUsersSerializer(serializers.ModelSerializer):
     class Meta:
         model = OltUsers
@@ -103,9 +103,9 @@ def cleanup_inactive_ips():
             inactive_ips.delete()
             logger.info(f"🧹 Removidos {count} IPs que não estão mais no settings")
             
-            # Limpar cache após limpeza
-            from django.core.cache import cache
-            cache.delete('allowed_ips_cache')
+            # Limpar cache após limpeza (delete() em queryset não dispara os sinais)
+            from .ip_utils import invalidate_allowed_ips
+            invalidate_allowed_ips()
             
     except Exception as e:
         logger.error(f"❌ Erro durante limpeza de IPs inativos: {e}")
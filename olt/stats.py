@@ -0,0 +1,97 @@
+"""
+Contadores do dashboard e da API (a partir dos resumos por PON/slot) cacheados por ciclo de coleta
+"""
+import logging
+import time
+
+import django_rq
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Q
+
+from .models import OltSlot, OltTemperature, SlotRollup
+from .rollups import totals as rollup_totals
+
+logger = logging.getLogger(__name__)
+
+# Marca da última ingestão, compartilhada entre web e workers via Redis
+INGEST_STAMP_KEY = 'olt:ingest_stamp'
+STATS_CACHE_KEY = 'olt_dashboard_stats'
+# Mesmo sem nova coleta as estatísticas expiram (ex.: edição manual pelo admin)
+STATS_CACHE_TIMEOUT = 300
+# Sem Redis não há marca de ingestão; o cache vale só por pouco tempo
+STATS_FALLBACK_TIMEOUT = 30
+
+STATS_SLOTS = (1, 2)
+
+
+def mark_ingest():
+    """Chamado ao final de cada coleta que altera ONUs, portas, slots ou clientes"""
+    try:
+        django_rq.get_connection('default').set(INGEST_STAMP_KEY, time.time_ns())
+    except Exception:
+        logger.exception("Erro ao registrar ingestão")
+
+
+def get_ingest_stamp():
+    try:
+        stamp = django_rq.get_connection('default').get(INGEST_STAMP_KEY)
+    except Exception:
+        return None
+    return stamp.decode() if stamp else '0'
+
+
+def onu_counters():
+    """Contadores de ONU a partir dos resumos por slot (poucas linhas em vez da tabela de ONUs)"""
+    counters = rollup_totals()
+    counters['without_client'] = counters['total'] - counters['clientes_fibra']
+
+    slots = {rollup.slot: rollup for rollup in SlotRollup.objects.filter(slot__in=STATS_SLOTS)}
+    for slot in STATS_SLOTS:
+        rollup = slots.get(slot)
+        counters[f'slot_{slot}_total'] = rollup.total if rollup else 0
+        counters[f'slot_{slot}_online'] = rollup.online if rollup else 0
+        counters[f'slot_{slot}_offline'] = rollup.offline if rollup else 0
+    return counters
+
+
+def olt_counters():
+    """Contadores de slots e temperaturas (uma consulta por tabela)"""
+    slots = OltSlot.objects.aggregate(
+        total=Count('id'),
+        operational=Count('id', filter=Q(enabled=True, availability='available', error_status='no-error')),
+    )
+    temperatures = OltTemperature.objects.aggregate(
+        critical=Count('id', filter=Q(actual_temp__gte=75)),
+        warning=Count('id', filter=Q(actual_temp__gte=70, actual_temp__lt=75)),
+        avg=Avg('actual_temp'),
+        max=Max('actual_temp'),
+    )
+    return {
+        'total_slots': slots['total'],
+        'operational_slots': slots['operational'],
+        'critical_temps': temperatures['critical'],
+        'warning_temps': temperatures['warning'],
+        'avg_temp': temperatures['avg'],
+        'max_temp': temperatures['max'],
+    }
+
+
+def compute_stats():
+    stats = {'onus': onu_counters()}
+    stats.update(olt_counters())
+    return stats
+
+
+def get_stats():
+    """Estatísticas do dashboard/API; recalculadas no máximo uma vez por ciclo de coleta"""
+    stamp = get_ingest_stamp()
+    if stamp is None:
+        key, timeout = f'{STATS_CACHE_KEY}:fallback', STATS_FALLBACK_TIMEOUT
+    else:
+        key, timeout = f'{STATS_CACHE_KEY}:{stamp}', STATS_CACHE_TIMEOUT
+
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats()
+        cache.set(key, stats, timeout)
+    return stats
@@ -5,6 +5,8 @@ import django_rq
 from datetime import datetime
 import rq
 from .client_utils import update_clientes
+from .history import maintain_history
+from .degradation import detect_signal_degradation
 
 def add_metadata(job, user, menu_item):
     """Adiciona metadados à task"""
@@ -34,8 +36,34 @@ def update_onus_task(user=None, menu_item=None):
     job.meta['current_step'] = "Atualizando ONUs"
     job.save_meta()
     
-    connector.update_all_ports()
-    return "Atualização de ONUs concluída"
+    changes = connector.update_all_ports()
+    job.meta['pon_changes'] = changes
+    job.save_meta()
+
+    created = sum(change['created'] for change in changes)
+    updated = sum(change['updated'] for change in changes)
+    deleted = sum(change['deleted'] for change in changes)
+    failed = sum(change['failed'] for change in changes)
+    return f"Atualização de ONUs concluída: {created} novas, {updated} alteradas, {deleted} removidas, {failed} PONs com falha"
+
+@django_rq.job
+def update_ports_and_onus_task(user=None, menu_item=None):
+    """Task para atualizar ocupação das portas e ONUs com uma única coleta por PON"""
+    connector = olt_connector()
+    job = rq.get_current_job()
+    add_metadata(job, user, menu_item)
+    job.meta['current_step'] = "Atualizando ocupação das portas e ONUs"
+    job.save_meta()
+
+    changes = connector.update_ports_and_onus()
+    job.meta['pon_changes'] = changes
+    job.save_meta()
+
+    created = sum(change['created'] for change in changes)
+    updated = sum(change['updated'] for change in changes)
+    deleted = sum(change['deleted'] for change in changes)
+    failed = sum(change['failed'] for change in changes)
+    return f"Atualização de portas e ONUs concluída: {created} novas, {updated} alteradas, {deleted} removidas, {failed} PONs com falha"
 
 @django_rq.job
 def update_mac_task(user=None, menu_item=None):
@@ -50,15 +78,48 @@ def update_mac_task(user=None, menu_item=None):
     return "Atualização de MAC concluída"
 
 @django_rq.job
-def update_clientes_task(user=None, menu_item=None):
-    """Task para atualizar clientes fibra"""
+def update_clientes_task(user=None, menu_item=None, mode='auto'):
+    """Task para atualizar clientes fibra (mode: 'auto', 'full' ou 'incremental')"""
     job = rq.get_current_job()
     add_metadata(job, user, menu_item)
     job.meta['current_step'] = "Atualizando clientes fibra"
     job.save_meta()
     
-    update_clientes()
-    return "Atualização de clientes concluída"
+    result = update_clientes(mode=mode)
+    job.meta['sync'] = result
+    job.save_meta()
+    modo = 'completa' if result['mode'] == 'full' else 'incremental'
+    return f"Atualização de clientes concluída ({modo}): {result['clientes']} clientes"
+
+@django_rq.job
+def maintain_signal_history_task(user=None, menu_item=None):
+    """Task para agregar o histórico de sinal por hora/dia e aplicar a retenção"""
+    job = rq.get_current_job()
+    add_metadata(job, user, menu_item)
+    job.meta['current_step'] = "Agregando histórico de sinal"
+    job.save_meta()
+
+    result = maintain_history()
+    job.meta['history'] = result
+    job.save_meta()
+    removed = sum(result['deleted'].values())
+    return f"Histórico de sinal atualizado: {result['hourly']} agregados por hora, {result['daily']} por dia, {removed} registros expirados"
+
+@django_rq.job
+def detect_signal_degradation_task(user=None, menu_item=None):
+    """Task para detectar quedas de sinal por ONU e por PON na janela recente do histórico"""
+    from .alert_views import AlertManager
+
+    job = rq.get_current_job()
+    add_metadata(job, user, menu_item)
+    job.meta['current_step'] = "Analisando degradação de sinal"
+    job.save_meta()
+
+    result = detect_signal_degradation()
+    job.meta['degradation'] = result
+    job.save_meta()
+    AlertManager.check_degradation_alerts()
+    return f"Degradação de sinal: {result['onus']} ONUs e {result['pons']} PONs em queda ({result['readings']} leituras analisadas)"
 
 @django_rq.job
 def update_all_data_task(user=None, menu_item=None):
@@ -73,10 +134,11 @@ def update_all_data_task(user=None, menu_item=None):
     
     # Executa as tasks em sequência, adicionando ao final da fila
     queue.enqueue(update_olt_system_task, user=user, menu_item="Atualização Sistema OLT", job_timeout=300, at_front=False)
-    queue.enqueue(update_port_occupation_task, user=user, menu_item="Atualização de Portas", job_timeout=1200, at_front=False)
-    queue.enqueue(update_onus_task, user=user, menu_item="Atualização de ONUs", job_timeout=1200, at_front=False)
+    queue.enqueue(update_ports_and_onus_task, user=user, menu_item="Atualização de Portas e ONUs", job_timeout=1200, at_front=False)
     queue.enqueue(update_mac_task, user=user, menu_item="Atualização de MAC", job_timeout=1200, at_front=False)
     queue.enqueue(update_clientes_task, user=user, menu_item="Atualização de Clientes", job_timeout=1200, at_front=False)
+    queue.enqueue(maintain_signal_history_task, user=user, menu_item="Histórico de Sinal", job_timeout=1200, at_front=False)
+    queue.enqueue(detect_signal_degradation_task, user=user, menu_item="Degradação de Sinal", job_timeout=600, at_front=False)
     
     return "Sequência de atualizações completa iniciada"
 
@@ -164,13 +226,15 @@ def comprehensive_update_task(user=None, menu_item=None):
         # Executa as tasks em sequência com intervalos menores
         queue.enqueue(update_olt_system_task, user=user, menu_item="Atualização Sistema OLT", job_timeout=300, at_front=False)
         sleep(2)  # Pequena pausa entre enqueue
-        queue.enqueue(update_port_occupation_task, user=user, menu_item="Atualização de Portas", job_timeout=1200, at_front=False)
-        sleep(2)
-        queue.enqueue(update_onus_task, user=user, menu_item="Atualização de ONUs", job_timeout=1200, at_front=False)
+        queue.enqueue(update_ports_and_onus_task, user=user, menu_item="Atualização de Portas e ONUs", job_timeout=1200, at_front=False)
         sleep(2)
         queue.enqueue(update_mac_task, user=user, menu_item="Atualização de MAC", job_timeout=1200, at_front=False)
         sleep(2)
         queue.enqueue(update_clientes_task, user=user, menu_item="Atualização de Clientes", job_timeout=1200, at_front=False)
+        sleep(2)
+        queue.enqueue(maintain_signal_history_task, user=user, menu_item="Histórico de Sinal", job_timeout=1200, at_front=False)
+        sleep(2)
+        queue.enqueue(detect_signal_degradation_task, user=user, menu_item="Degradação de Sinal", job_timeout=600, at_front=False)
         
         return "Sequência de atualizações completa iniciada"
     
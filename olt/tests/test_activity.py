@@ -0,0 +1,66 @@
+"""
+Testes do buffer de atividade dos usuários gravado no Redis em lote
+"""
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from olt.activity import ActivityAggregator, hour_key, user_key
+
+NOW = 1_760_000_000.0
+
+
+class ActivityFlushTests(SimpleTestCase):
+
+    def setUp(self):
+        self.aggregator = ActivityAggregator()
+        # Sem a thread de gravação: os testes chamam flush() diretamente
+        self.aggregator._flusher_pid = os.getpid()
+        self.pipe = mock.MagicMock()
+        self.connection = mock.MagicMock()
+        self.connection.pipeline.return_value = self.pipe
+        patcher = mock.patch('olt.activity.django_rq.get_connection', return_value=self.connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record(self, path, status_code=200, timestamp=NOW):
+        self.aggregator.record(1, 'ana', path, '10.0.0.1', status_code, 12.5, timestamp)
+
+    def test_flush_writes_buffered_events(self):
+        self.record('/api/onus/')
+        self.record('/api/onus/', status_code=404)
+
+        self.assertEqual(self.aggregator.flush(), 2)
+
+        key = user_key(1)
+        self.pipe.hincrby.assert_any_call(key, 'requests', 2)
+        self.pipe.hincrby.assert_any_call(key, 'status:404', 1)
+        self.pipe.incrby.assert_called_once_with(f'{hour_key(NOW)}:requests', 2)
+        self.assertEqual(self.aggregator.flush(), 0)
+
+    def test_failed_flush_keeps_events_for_the_next_one(self):
+        self.record('/api/onus/')
+        self.record('/api/olt/')
+        self.pipe.execute.side_effect = RedisConnectionError('redis fora do ar')
+
+        with self.assertLogs('olt.activity', level='ERROR'):
+            self.assertIsNone(self.aggregator.flush())
+
+        # Eventos novos chegam enquanto o Redis está fora
+        self.record('/api/onus/', status_code=500, timestamp=NOW + 10)
+        self.pipe.reset_mock()
+        self.pipe.execute.side_effect = None
+
+        self.assertEqual(self.aggregator.flush(), 3)
+
+        key = user_key(1)
+        self.pipe.hsetnx.assert_called_once_with(key, 'first_seen', NOW)
+        self.pipe.hincrby.assert_any_call(key, 'requests', 3)
+        self.pipe.hincrby.assert_any_call(key, 'status:200', 2)
+        self.pipe.hincrby.assert_any_call(key, 'status:500', 1)
+        self.pipe.hincrbyfloat.assert_called_once_with(key, 'total_ms', 37.5)
+        self.pipe.zadd.assert_any_call('olt:activity:last_seen', {1: NOW + 10}, gt=True)
+        self.pipe.incrby.assert_called_once_with(f'{hour_key(NOW)}:requests', 3)
+        self.pipe.zincrby.assert_any_call(f'{hour_key(NOW)}:endpoints', 2, '/api/onus/')
@@ -0,0 +1,52 @@
+"""
+Testes dos parâmetros do histórico de sinal de uma ONU (GET /api/onus/<pk>/history/)
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from olt.api_views import onu_history
+from olt.history import retention_days
+from olt.models import ONU, OnuSignalRollup
+
+
+class OnuHistoryParamsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('operador', password='senha')
+        cls.onu = ONU.objects.create(
+            pon='1/1/1/14', position=90, mac='', serial='RCMG:3A88390E',
+            oper_state='up', desc1='tomazpaiva', desc2='tomazpaiva',
+        )
+
+    def get(self, **params):
+        request = APIRequestFactory().get(f'/api/onus/{self.onu.pk}/history/', params)
+        force_authenticate(request, user=self.user)
+        return onu_history(request, pk=self.onu.pk)
+
+    def window(self, response):
+        return response.data['end'] - response.data['start']
+
+    def test_default_window(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.window(response), timedelta(hours=24))
+
+    def test_invalid_hours_are_rejected(self):
+        for hours in ('inf', '-inf', 'nan', '0', '-5', 'abc', '1e400'):
+            with self.subTest(hours=hours):
+                self.assertEqual(self.get(hours=hours).status_code, 400)
+
+    def test_large_hours_are_clamped(self):
+        response = self.get(hours='1e12')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.window(response), timedelta(days=retention_days(OnuSignalRollup.DAY)))
+
+    def test_impossible_dates_are_rejected(self):
+        self.assertEqual(self.get(start='2024-13-01T00:00:00').status_code, 400)
+        self.assertEqual(self.get(end='0001-01-01T00:00:00', hours='48').status_code, 400)
@@ -0,0 +1,256 @@
+"""
+Testes da sincronização com o IXC contra um servidor HTTP local que imita o webservice
+"""
+import json
+import os
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+from django.test import TestCase
+from django.utils import timezone
+
+from olt.client_utils import IxcClient, update_clientes, upsert_clientes
+from olt.models import ONU, ClienteFibraIxc, IxcSyncState
+
+
+def registro(id, mac=None, nome=None):
+    return {
+        'id': str(id),
+        'mac': mac or f'ALCL:{id:08X}',
+        'nome': nome or f'cliente{id}',
+        'latitude': '-19.9',
+        'longitude': '-43.9',
+        'endereco': 'Rua A',
+        'numero': str(id),
+        'bairro': 'Centro',
+        'cidade': 'BH',
+        'id_caixa_ftth': '7',
+    }
+
+
+class StubIxcServer:
+    """
+    Webservice mínimo de radpop_radio_cliente_fibra: filtra por id (oper '>'), pagina
+    por page/rp e pode responder com erros programados antes da resposta normal.
+    """
+
+    def __init__(self, registros=()):
+        self.registros = list(registros)
+        self.requests = []
+        # página -> lista de status HTTP a devolver (um por requisição) antes de responder
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def host(self):
+        return f'127.0.0.1:{self.server.server_address[1]}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def pages_requested(self):
+        return sorted(payload['page'] for payload in self.requests)
+
+    def respond(self, payload):
+        with self.lock:
+            self.requests.append(payload)
+            failures = self.failures.get(payload['page'])
+            if failures:
+                return failures.pop(0), {}
+
+        registros = self.registros
+        if payload['query'] and payload['oper'] == '>':
+            registros = [item for item in registros if int(item['id']) > int(payload['query'])]
+        registros = sorted(registros, key=lambda item: int(item['id']))
+        size = int(payload['rp'])
+        start = (int(payload['page']) - 1) * size
+        return 200, {
+            'page': str(payload['page']),
+            'total': str(len(registros)),
+            'registros': registros[start:start + size],
+        }
+
+    def handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                status, data = stub.respond(json.loads(body))
+                content = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class IxcTestCase(TestCase):
+
+    def setUp(self):
+        self.ixc = StubIxcServer().start()
+        self.addCleanup(self.ixc.stop)
+
+        environ = mock.patch.dict(os.environ, {
+            'IXC_HOST': self.ixc.host,
+            'IXC_SCHEME': 'http',
+            'IXC_TOKEN': 'teste',
+            'IXC_PAGE_SIZE': '2',
+            'IXC_MAX_WORKERS': '2',
+        })
+        environ.start()
+        self.addCleanup(environ.stop)
+
+        # Sem Redis nos testes: o carimbo de ingestão não importa aqui
+        ingest = mock.patch('olt.client_utils.mark_ingest')
+        ingest.start()
+        self.addCleanup(ingest.stop)
+
+    def ixc_client(self, **kwargs):
+        kwargs.setdefault('backoff_factor', 0)
+        return IxcClient(host=self.ixc.host, scheme='http', token='teste', page_size=2, **kwargs)
+
+
+class IxcClientTests(IxcTestCase):
+
+    def test_iter_pages_returns_every_page_in_order(self):
+        self.ixc.registros = [registro(id) for id in range(1, 6)]
+
+        with self.ixc_client() as client:
+            pages = list(client.iter_pages())
+
+        self.assertEqual([[int(item['id']) for item in page] for page in pages], [[1, 2], [3, 4], [5]])
+        # A primeira página é buscada uma única vez e informa o total
+        self.assertEqual(self.ixc.pages_requested(), [1, 2, 3])
+
+    def test_retries_server_errors(self):
+        self.ixc.registros = [registro(id) for id in range(1, 6)]
+        self.ixc.failures = {2: [503, 500]}
+
+        with self.ixc_client() as client:
+            pages = list(client.iter_pages())
+
+        self.assertEqual(sum(len(page) for page in pages), 5)
+        self.assertEqual(self.ixc.pages_requested(), [1, 2, 2, 2, 3])
+
+    def test_gives_up_after_the_retries(self):
+        self.ixc.registros = [registro(1)]
+        self.ixc.failures = {1: [502] * 5}
+
+        with self.ixc_client(retries=2) as client:
+            with self.assertRaises(requests.exceptions.RetryError):
+                list(client.iter_pages())
+        self.assertEqual(self.ixc.pages_requested(), [1, 1, 1])
+
+
+class UpdateClientesTests(IxcTestCase):
+
+    def test_full_sync_imports_all_pages(self):
+        self.ixc.registros = [registro(id) for id in range(1, 6)]
+
+        result = update_clientes(mode='full')
+
+        self.assertEqual(result, {'mode': 'full', 'clientes': 5, 'last_id': 5})
+        self.assertEqual(ClienteFibraIxc.objects.filter(is_active=True).count(), 5)
+        self.assertEqual([payload['query'] for payload in self.ixc.requests], ['', '', ''])
+
+        state = IxcSyncState.load()
+        self.assertEqual(state.last_id, 5)
+        self.assertIsNotNone(state.last_full_sync)
+        self.assertIsNone(state.last_incremental_sync)
+
+    def test_full_sync_deactivates_clientes_removed_from_ixc(self):
+        ClienteFibraIxc.objects.create(mac='ALCL:DEADBEEF', nome='antigo')
+        self.ixc.registros = [registro(1)]
+
+        update_clientes(mode='full')
+
+        self.assertFalse(ClienteFibraIxc.objects.get(mac='ALCL:DEADBEEF').is_active)
+        self.assertTrue(ClienteFibraIxc.objects.get(mac=registro(1)['mac']).is_active)
+
+    def test_incremental_sync_fetches_only_ids_above_the_high_water_mark(self):
+        self.ixc.registros = [registro(id) for id in range(1, 8)]
+        IxcSyncState.objects.create(pk=1, last_id=3, last_full_sync=timezone.now())
+
+        result = update_clientes(mode='auto')
+
+        self.assertEqual(result, {'mode': 'incremental', 'clientes': 4, 'last_id': 7})
+        self.assertEqual({payload['query'] for payload in self.ixc.requests}, {'3'})
+        self.assertEqual(
+            sorted(ClienteFibraIxc.objects.values_list('mac', flat=True)),
+            sorted(registro(id)['mac'] for id in range(4, 8)),
+        )
+        state = IxcSyncState.load()
+        self.assertEqual(state.last_id, 7)
+        self.assertIsNotNone(state.last_incremental_sync)
+
+    def test_incremental_sync_without_new_records_keeps_the_high_water_mark(self):
+        self.ixc.registros = [registro(id) for id in range(1, 4)]
+        IxcSyncState.objects.create(pk=1, last_id=3, last_full_sync=timezone.now())
+
+        result = update_clientes(mode='incremental')
+
+        self.assertEqual(result['clientes'], 0)
+        self.assertEqual(IxcSyncState.load().last_id, 3)
+
+    def test_auto_mode_runs_a_full_sync_when_the_last_one_is_old(self):
+        self.ixc.registros = [registro(1)]
+        IxcSyncState.objects.create(pk=1, last_id=1, last_full_sync=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(update_clientes(mode='auto')['mode'], 'full')
+
+    def test_marks_onus_of_imported_clientes(self):
+        self.ixc.registros = [registro(1, mac='ALCL:B3FD63A5', nome='vitorfrancisco')]
+        onu = ONU.objects.create(
+            pon='1/1/1/14', position=91, mac='', serial='ALCL:B3FD63A5',
+            oper_state='up', desc1='vitorfrancisco', desc2='vitorfrancisco',
+        )
+
+        update_clientes(mode='full')
+
+        onu.refresh_from_db()
+        self.assertTrue(onu.cliente_fibra)
+
+
+class UpsertClientesTests(TestCase):
+
+    def test_updates_existing_mac_instead_of_duplicating(self):
+        ClienteFibraIxc.objects.create(mac='ALCL:00000001', nome='nome antigo', is_active=False)
+        synced_at = timezone.now()
+
+        total = upsert_clientes([registro(1, mac='ALCL:00000001', nome='nome novo')], synced_at)
+
+        self.assertEqual(total, 1)
+        cliente = ClienteFibraIxc.objects.get(mac='ALCL:00000001')
+        self.assertEqual(cliente.nome, 'nome novo')
+        self.assertTrue(cliente.is_active)
+        self.assertEqual(cliente.last_synced, synced_at)
+        self.assertEqual(cliente.endereco, 'Rua A, 1, Centro, BH')
+        self.assertEqual(ClienteFibraIxc.objects.count(), 1)
+
+    def test_repeated_mac_in_a_page_keeps_the_last_record(self):
+        total = upsert_clientes([
+            registro(1, mac='ALCL:00000001', nome='primeiro'),
+            registro(2, mac='ALCL:00000001', nome='segundo'),
+        ], timezone.now())
+
+        self.assertEqual(total, 1)
+        self.assertEqual(ClienteFibraIxc.objects.get(mac='ALCL:00000001').nome, 'segundo')
+
+    def test_empty_page(self):
+        self.assertEqual(upsert_clientes([], timezone.now()), 0)
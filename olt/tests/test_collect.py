@@ -0,0 +1,68 @@
+"""
+Testes da coleta das PONs distribuída entre várias sessões SSH
+"""
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from olt.utils import olt_connector
+
+TARGETS = [(1, pon) for pon in range(1, 9)]
+
+
+class FakeSession:
+    """Sessão que responde ao comando, exceto nas PONs de `failing`"""
+
+    def __init__(self, failing=(), login_error=None):
+        self.failing = set(failing)
+        self.login_error = login_error
+
+    def open(self):
+        if self.login_error:
+            raise self.login_error
+
+    def close(self):
+        pass
+
+    def send_command(self, command):
+        pon = int(command.rsplit('/', 1)[1])
+        if pon in self.failing:
+            raise OSError('canal fechado')
+        return f'saida {pon}'
+
+
+class CollectPonOutputsTests(SimpleTestCase):
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {'NOKIA_GLOBAL_DELAY_FACTOR': '1', 'NOKIA_MAX_SESSIONS': '2'}):
+            self.connector = olt_connector()
+
+    def collect(self, **session_kwargs):
+        with mock.patch.object(self.connector, 'session', lambda: FakeSession(**session_kwargs)):
+            return self.connector.collect_pon_outputs(TARGETS)
+
+    def test_keeps_target_order(self):
+        collected = self.collect()
+
+        self.assertEqual(collected, [(slot, pon, f'saida {pon}') for slot, pon in TARGETS])
+
+    def test_failed_pons_come_back_as_none(self):
+        with self.assertNoLogs('olt.utils', level='WARNING'):
+            collected = self.collect(failing={3})
+
+        self.assertEqual([pon for _, pon, output in collected if output is None], [3])
+
+    def test_warns_when_most_pons_fail(self):
+        with self.assertLogs('olt.utils', level='WARNING') as logs:
+            self.collect(failing={1, 2, 3, 4, 5})
+
+        self.assertIn('5 de 8 PONs sem resposta', logs.output[0])
+
+    def test_raises_when_no_session_logs_in(self):
+        with self.assertRaisesMessage(ConnectionError, 'Nenhuma sessão com a OLT'):
+            self.collect(login_error=OSError('autenticação recusada'))
+
+    def test_raises_when_no_pon_answers(self):
+        with self.assertRaisesMessage(ConnectionError, 'Nenhuma das 8 PONs respondeu'):
+            self.collect(failing={pon for _, pon in TARGETS})
@@ -0,0 +1,114 @@
+"""
+Testes dos parsers da CLI da OLT sobre as saídas de exemplo em olt/parsers/samples/
+"""
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from olt import parsers
+from olt.parsers import FdbEntry, OntStatusRecord, SlotRecord, TemperatureRecord
+
+SAMPLES_DIR = Path(parsers.__file__).resolve().parent / 'samples'
+
+
+def read_sample(name):
+    return (SAMPLES_DIR / name).read_text()
+
+
+class OntStatusParserTests(SimpleTestCase):
+
+    def setUp(self):
+        self.output = read_sample('ont_status_pon.txt')
+        self.records = parsers.parse_ont_status(self.output)
+        self.by_position = {record.position: record for record in self.records}
+
+    def test_parses_every_row(self):
+        self.assertEqual(len(self.records), len(self.output.splitlines()))
+        self.assertEqual(
+            [record.position for record in self.records],
+            sorted(self.by_position),
+        )
+        self.assertTrue(all(record.pon == '1/1/1/14' for record in self.records))
+
+    def test_first_row(self):
+        self.assertEqual(self.records[0], OntStatusRecord(
+            '1/1/1/14', 90, 'RCMG:3A88390E', 'up', 'up', -23.0, '0.5', 'tomazpaiva', 'tomazpaiva',
+        ))
+
+    def test_row_with_blank_descriptions_is_kept(self):
+        # A linha 111 vem com desc1/desc2 vazias; o parser antigo a descartava
+        self.assertEqual(self.by_position[111], OntStatusRecord(
+            '1/1/1/14', 111, 'HWTC:032A1CA0', 'up', 'up', -22.8, '0.8', '', '',
+        ))
+        # ... e a linha seguinte continua intacta
+        self.assertEqual(self.by_position[112].sernum, 'RCMG:3A9002FC')
+        self.assertEqual(self.by_position[112].desc1, 'dorissantana')
+
+    def test_offline_onu_has_no_signal(self):
+        record = self.by_position[96]
+        self.assertEqual(record.oper_status, 'down')
+        self.assertIsNone(record.olt_rx_sig)
+        self.assertEqual(record.ont_olt, 'invalid')
+
+    def test_different_descriptions(self):
+        self.assertEqual(self.by_position[98].desc1, 'PABX')
+        self.assertEqual(self.by_position[98].desc2, 'Prefeitura')
+
+    def test_header_columns_allow_spaces_in_descriptions(self):
+        row = self.output.splitlines()[0]
+        desc1 = row.index('tomazpaiva')
+        desc2 = row.index('tomazpaiva', desc1 + 1)
+        hostname = row.index('undefined')
+        header = (
+            'pon'.ljust(11) + 'ont'.ljust(15) + 'sernum'.ljust(14) + 'admin-status'
+        ).ljust(desc1) + 'desc1'.ljust(desc2 - desc1) + 'desc2'.ljust(hostname - desc2) + 'hostname'
+        row = row[:desc1] + 'casa da maria'.ljust(desc2 - desc1) + 'loja centro'.ljust(hostname - desc2) + row[hostname:]
+
+        records = parsers.parse_ont_status(header + '\n' + row)
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].desc1, 'casa da maria')
+        self.assertEqual(records[0].desc2, 'loja centro')
+
+
+class FdbParserTests(SimpleTestCase):
+
+    def setUp(self):
+        self.lines = read_sample('bridge_port_fdb.txt').splitlines()
+
+    def test_parses_only_onu_rows(self):
+        entries = list(parsers.parse_fdb(iter(self.lines)))
+        self.assertEqual(len(entries), 13)
+
+    def test_bridge_port_maps_to_pon_and_position(self):
+        entries = {entry.bridge_port: entry for entry in parsers.parse_fdb(self.lines)}
+
+        self.assertEqual(entries['1/1/1/14/90'], FdbEntry('1/1/1/14/90', '1/1/1/14', 90, 100, 'e4:c3:2a:0e:39:90'))
+        self.assertEqual(entries['1/1/1/14/98'].vlan, 200)
+        # Outra placa / PON: a posição é o quinto campo, não os sufixos /14/1
+        self.assertEqual(entries['1/1/2/3/5'], FdbEntry('1/1/2/3/5', '1/1/2/3', 5, 100, '00:1e:58:a1:c4:2c'))
+
+    def test_header_and_footer_lines_are_ignored(self):
+        for line in self.lines:
+            if not line[:1].isdigit():
+                self.assertIsNone(parsers.parse_fdb_line(line))
+
+
+class SlotParserTests(SimpleTestCase):
+
+    def test_parses_slots(self):
+        slots = parsers.parse_slots(read_sample('equipment_slot.txt'))
+
+        self.assertEqual([slot.slot_name for slot in slots], ['acu:1/1', 'nt-a', 'nt-b', 'lt:1/1/1', 'lt:1/1/2', 'lt:1/1/3'])
+        self.assertEqual(slots[3], SlotRecord('lt:1/1/1', 'fglt-b', True, 'no-error', 'available', 2))
+        self.assertEqual(slots[2].availability, 'empty')
+
+
+class TemperatureParserTests(SimpleTestCase):
+
+    def test_parses_sensors(self):
+        temperatures = parsers.parse_temperature(read_sample('equipment_temperature.txt'))
+
+        self.assertEqual(len(temperatures), 5)
+        self.assertEqual(temperatures[0], TemperatureRecord('nt-a', 1, 48, -5, 80, -10, 90))
+        self.assertEqual(temperatures[3], TemperatureRecord('lt:1/1/1', 2, 55, -5, 85, -10, 95))
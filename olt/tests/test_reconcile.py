@@ -0,0 +1,66 @@
+"""
+Testes da reconciliação de uma PON com a saída de `show equipment ont status pon`
+"""
+import os
+from pathlib import Path
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+
+from olt import parsers
+from olt.models import ONU
+from olt.utils import olt_connector
+
+SAMPLES_DIR = Path(parsers.__file__).resolve().parent / 'samples'
+SAMPLE_PON = '1/1/1/14'
+
+
+def read_sample(name):
+    return (SAMPLES_DIR / name).read_text()
+
+
+class ApplyPonOutputTests(TestCase):
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {'NOKIA_GLOBAL_DELAY_FACTOR': '1'}):
+            self.connector = olt_connector()
+        self.output = read_sample('ont_status_pon.txt')
+
+    def test_creates_onus_from_sample(self):
+        changes = self.connector.apply_pon_output(1, 14, self.output)
+
+        total = len(self.output.splitlines())
+        self.assertEqual(changes, {
+            'pon': SAMPLE_PON, 'created': total, 'updated': 0, 'deleted': 0, 'unchanged': 0, 'failed': 0,
+        })
+        self.assertEqual(ONU.objects.filter(pon=SAMPLE_PON).count(), total)
+
+        # A segunda passada com a mesma saída não altera nada
+        changes = self.connector.apply_pon_output(1, 14, self.output)
+        self.assertEqual((changes['unchanged'], changes['failed']), (total, 0))
+
+    def test_failed_collection_is_counted(self):
+        changes = self.connector.apply_pon_output(1, 14, None)
+
+        self.assertEqual(changes['pon'], SAMPLE_PON)
+        self.assertEqual(changes['failed'], 1)
+
+    def test_database_error_is_logged_and_counted(self):
+        with mock.patch.object(olt_connector, 'reconcile_pon', side_effect=IntegrityError('duplicate key')):
+            with self.assertLogs('olt.utils', level='ERROR') as logs:
+                changes = self.connector.apply_pon_output(1, 14, self.output)
+
+        self.assertEqual(changes['failed'], 1)
+        self.assertIn(SAMPLE_PON, logs.output[0])
+
+    def test_parser_error_keeps_the_pon(self):
+        self.connector.apply_pon_output(1, 14, self.output)
+        total = ONU.objects.filter(pon=SAMPLE_PON).count()
+
+        with mock.patch.object(parsers, 'parse_ont_status', side_effect=ValueError('coluna inesperada')):
+            with self.assertLogs('olt.utils', level='ERROR'):
+                changes = self.connector.apply_pon_output(1, 14, self.output)
+
+        self.assertEqual(changes['failed'], 1)
+        self.assertEqual(ONU.objects.filter(pon=SAMPLE_PON).count(), total)
@@ -0,0 +1,58 @@
+"""
+Testes da topologia de PONs montada a partir das saídas de exemplo da OLT
+"""
+from pathlib import Path
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from olt import parsers
+from olt.models import OltSlot
+from olt.utils import DEFAULT_PON_PORTS, FALLBACK_LT_SLOTS, build_pon_topology
+
+SAMPLES_DIR = Path(parsers.__file__).resolve().parent / 'samples'
+
+
+def read_sample(name):
+    return (SAMPLES_DIR / name).read_text()
+
+
+def pon_target(pon):
+    """'1/1/1/14' -> (1, 14)"""
+    slot, port = pon.split('/')[2:4]
+    return int(slot), int(port)
+
+
+class PonTopologyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def load_sample_slots(self):
+        for slot in parsers.parse_slots(read_sample('equipment_slot.txt')):
+            OltSlot.objects.create(is_active=True, **slot.as_dict())
+
+    def test_every_sampled_pon_is_polled(self):
+        self.load_sample_slots()
+
+        topology = set(build_pon_topology())
+
+        sampled = {pon_target(record.pon) for record in parsers.parse_ont_status(read_sample('ont_status_pon.txt'))}
+        sampled |= {pon_target(entry.pon) for entry in parsers.parse_fdb(read_sample('bridge_port_fdb.txt').splitlines())}
+        self.assertIn((1, 14), sampled)
+        self.assertEqual(sampled - topology, set())
+
+    def test_only_operational_lt_boards_are_polled(self):
+        self.load_sample_slots()
+
+        topology = build_pon_topology()
+
+        # lt:1/1/3 está vazio; lt:1/1/1 (fglt-b) e lt:1/1/2 (fwlt-b) entram com todas as portas
+        expected = [(slot, pon) for slot in (1, 2) for pon in range(1, DEFAULT_PON_PORTS + 1)]
+        self.assertEqual(topology, expected)
+
+    def test_fallback_without_collected_slots(self):
+        topology = build_pon_topology()
+
+        self.assertEqual({slot for slot, _ in topology}, set(FALLBACK_LT_SLOTS))
+        self.assertEqual(len(topology), len(FALLBACK_LT_SLOTS) * DEFAULT_PON_PORTS)
@@ -2,11 +2,13 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.cache import cache
 from django.contrib.auth.models import User
 from datetime import datetime, timedelta
 import logging
 
+from . import activity
+from .metrics_store import request_metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,61 +25,33 @@ def active_users_list(request):
             time_window = int(time_window)
         except ValueError:
             time_window = 1
-        
+
         cutoff_time = datetime.now() - timedelta(hours=time_window)
-        active_users = []
-        
-        # Tentar obter usuários do cache de atividade
-        try:
-            # Para sistemas que suportam pattern matching no cache
-            if hasattr(cache, 'keys'):
-                cache_keys = [k for k in cache.keys('user_activity:*')]
-            else:
-                # Fallback: buscar usuários que fizeram login recentemente
-                recent_user_ids = User.objects.filter(
-                    last_login__gte=cutoff_time
-                ).values_list('id', flat=True)
-                cache_keys = [f'user_activity:{user_id}' for user_id in recent_user_ids]
-        
-        except Exception:
-            # Se falhar, usar abordagem alternativa
-            recent_user_ids = User.objects.filter(
-                last_login__gte=cutoff_time
-            ).values_list('id', flat=True)
-            cache_keys = [f'user_activity:{user_id}' for user_id in recent_user_ids]
-        
-        for cache_key in cache_keys:
-            user_data = cache.get(cache_key)
-            if user_data:
-                try:
-                    last_seen = datetime.fromisoformat(user_data['last_seen'])
-                    if last_seen >= cutoff_time:
-                        active_users.append({
-                            'user_id': user_data.get('user_id'),
-                            'username': user_data.get('username', 'unknown'),
-                            'last_seen': user_data.get('last_seen'),
-                            'first_seen': user_data.get('first_seen'),
-                            'request_count': user_data.get('request_count', 0),
-                            'unique_endpoints': len(user_data.get('endpoints', [])),
-                            'endpoints': user_data.get('endpoints', []),
-                            'ip_addresses': user_data.get('ip_addresses', []),
-                            'avg_response_time': round(user_data.get('avg_response_time', 0), 2),
-                            'hours_active': time_window
-                        })
-                except (ValueError, KeyError) as e:
-                    logger.warning(f"Erro ao processar dados do usuário {cache_key}: {e}")
-                    continue
-        
-        # Ordenar por última atividade
-        active_users.sort(key=lambda x: x['last_seen'], reverse=True)
-        
+
+        # Já ordenados pela última atividade (sorted set de último acesso)
+        active_users = [
+            {
+                'user_id': user_data['user_id'],
+                'username': user_data['username'],
+                'last_seen': user_data['last_seen'],
+                'first_seen': user_data['first_seen'],
+                'request_count': user_data['request_count'],
+                'unique_endpoints': user_data['unique_endpoints'],
+                'endpoints': user_data['endpoints'],
+                'ip_addresses': user_data['ip_addresses'],
+                'avg_response_time': round(user_data['avg_response_time'], 2),
+                'hours_active': time_window
+            }
+            for user_data in activity.get_active_users(cutoff_time.timestamp())
+        ]
+
         return Response({
             'active_users': active_users,
             'total_active_users': len(active_users),
             'time_window_hours': time_window,
             'timestamp': datetime.now().isoformat()
         })
-        
+
     except Exception as e:
         logger.error(f"Erro ao obter usuários ativos: {str(e)}")
         return Response({
@@ -93,14 +67,13 @@ def user_activity_details(request, user_id):
     Retorna detalhes de atividade de um usuário específico
     """
     try:
-        cache_key = f"user_activity:{user_id}"
-        user_data = cache.get(cache_key)
-        
+        user_data = activity.get_user_activity(user_id)
+
         if not user_data:
             return Response({
                 'error': 'Usuário não encontrado ou sem atividade recente'
             }, status=status.HTTP_404_NOT_FOUND)
-        
+
         # Buscar informações adicionais do usuário
         try:
             user = User.objects.get(id=user_id)
@@ -118,35 +91,36 @@ def user_activity_details(request, user_id):
         except User.DoesNotExist:
             user_info = {
                 'id': user_id,
-                'username': user_data.get('username', 'unknown'),
+                'username': user_data['username'],
                 'note': 'Usuário não encontrado no banco de dados'
             }
-        
-        # Calcular estatísticas adicionais
-        status_codes = user_data.get('status_codes', [])
+
+        # Taxa de sucesso sobre todas as requisições contadas por código de status
+        status_codes = user_data['status_codes']
+        total_codes = sum(status_codes.values())
         success_rate = 0
-        if status_codes:
-            success_count = sum(1 for code in status_codes if 200 <= code < 300)
-            success_rate = (success_count / len(status_codes)) * 100
-        
+        if total_codes:
+            success_count = sum(count for code, count in status_codes.items() if 200 <= code < 300)
+            success_rate = (success_count / total_codes) * 100
+
         activity_details = {
             'user_info': user_info,
             'activity_summary': {
-                'first_seen': user_data.get('first_seen'),
-                'last_seen': user_data.get('last_seen'),
-                'total_requests': user_data.get('request_count', 0),
-                'unique_endpoints': len(user_data.get('endpoints', [])),
-                'unique_ip_addresses': len(user_data.get('ip_addresses', [])),
-                'avg_response_time': round(user_data.get('avg_response_time', 0), 2),
+                'first_seen': user_data['first_seen'],
+                'last_seen': user_data['last_seen'],
+                'total_requests': user_data['request_count'],
+                'unique_endpoints': user_data['unique_endpoints'],
+                'unique_ip_addresses': user_data['unique_ip_addresses'],
+                'avg_response_time': round(user_data['avg_response_time'], 2),
                 'success_rate': round(success_rate, 2)
             },
-            'endpoints_accessed': user_data.get('endpoints', []),
-            'ip_addresses_used': user_data.get('ip_addresses', []),
-            'recent_status_codes': status_codes[-20:] if status_codes else []  # Últimos 20
+            'endpoints_accessed': user_data['endpoints'],
+            'ip_addresses_used': user_data['ip_addresses'],
+            'status_codes': {str(code): count for code, count in sorted(status_codes.items())}
         }
-        
+
         return Response(activity_details)
-        
+
     except Exception as e:
         logger.error(f"Erro ao obter detalhes do usuário {user_id}: {str(e)}")
         return Response({
@@ -164,79 +138,66 @@ def api_usage_stats(request):
     try:
         # Buscar todos os usuários ativos nas últimas 24 horas
         cutoff_time = datetime.now() - timedelta(hours=24)
-        
+        active_users = activity.get_active_users(cutoff_time.timestamp())
+        usage_by_hour = activity.get_usage_by_hour(24)
+
+        # Contadores por hora: total de requisições e acessos por endpoint
+        endpoints = {}
+        for _, _, hour_endpoints in usage_by_hour:
+            for endpoint, count in hour_endpoints.items():
+                endpoints[endpoint] = endpoints.get(endpoint, 0) + count
+
         stats = {
-            'total_requests_24h': 0,
-            'unique_users_24h': 0,
+            'total_requests_24h': sum(requests for _, requests, _ in usage_by_hour),
+            'unique_users_24h': len(active_users),
             'most_active_users': [],
             'most_accessed_endpoints': {},
-            'hourly_distribution': {},
+            'hourly_distribution': {hour: requests for hour, requests, _ in usage_by_hour},
             'timestamp': datetime.now().isoformat()
         }
-        
-        # Coletar dados de todos os usuários ativos
-        try:
-            if hasattr(cache, 'keys'):
-                cache_keys = [k for k in cache.keys('user_activity:*')]
-            else:
-                recent_user_ids = User.objects.filter(
-                    last_login__gte=cutoff_time
-                ).values_list('id', flat=True)
-                cache_keys = [f'user_activity:{user_id}' for user_id in recent_user_ids]
-        except Exception:
-            recent_user_ids = User.objects.filter(
-                last_login__gte=cutoff_time
-            ).values_list('id', flat=True)
-            cache_keys = [f'user_activity:{user_id}' for user_id in recent_user_ids]
-        
-        active_users = []
-        
-        for cache_key in cache_keys:
-            user_data = cache.get(cache_key)
-            if user_data:
-                try:
-                    last_seen = datetime.fromisoformat(user_data['last_seen'])
-                    if last_seen >= cutoff_time:
-                        active_users.append(user_data)
-                        stats['total_requests_24h'] += user_data.get('request_count', 0)
-                        
-                        # Contar endpoints
-                        for endpoint in user_data.get('endpoints', []):
-                            if endpoint in stats['most_accessed_endpoints']:
-                                stats['most_accessed_endpoints'][endpoint] += 1
-                            else:
-                                stats['most_accessed_endpoints'][endpoint] = 1
-                
-                except (ValueError, KeyError):
-                    continue
-        
-        stats['unique_users_24h'] = len(active_users)
-        
+
         # Top 10 usuários mais ativos
-        active_users.sort(key=lambda x: x.get('request_count', 0), reverse=True)
+        active_users.sort(key=lambda x: x['request_count'], reverse=True)
         stats['most_active_users'] = [
             {
-                'username': user.get('username', 'unknown'),
-                'user_id': user.get('user_id'),
-                'request_count': user.get('request_count', 0),
-                'avg_response_time': round(user.get('avg_response_time', 0), 2)
+                'username': user['username'],
+                'user_id': user['user_id'],
+                'request_count': user['request_count'],
+                'avg_response_time': round(user['avg_response_time'], 2)
             }
             for user in active_users[:10]
         ]
-        
+
         # Top 10 endpoints mais acessados
         sorted_endpoints = sorted(
-            stats['most_accessed_endpoints'].items(), 
-            key=lambda x: x[1], 
+            endpoints.items(),
+            key=lambda x: x[1],
             reverse=True
         )
         stats['most_accessed_endpoints'] = dict(sorted_endpoints[:10])
-        
+
         return Response(stats)
-        
+
     except Exception as e:
         logger.error(f"Erro ao obter estatísticas de uso: {str(e)}")
         return Response({
             'error': 'Erro interno do servidor',
             'message': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def process_metrics(request):
+    """
+    Retorna as métricas de requisições do processo (worker) que atendeu a chamada
+    """
+    try:
+        return Response(request_metrics.snapshot())
+
+    except Exception as e:
+        logger.error(f"Erro ao obter métricas do processo: {str(e)}")
+        return Response({
+            'error': 'Erro interno do servidor',
+            'message': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
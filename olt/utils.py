@@ -1,31 +1,176 @@
 # import netmiko library
 import base64
+import logging
 from datetime import datetime
 import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from netmiko import ConnectHandler
+from netmiko.exceptions import NetmikoTimeoutException, ReadTimeout, SSHException
 from olt.models import ONU, ClienteFibraIxc, OltUsers, OltSystemInfo, OltSlot, OltTemperature, OltSfpDiagnostics
+from olt import parsers
+from olt.stats import mark_ingest
+from olt.rollups import refresh_rollups
+from olt.history import build_samples, record_samples
 import re
 from dotenv import load_dotenv
 import os
 from librouteros import connect
 from librouteros.exceptions import LibRouterosError
 from django.utils import timezone
+from django.db import transaction
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
 
 # Carregar variáveis de ambiente do arquivo .env
 load_dotenv()
 
-def extract_olt_info(line):
-    """Extract PON, port, and MAC from OLT output line."""
-    pattern = r'(\d+/\d+/\d+/\d+)/(\d+)/\d+\s+\d+\s+([0-9a-f:]+)'
-    match = re.search(pattern, line, re.IGNORECASE)
-    
-    if match:
-        return {
-            'pon': match.group(1),
-            'port': match.group(2),
-            'mac': match.group(3)
-        }
-    return None
+# Tamanho dos lotes de escrita no banco
+ONU_BATCH_SIZE = 500
+
+# Campos da ONU que vêm do status da PON (comparados na reconciliação)
+ONU_STATUS_FIELDS = ['serial', 'admin_state', 'oper_state', 'olt_rx_sig', 'ont_olt', 'desc1', 'desc2', 'cliente_fibra']
+
+# Limite de sessões CLI simultâneas na ISAM (deixa folga para os operadores)
+MAX_OLT_SESSIONS = 8
+
+# Comando com o status das ONUs de uma PON
+ONT_STATUS_COMMAND = "show equipment ont status pon 1/1/{slot}/{pon}"
+
+# Linhas do FDB acumuladas antes de cada gravação no banco
+MAC_BATCH_SIZE = 1000
+
+# PONs consultadas em cada placa LT (as portas sem ONU só devolvem a saída vazia)
+DEFAULT_PON_PORTS = 16
+
+# Slots usados enquanto a topologia ainda não foi coletada
+FALLBACK_LT_SLOTS = (1, 2)
+
+TOPOLOGY_CACHE_KEY = 'olt_pon_topology'
+TOPOLOGY_CACHE_TIMEOUT = 3600
+
+LT_SLOT_PATTERN = re.compile(r'^lt:(\d+)/(\d+)/(\d+)$')
+
+# Erros que indicam queda do canal SSH (justificam uma nova conexão)
+CHANNEL_ERRORS = (NetmikoTimeoutException, ReadTimeout, SSHException, OSError, EOFError)
+
+
+class OltSession:
+    """
+    Sessão SSH persistente com a OLT.
+    Faz um único login e reaproveita o canal para vários comandos,
+    reconectando automaticamente se o canal cair no meio da sessão.
+    """
+
+    def __init__(self, device, max_retries=1):
+        self.device = device
+        self.max_retries = max_retries
+        self.net_connect = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Abre a conexão caso ainda não exista"""
+        if self.net_connect is None:
+            self.net_connect = ConnectHandler(**self.device)
+            self.net_connect.find_prompt()
+        return self.net_connect
+
+    def close(self):
+        """Fecha a conexão ignorando erros de um canal já encerrado"""
+        if self.net_connect is not None:
+            try:
+                self.net_connect.disconnect()
+            except Exception:
+                pass
+            self.net_connect = None
+
+    def send_command(self, command, **kwargs):
+        """Envia um comando, reconectando e repetindo em caso de falha no canal"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.open().send_command(command, **kwargs)
+            except CHANNEL_ERRORS:
+                self.close()
+                if attempt >= self.max_retries:
+                    raise
+
+    def stream_command(self, command, read_timeout=1200, poll_interval=0.2):
+        """
+        Envia um comando e devolve as linhas da saída conforme chegam pelo canal,
+        sem acumular a saída inteira em memória. Termina quando o prompt volta.
+        """
+        net_connect = self.open()
+        net_connect.clear_buffer()
+        net_connect.write_channel(command + net_connect.RETURN)
+
+        deadline = time.monotonic() + read_timeout
+        pending = ''
+        echoed = False
+        while True:
+            chunk = net_connect.read_channel()
+            if chunk:
+                pending += net_connect.strip_ansi_escape_codes(chunk)
+                *lines, pending = pending.split('\n')
+                for line in lines:
+                    line = line.rstrip('\r')
+                    if not echoed and command in line:
+                        echoed = True
+                        continue
+                    yield line
+            # Só aceita o prompt depois do eco do comando
+            elif echoed and net_connect.base_prompt in pending and pending.rstrip().endswith(('#', '>', '$')):
+                return
+            elif time.monotonic() > deadline:
+                raise ReadTimeout(f"Tempo esgotado aguardando a saída de '{command}'")
+            else:
+                time.sleep(poll_interval)
+
+
+def build_pon_topology():
+    """
+    Monta a lista de (slot, pon) a partir das placas LT operacionais em OltSlot,
+    com DEFAULT_PON_PORTS PONs por placa (o `show equipment slot` não informa a
+    quantidade de portas). Sem nenhuma placa LT coletada, usa os slots padrão.
+    """
+    lt_slots = OltSlot.objects.filter(is_active=True, slot_name__startswith='lt:').order_by('slot_name')
+    if not lt_slots.exists():
+        return [(slot, pon) for slot in FALLBACK_LT_SLOTS for pon in range(1, DEFAULT_PON_PORTS + 1)]
+
+    targets = []
+    for lt_slot in lt_slots:
+        match = LT_SLOT_PATTERN.match(lt_slot.slot_name)
+        if not match or not lt_slot.is_operational:
+            continue
+        slot = int(match.group(3))
+        targets.extend((slot, pon) for pon in range(1, DEFAULT_PON_PORTS + 1))
+    return sorted(targets)
+
+
+def failed_pon_changes(pon):
+    """Alterações de uma PON que não pôde ser atualizada (dados do banco mantidos)"""
+    return {'pon': pon, 'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0, 'failed': 1}
+
+
+def get_pon_topology():
+    """Retorna as PONs existentes na OLT, usando o cache quando disponível"""
+    topology = cache.get(TOPOLOGY_CACHE_KEY)
+    if topology is None:
+        topology = build_pon_topology()
+        cache.set(TOPOLOGY_CACHE_KEY, topology, TOPOLOGY_CACHE_TIMEOUT)
+    return topology
+
+
+def clear_pon_topology_cache():
+    """Descarta a topologia em cache (após coletar os slots)"""
+    cache.delete(TOPOLOGY_CACHE_KEY)
+
 
 class olt_connector():
 
@@ -38,6 +183,12 @@ class olt_connector():
             'verbose': os.getenv('NOKIA_VERBOSE') == 'True',
             'global_delay_factor': int(os.getenv('NOKIA_GLOBAL_DELAY_FACTOR')),
         }
+        # Quantidade de sessões SSH paralelas usadas nas coletas por PON
+        max_sessions = int(os.getenv('NOKIA_MAX_SESSIONS', 4))
+        self.max_sessions = max(1, min(max_sessions, MAX_OLT_SESSIONS))
+        self._clientes_fibra_keys = None
+        # Amostras de sinal acumuladas durante a coleta (gravadas em lote no final)
+        self._signal_samples = []
 
     def connect(self):
         # Connect to OLT
@@ -48,7 +199,72 @@ class olt_connector():
 
     def disconnect(self, net_connect):
         net_connect.disconnect()
+
+    def session(self):
+        """Retorna uma sessão persistente (usar com `with`)"""
+        return OltSession(self.nokia)
     
+    def collect_pon_outputs(self, targets, command=ONT_STATUS_COMMAND):
+        """
+        Executa o comando em cada (slot, pon) distribuindo as PONs entre até
+        `max_sessions` sessões SSH simultâneas.
+        Retorna [(slot, pon, output)] na mesma ordem de `targets`;
+        output é None quando o comando falhou.
+        Se nenhuma PON respondeu (ex.: login recusado em todas as sessões), levanta
+        ConnectionError para a tarefa falhar em vez de parecer uma varredura vazia.
+        """
+        targets = list(targets)
+        if not targets:
+            return []
+
+        pending = queue.Queue()
+        for target in targets:
+            pending.put(target)
+        login_errors = []
+
+        def worker():
+            outputs = {}
+            try:
+                session = self.session()
+                session.open()
+            except Exception as e:
+                # As demais sessões continuam consumindo a fila
+                login_errors.append(e)
+                return outputs
+            try:
+                while True:
+                    try:
+                        slot, pon = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    try:
+                        outputs[(slot, pon)] = session.send_command(command.format(slot=slot, pon=pon))
+                    except Exception:
+                        outputs[(slot, pon)] = None
+            finally:
+                session.close()
+            return outputs
+
+        workers = min(self.max_sessions, len(targets))
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(worker) for _ in range(workers)]
+            for future in futures:
+                results.update(future.result())
+
+        collected = [(slot, pon, results.get((slot, pon))) for slot, pon in targets]
+        failed = sum(1 for _, _, output in collected if output is None)
+        if failed == len(targets):
+            if len(login_errors) == workers:
+                raise ConnectionError(f"Nenhuma sessão com a OLT pôde ser aberta: {login_errors[-1]}") from login_errors[-1]
+            raise ConnectionError(f"Nenhuma das {len(targets)} PONs respondeu ao comando")
+        if failed * 2 > len(targets):
+            logger.warning(
+                "%s de %s PONs sem resposta da OLT (%s sessões sem login)",
+                failed, len(targets), len(login_errors),
+            )
+        return collected
+
     def get_onu_detail(self, item):
         net_connect = self.connect()
         ont_details = f'show vlan bridge-port-fdb {item}/14/1'
@@ -76,121 +292,295 @@ class olt_connector():
         if expect_string is not None:
             self.expect_string = expect_string
 
-        net_connect = self.connect()
-        olts = OltUsers.objects.all()
-        olts.delete()
+        new_olt_users = []
+        for slot, pon, output in self.collect_pon_outputs(get_pon_topology()):
+            if output is None:
+                continue
+            new_olt_users.extend(self.build_olt_users(slot, pon, output))
+
+        self.replace_olt_users(new_olt_users)
 
-        for slot in range(3):
-            for pon in range(17):
-                command = f"show equipment ont status pon 1/1/{slot}/{pon}"
+    def build_olt_users(self, slot, pon, output):
+        """Monta a ocupação da porta (sem salvar) a partir da linha "count" do status da PON"""
+        new_olt_users = []
+        for line in iter(output.splitlines()):
+            if "count" in line:
                 try:
-                    output = net_connect.send_command(command)
-                    for line in iter(output.splitlines()):
-                        if "count" in line:
-                            new_olt_user = OltUsers()
-                            new_olt_user.slot = slot
-                            new_olt_user.port = pon
-                            new_olt_user.users_connected = int(line.split(":")[1])
-                            new_olt_user.last_updated = timezone.now()
-                            new_olt_user.save()
-                except Exception as e:
+                    users_connected = int(line.split(":")[1])
+                except (IndexError, ValueError):
                     continue
-        
-        self.disconnect(net_connect)
+                new_olt_user = OltUsers()
+                new_olt_user.slot = slot
+                new_olt_user.port = pon
+                new_olt_user.users_connected = users_connected
+                new_olt_user.last_updated = timezone.now()
+                new_olt_users.append(new_olt_user)
+        return new_olt_users
+
+    def replace_olt_users(self, new_olt_users):
+        """Substitui a ocupação das portas numa única transação"""
+        # Nada coletado: mantém a ocupação atual
+        if not new_olt_users:
+            return
+
+        with transaction.atomic():
+            OltUsers.objects.all().delete()
+            OltUsers.objects.bulk_create(new_olt_users)
+        mark_ingest()
     
     def get_itens_to_port(self, slot, pon, order_by='position'):
         old_values = ONU.objects.filter(pon=f"1/1/{slot}/{pon}").order_by(order_by)
         return old_values
 
     def update_all_ports(self):
-        for slot in range(3):
-            for pon in range(17):
-                self.update_port(slot, pon)
+        """Atualiza todas as PONs e retorna a lista de alterações por PON"""
+        # Recarrega os clientes fibra uma vez por atualização
+        self._clientes_fibra_keys = None
+        changes = []
+        # As PONs são distribuídas entre sessões paralelas e gravadas em ordem
+        for slot, pon, output in self.collect_pon_outputs(get_pon_topology()):
+            result = self.apply_pon_output(slot, pon, output)
+            if result is not None:
+                changes.append(result)
+        self.flush_signal_samples()
+        refresh_rollups()
+        mark_ingest()
+        return changes
 
-    def update_port(self, slot, pon):
-        old_values = ONU.objects.filter(pon=f"1/1/{slot}/{pon}")
-        old_values.delete()
-        net_connect = self.connect()
-        command = f"show equipment ont status pon 1/1/{slot}/{pon}"
+    def update_ports_and_onus(self):
+        """
+        Executa o status de cada PON uma única vez e atualiza, com a mesma saída,
+        a ocupação das portas (OltUsers) e o inventário de ONUs.
+        Retorna a lista de alterações de ONUs por PON.
+        """
+        self._clientes_fibra_keys = None
+        changes = []
+        new_olt_users = []
+        for slot, pon, output in self.collect_pon_outputs(get_pon_topology()):
+            if output is not None:
+                new_olt_users.extend(self.build_olt_users(slot, pon, output))
+            result = self.apply_pon_output(slot, pon, output)
+            if result is not None:
+                changes.append(result)
+
+        self.replace_olt_users(new_olt_users)
+        self.flush_signal_samples()
+        refresh_rollups()
+        mark_ingest()
+        return changes
+
+    def apply_pon_output(self, slot, pon, output):
+        """
+        Reconcilia as ONUs de uma PON com a saída coletada.
+        Se a coleta (output None) ou a gravação falhar, os dados atuais da PON são
+        mantidos e o retorno vem com failed=1 para a varredura contabilizar.
+        """
+        pon_name = f"1/1/{slot}/{pon}"
+        if output is None:
+            return failed_pon_changes(pon_name)
         try:
-            output = net_connect.send_command(command)
-            self.update_values(output)
+            return self.update_values(output, pon=pon_name)
         except Exception:
-            pass
+            logger.exception("Erro ao reconciliar a PON %s", pon_name)
+            return failed_pon_changes(pon_name)
+
+    def update_port(self, slot, pon, session=None):
+        """
+        Atualiza as ONUs de uma PON comparando com o que já está no banco.
+        Se o comando falhar, os dados atuais da PON são mantidos.
+        """
+        # Sem sessão compartilhada, abre uma conexão só para esta PON
+        own_session = session is None
+        if own_session:
+            session = self.session()
+        command = ONT_STATUS_COMMAND.format(slot=slot, pon=pon)
+        pon_name = f"1/1/{slot}/{pon}"
+        try:
+            output = session.send_command(command)
+            result = self.update_values(output, pon=pon_name)
+            self.flush_signal_samples()
+            refresh_rollups([pon_name])
+            mark_ingest()
+            return result
+        except Exception:
+            logger.exception("Erro ao atualizar a PON %s", pon_name)
+            return failed_pon_changes(pon_name)
         finally:
-            self.disconnect(net_connect)
+            if own_session:
+                session.close()
     
     def get_mac_values(self):
-        net_connect = self.connect()
         try:
-            command = "environment inhibit-alarms"
-            net_connect.write_channel(command)
-            time.sleep(2)  # Aguarda um pouco para o comando ser processado
-            command = "show vlan bridge-port-fdb"
-            output = net_connect.send_command(command, read_timeout=1200)
-            self.update_mac(output)
-        except Exception as e:
-            print(f"Erro ao obter valores MAC: {str(e)}")
-        finally:
-            self.disconnect(net_connect)
+            with self.session() as session:
+                net_connect = session.open()
+                command = "environment inhibit-alarms"
+                net_connect.write_channel(command + net_connect.RETURN)
+                time.sleep(2)  # Aguarda um pouco para o comando ser processado
+                # O FDB é processado em lotes enquanto a OLT ainda está enviando
+                command = "show vlan bridge-port-fdb"
+                self.update_mac_lines(session.stream_command(command, read_timeout=1200))
+        except Exception:
+            # Repassa o erro para a tarefa falhar: parte do FDB pode não ter sido aplicada
+            logger.exception("Erro ao obter valores MAC")
+            raise
     
     def update_mac(self, output):
         try:
             if not output:
                 return
-            lines = output.strip().split('\n')
-            for line in lines:
-                try:
-                    data = extract_olt_info(line)
-                    if data:
-                        parts = data['pon'].split('/')
-                        pon = '/'.join(parts[:3])
-                        position = parts[-1]
-        
-                        onu = ONU.objects.filter(
-                            pon=f"1/{pon}",
-                            position=position
-                        ).first()
-
-                        if onu:
-                            onu.mac = data['mac']
-                            onu.save()
-                except Exception:
-                    continue
+            self.update_mac_lines(output.strip().split('\n'))
         except Exception:
             pass
 
-    def update_values(self, output):
-        data_dict = {}
+    def update_mac_lines(self, lines):
+        """Interpreta as linhas do FDB e grava cada lote assim que fica completo"""
+        # Índice (pon, position) -> ONU carregado uma única vez
+        onu_index = self.get_onu_index()
+        batch = []
         try:
-            data_dict = self.create_dict_from_result(output)
-        except:
-            pass
+            for entry in parsers.parse_fdb(lines):
+                batch.append(entry)
+                if len(batch) >= MAC_BATCH_SIZE:
+                    self.apply_mac_batch(batch, onu_index)
+                    batch = []
+            if batch:
+                self.apply_mac_batch(batch, onu_index)
+        finally:
+            # Lotes já gravados antes de uma falha (ex.: timeout no meio do FDB)
+            # também precisam refletir nos resumos e no cache das estatísticas
+            refresh_rollups()
+            mark_ingest()
 
-        for data in data_dict:
-            new_onu = ONU()
-            try:
-                has_cliente = ClienteFibraIxc.objects.get(mac=data['sernum'], nome=data['desc1'])
-                if has_cliente:
-                    new_onu.cliente_fibra = True
-            except:
-                pass
-            
-            new_onu.pon = data['pon']
-            new_onu.position = data['position']
-            new_onu.serial = data['sernum']
-            new_onu.admin_state = data['admin_status']
-            new_onu.oper_state = data['oper_status']
-            # Convert olt_rx_sig to float before saving
-            try:
-                new_onu.olt_rx_sig = float(data['olt_rx_sig'])
-            except (ValueError, TypeError):
-                new_onu.olt_rx_sig = None
-            new_onu.ont_olt = data['ont_olt']
-            new_onu.desc1 = data['desc1']
-            new_onu.desc2 = data['desc2']
-            new_onu.save()
+    def get_onu_index(self):
+        """Mapeia (pon, position) para a ONU (apenas id e mac) de todo o inventário"""
+        onu_index = {}
+        for onu in ONU.objects.only('id', 'pon', 'position', 'mac').order_by('id'):
+            onu_index[(onu.pon, onu.position)] = onu
+        return onu_index
+
+    def apply_mac_batch(self, batch, onu_index):
+        """Aplica as mudanças de MAC de um lote com um único bulk_update"""
+        changed = {}
+        for entry in batch:
+            onu = onu_index.get((entry.pon, entry.position))
+            if onu is not None and onu.mac != entry.mac:
+                onu.mac = entry.mac
+                changed[onu.id] = onu
+
+        if changed:
+            with transaction.atomic():
+                ONU.objects.bulk_update(changed.values(), ['mac'], batch_size=ONU_BATCH_SIZE)
+
+    def get_clientes_fibra_keys(self):
+        """Conjunto de pares (serial, desc1) dos clientes fibra, carregado uma única vez"""
+        if self._clientes_fibra_keys is None:
+            self._clientes_fibra_keys = set(ClienteFibraIxc.objects.values_list('mac', 'nome'))
+        return self._clientes_fibra_keys
+
+    def build_onu(self, data, clientes_fibra):
+        """Monta uma ONU (sem salvar) a partir de um OntStatusRecord"""
+        new_onu = ONU()
+        new_onu.cliente_fibra = (data.sernum, data.desc1) in clientes_fibra
+        new_onu.pon = data.pon
+        new_onu.position = data.position
+        new_onu.serial = data.sernum
+        new_onu.admin_state = data.admin_status
+        new_onu.oper_state = data.oper_status
+        new_onu.olt_rx_sig = data.olt_rx_sig
+        new_onu.ont_olt = data.ont_olt
+        new_onu.desc1 = data.desc1
+        new_onu.desc2 = data.desc2
+        return new_onu
+
+    def update_values(self, output, pon=None):
+        # Erro no parser sobe para quem chamou: reconciliar com uma lista vazia
+        # removeria todas as ONUs da PON
+        records = parsers.parse_ont_status(output)
+
+        # Sem nenhuma linha e sem o contador, a saída não é um status de PON válido
+        if not records and "count" not in output:
+            return None
+
+        clientes_fibra = self.get_clientes_fibra_keys()
+        new_onus = [self.build_onu(data, clientes_fibra) for data in records]
+
+        if pon is None:
+            if not new_onus:
+                return None
+            pon = new_onus[0].pon
+
+        return self.reconcile_pon(pon, new_onus)
+
+    def reconcile_pon(self, pon, new_onus):
+        """
+        Aplica no banco apenas o que mudou na PON, usando (pon, position) como chave.
+        Mantém o id das ONUs existentes e retorna a contagem de alterações.
+        """
+        existing = {}
+        to_delete = []
+        for onu in ONU.objects.filter(pon=pon).order_by('id'):
+            if onu.position in existing:
+                # Registro duplicado na mesma posição
+                to_delete.append(existing[onu.position].id)
+            existing[onu.position] = onu
+
+        to_create = []
+        to_update = []
+        kept = []
+        unchanged = 0
+        for new_onu in new_onus:
+            current = existing.pop(new_onu.position, None)
+            if current is None:
+                to_create.append(new_onu)
+                continue
+
+            changed = False
+            if current.serial != new_onu.serial:
+                # Outra ONU ocupa a posição, o MAC antigo não vale mais
+                current.mac = ''
+                changed = True
+            for field in ONU_STATUS_FIELDS:
+                value = getattr(new_onu, field)
+                if getattr(current, field) != value:
+                    setattr(current, field, value)
+                    changed = True
+
+            kept.append(current)
+            if changed:
+                to_update.append(current)
+            else:
+                unchanged += 1
+
+        # O que sobrou no banco não existe mais na OLT
+        to_delete.extend(onu.id for onu in existing.values())
+
+        with transaction.atomic():
+            if to_delete:
+                ONU.objects.filter(id__in=to_delete).delete()
+            ONU.objects.bulk_create(to_create, batch_size=ONU_BATCH_SIZE)
+            ONU.objects.bulk_update(to_update, ONU_STATUS_FIELDS + ['mac'], batch_size=ONU_BATCH_SIZE)
+
+        # Histórico: uma amostra por ONU presente na PON (as novas já têm id após o bulk_create)
+        self._signal_samples.extend(build_samples(kept + to_create, timezone.now()))
+
+        return {
+            'pon': pon,
+            'created': len(to_create),
+            'updated': len(to_update),
+            'deleted': len(to_delete),
+            'unchanged': unchanged,
+            'failed': 0,
+        }
             
+    def flush_signal_samples(self):
+        """Grava de uma vez as amostras de sinal acumuladas na coleta"""
+        samples, self._signal_samples = self._signal_samples, []
+        try:
+            return record_samples(samples)
+        except Exception:
+            logger.exception("Erro ao gravar histórico de sinal")
+            return 0
+
     def remove_onu(self, pon):
         net_connect = self.connect()
         try:
@@ -223,87 +613,11 @@ class olt_connector():
             self.disconnect(net_connect)
 
     def create_mac_dict(self, data):
-        pattern = r"(\d+/\d+/\d+/\d+/\d+/\d+/\d+)\s+(\d+)\s+([a-f0-9:]+)\s+(\d+)\s+(\w+)\s+([0-9:]+)"
-        matches = re.findall(pattern, data)
-        data_dict = {}
-
-        for match in matches:
-            pon_value = match[0]
-            parts = pon_value.split('/')
-            first_five_parts = parts[:4]
-            pon_first_five = '/'.join(first_five_parts)
-            data_dict[match[0]] = {
-                'pon': pon_first_five,
-                'position': parts[-3] if len(parts) > 3 else None,
-                'mac_address': match[2],
-                'status_2': match[3],
-                'learned': match[4],
-                'time': match[5]
-            }
-
-        return data_dict
+        return parsers.parse_mac_table(data)
 
     def create_dict_from_result(self, data):
-
-
-        '''
-            1/1/1/14   1/1/1/14/90    RCMG:3A88390E up       up       -23.0       0.5           tomazpaiva                                        tomazpaiva                                        undefined
-            1/1/1/14   1/1/1/14/91    ALCL:B3FD63A5 up       up       -22.3       0.8           vitorfrancisco                                    vitorfrancisco                                    undefined
-            1/1/1/14   1/1/1/14/92    TPLG:00CEA2A8 up       up       -25.5       0.8           andressasantos                                    andressasantos                                    undefined
-            1/1/1/14   1/1/1/14/93    RCMG:3A900F62 up       up       -23.7       0.6           wendersoncarvalho                                 wendersoncarvalho                                 undefined
-            1/1/1/14   1/1/1/14/94    RCMG:3A88121C up       up       -23.5       0.8           harlenycobra                                      harlenycobra                                      undefined
-            1/1/1/14   1/1/1/14/95    RCMG:3A900819 up       up       -23.5       0.4           mateusmarlise                                     mateusmarlise                                     undefined
-            1/1/1/14   1/1/1/14/96    RCMG:19897186 up       down     invalid     invalid       sedeprefeitura02                                  sedeprefeitura02                                  undefined
-            1/1/1/14   1/1/1/14/97    RCMG:3A9001A8 up       up       -26.9       0.6           iraidedasilva                                     iraidedasilva                                     undefined
-            1/1/1/14   1/1/1/14/98    ALCL:B3FD7281 up       up       -23.4       0.6           PABX                                              Prefeitura                                        undefined
-            1/1/1/14   1/1/1/14/99    RCMG:19897299 up       up       -22.0       0.6           zema                                              zema                                              undefined
-            1/1/1/14   1/1/1/14/100   RCMG:3AB87E24 up       up       -23.4       0.4           associacaoborda                                   associacaoborda                                   undefined
-            1/1/1/14   1/1/1/14/101   ALCL:F881EC74 up       up       -22.4       0.6           maurarezende                                      maurarezende                                      undefined
-            1/1/1/14   1/1/1/14/102   SHLN:1201A090 up       up       -27.2       0.5           fb2efd70                                          fb2efd70                                          undefined
-            1/1/1/14   1/1/1/14/103   ALCL:B3D6ADAF up       up       -21.9       0.3           gabrielescritorio                                 gabrielescritorio                                 undefined
-            1/1/1/14   1/1/1/14/104   HWTC:03282910 up       up       -22.6       0.4           8ef83f14                                          8ef83f14                                          undefined
-            1/1/1/14   1/1/1/14/106   RCMG:3A900D2B up       up       -22.7       0.5           thaisavo                                          thaisavo                                          undefined
-            1/1/1/14   1/1/1/14/107   RCMG:3A9010EF up       up       -23.6       0.5           alexandremedeiros                                 alexandremedeiros                                 undefined
-            1/1/1/14   1/1/1/14/108   HWTC:03297F70 up       up       -24.4       0.6           mariacaetano                                      mariacaetano                                      undefined
-            1/1/1/14   1/1/1/14/109   RCMG:3A900ABB up       up       -24.4       0.5           tottiloja                                         tottiloja                                         undefined
-            1/1/1/14   1/1/1/14/110   ALCL:F881C42C up       up       -28.8       0.7           veronicapaiva                                     veronicapaiva                                     undefined
-            1/1/1/14   1/1/1/14/111   HWTC:032A1CA0 up       up       -22.8       0.8                                                                                                               undefined
-            1/1/1/14   1/1/1/14/112   RCMG:3A9002FC up       up       -23.9       0.5           dorissantana                                      dorissantana                                      undefined
-            1/1/1/14   1/1/1/14/113   HWTC:03282860 up       up       -23.8       0.4           cleitonclube                                      cleitonclube                                      undefined
-            1/1/1/14   1/1/1/14/115   HWTC:03285540 up       up       -24.9       0.6           michelcasa                                        michelcasa                                        undefined
-            1/1/1/14   1/1/1/14/116   RCMG:3A9016F8 up       down     invalid     invalid       dondokaateliealine                                dondokaateliealine                                undefined
-            1/1/1/14   1/1/1/14/117   OPTI:35013849 up       up       -25.5       0.7           carolinacasa                                      carolinacasa                                      undefined
-            1/1/1/14   1/1/1/14/118   ALCL:FBE0EB05 up       up       -23.2       0.7           departamentoeducacao                              departamentoeducacao                              undefined
-
-        '''
-
-        pattern = r'\s*(\d+/\d+/\d+/\d+)\s+(\d+/\d+/\d+/\d+/\d+)\s+(\w+:\w+)\s+(\w+)\s+(\w+|invalid)\s+([-.\d]+|invalid)\s+([-.\d]+|invalid)\s+(.*?)\s+(.*?)\s+(.*?)\s*'
-
-        data_list = []
-        matches = re.findall(pattern, data)
-        for match in matches:
-            pon = match[0]
-            position = match[1].split("/")[-1]
-            sernum = match[2]
-            admin_status = match[3]
-            oper_status = match[4]
-            olt_rx_sig = match[5]
-            ont_olt = match[6]
-            desc1 = match[7]
-            desc2 = match[8]
-            
-            data_list.append( {
-                'pon': pon,
-                'position': position,
-                'sernum': sernum,
-                'admin_status': admin_status,
-                'oper_status': oper_status,
-                'olt_rx_sig': olt_rx_sig,
-                'ont_olt': ont_olt,
-                'desc1': desc1,
-                'desc2': desc2
-            })
-        return data_list
+        """Linhas do status da PON como dicionários (ver olt/parsers/samples/ont_status_pon.txt)"""
+        return [record.as_dict() for record in parsers.parse_ont_status(data)]
         
 
 def connect_to_mikrotik(hostname, username, password, port):
@@ -417,6 +731,10 @@ class OltSystemCollector:
                 # Remover apenas os que realmente não existem mais
                 # (opcional - pode manter histórico)
                 # OltSlot.objects.filter(is_active=False).delete()
+
+            # As coletas por PON passam a usar as placas atualizadas
+            clear_pon_topology_cache()
+            mark_ingest()
             
             return OltSlot.objects.filter(is_active=True)
             
@@ -451,6 +769,7 @@ class OltSystemCollector:
                 # Remover apenas os que realmente não existem mais
                 # (opcional - pode manter histórico)
                 # OltTemperature.objects.filter(is_active=False).delete()
+            mark_ingest()
             
             return OltTemperature.objects.filter(is_active=True)
             
@@ -481,8 +800,7 @@ class OltSystemCollector:
     def _parse_isam_release(self, output):
         """Extrai a versão ISAM do output"""
         try:
-            match = re.search(r'isam-release\s*:\s*(\S+)', output)
-            return match.group(1) if match else "Unknown"
+            return parsers.parse_isam_release(output)
         except Exception:
             return "Unknown"
     
@@ -490,23 +808,7 @@ class OltSystemCollector:
         """Extrai informações de uptime"""
         try:
             # Exemplo: "System Up Time         : 958 days, 12:26:47.46 (hr:min:sec)"
-            match = re.search(r'(\d+)\s+days?,\s+(\d+):(\d+):(\d+)', output)
-            if match:
-                return {
-                    'days': int(match.group(1)),
-                    'hours': int(match.group(2)),
-                    'minutes': int(match.group(3)),
-                    'seconds': int(match.group(4)),
-                    'raw': output.strip()
-                }
-            else:
-                return {
-                    'days': 0,
-                    'hours': 0,
-                    'minutes': 0,
-                    'seconds': 0,
-                    'raw': output.strip()
-                }
+            return parsers.parse_uptime(output)
         except Exception:
             return {
                 'days': 0,
@@ -518,79 +820,16 @@ class OltSystemCollector:
     
     def _parse_slots(self, output):
         """Extrai informações dos slots"""
-        slots = []
         try:
-            # Buscar linhas com dados de slots
-            lines = output.split('\n')
-            for line in lines:
-                line = line.strip()
-                # Procura por linhas que contêm dados de slots (não cabeçalhos ou separadores)
-                if any(prefix in line for prefix in ['acu:', 'nt-', 'lt:', 'vlt:']):
-                    # Divide por espaços múltiplos para separar as colunas
-                    parts = [part.strip() for part in line.split() if part.strip()]
-                    if len(parts) >= 6:
-                        # Reconstrói slot_name caso tenha sido dividido
-                        slot_name = parts[0]
-                        if not any(prefix in slot_name for prefix in ['acu:', 'nt-', 'lt:', 'vlt:']):
-                            continue
-                            
-                        actual_type = parts[1]
-                        enabled = parts[2].lower() == 'yes'
-                        error_status = parts[3]
-                        availability = parts[4]
-                        restart_count = int(parts[5]) if parts[5].isdigit() else 0
-                        
-                        slots.append({
-                            'slot_name': slot_name,
-                            'actual_type': actual_type,
-                            'enabled': enabled,
-                            'error_status': error_status,
-                            'availability': availability,
-                            'restart_count': restart_count
-                        })
+            return [slot.as_dict() for slot in parsers.parse_slots(output)]
         except Exception as e:
             print(f"Erro ao fazer parse dos slots: {str(e)}")
-        
-        return slots
+            return []
     
     def _parse_temperature(self, output):
         """Extrai informações de temperatura"""
-        temperatures = []
         try:
-            lines = output.split('\n')
-            for line in lines:
-                line = line.strip()
-                # Procura por linhas que contêm dados de temperatura
-                if any(prefix in line for prefix in ['nt-', 'lt:', 'acu:']):
-                    # Divide por espaços múltiplos para separar as colunas
-                    parts = [part.strip() for part in line.split() if part.strip()]
-                    if len(parts) >= 7:
-                        try:
-                            slot_name = parts[0]
-                            # Verifica se é uma linha válida de dados
-                            if not any(prefix in slot_name for prefix in ['nt-', 'lt:', 'acu:']):
-                                continue
-                                
-                            sensor_id = int(parts[1])
-                            actual_temp = int(parts[2])
-                            tca_low = int(parts[3])
-                            tca_high = int(parts[4])
-                            shutdown_low = int(parts[5])
-                            shutdown_high = int(parts[6])
-                            
-                            temperatures.append({
-                                'slot_name': slot_name,
-                                'sensor_id': sensor_id,
-                                'actual_temp': actual_temp,
-                                'tca_low': tca_low,
-                                'tca_high': tca_high,
-                                'shutdown_low': shutdown_low,
-                                'shutdown_high': shutdown_high
-                            })
-                        except (ValueError, IndexError):
-                            # Pular linhas com valores não numéricos ou insuficientes
-                            continue
+            return [temp.as_dict() for temp in parsers.parse_temperature(output)]
         except Exception as e:
             print(f"Erro ao fazer parse da temperatura: {str(e)}")
-        
-        return temperatures
+            return []
@@ -2,7 +2,7 @@ from django.http import HttpResponse
 from django.template import loader
 from olt.utils import connect_to_mikrotik, get_nat_rules, olt_connector, OltSystemCollector
 from django.shortcuts import render, redirect
-from olt.models import ONU, ClienteFibraIxc, OltUsers, OltSystemInfo, OltSlot, OltTemperature
+from olt.models import ONU, ClienteFibraIxc, OltUsers, OltSystemInfo, OltTemperature
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.decorators import login_required
 from routeros_api import RouterOsApiPool
@@ -15,7 +15,11 @@ from .tasks import (
     update_mac_task
 )
 from django.core.paginator import Paginator
-from django.db.models import Q, FloatField, Count, Avg, Max
+from .search import search_onus, search_clientes
+from .onu_utils import get_duplicated_onus
+from .stats import get_stats, mark_ingest
+from .rollups import refresh_rollups
+from django.db.models import Q, FloatField, Count
 from django.db.models.functions import Cast
 import os
 from dotenv import load_dotenv
@@ -28,69 +32,39 @@ load_dotenv()
 
 @login_required
 def home(request):
-    # Quantidade de ONUs sem MAC
-    onus_without_mac = ONU.objects.filter(mac__isnull=True).count() + ONU.objects.filter(mac='').count()
-
-    # Quantidade de ONUs sem cliente fibra
-    onus_without_client = ONU.objects.filter(cliente_fibra=False).count()
-
-    # Quantidade de clientes com sinal < -27
-    # clients_signal_below_27_count = ONU.objects.filter(olt_rx_sig__lt=-27).count()
-
-    # Quantidade de clientes com sinal < -29
-    clients_signal_below_29_count = ONU.objects.filter(olt_rx_sig__lt=-29).count()
-
-    # Quantidade de clientes com sinal entre -27 e -29
-    clients_signal_below_27_count = ONU.objects.filter(olt_rx_sig__gte=-29, olt_rx_sig__lte=-27).count()
+    # Contadores de ONUs, slots e temperaturas (cacheados até a próxima coleta)
+    stats = get_stats()
+    onu_counts = stats['onus']
 
     # 5 portas com maior ocupação
     top_ports = OltUsers.objects.order_by('-users_connected')[:5]
 
-    # Informações da OLT
+    # Informações do sistema
     try:
-        # Informações do sistema
         system_info = OltSystemInfo.objects.first()
-        
-        # Estatísticas dos slots
-        total_slots = OltSlot.objects.count()
-        operational_slots = OltSlot.objects.filter(
-            enabled=True, 
-            availability='available', 
-            error_status='no-error'
-        ).count()
-        
-        # Temperaturas críticas e de aviso
-        critical_temps = OltTemperature.objects.filter(actual_temp__gte=75).count()
-        warning_temps = OltTemperature.objects.filter(actual_temp__gte=70, actual_temp__lt=75).count()
-        
-        # Temperatura média
-        avg_temp = OltTemperature.objects.aggregate(avg_temp=Avg('actual_temp'))['avg_temp']
-        max_temp = OltTemperature.objects.aggregate(max_temp=Max('actual_temp'))['max_temp']
-        
     except Exception as e:
         print(f"Erro ao obter informações da OLT: {str(e)}")
         system_info = None
-        total_slots = 0
-        operational_slots = 0
-        critical_temps = 0
-        warning_temps = 0
-        avg_temp = 0
-        max_temp = 0
+
+    avg_temp = stats['avg_temp']
+    max_temp = stats['max_temp']
+    total_slots = stats['total_slots']
+    operational_slots = stats['operational_slots']
 
     template = loader.get_template('olt/dashboard.html')
     context = {
-        'onus_without_mac': onus_without_mac,
-        'onus_without_client': onus_without_client,
-        'clients_signal_below_27_count': clients_signal_below_27_count,
-        'clients_signal_below_29_count': clients_signal_below_29_count,
+        'onus_without_mac': onu_counts['without_mac'],
+        'onus_without_client': onu_counts['without_client'],
+        'clients_signal_below_27_count': onu_counts['signal_27_29'],
+        'clients_signal_below_29_count': onu_counts['signal_below_29'],
         'top_ports': top_ports,
         # Informações da OLT
         'system_info': system_info,
         'total_slots': total_slots,
         'operational_slots': operational_slots,
         'offline_slots': total_slots - operational_slots,
-        'critical_temps': critical_temps,
-        'warning_temps': warning_temps,
+        'critical_temps': stats['critical_temps'],
+        'warning_temps': stats['warning_temps'],
         'avg_temp': round(avg_temp, 1) if avg_temp else 0,
         'max_temp': max_temp or 0,
     }
@@ -265,14 +239,7 @@ def list_onus_without_mac(request):
     
     # Apply search if provided
     if search_query:
-        onus_without_mac = onus_without_mac.filter(
-            Q(pon__icontains=search_query) |
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |  # Include MAC address in search
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query) |
-            Q(oper_state__icontains=search_query)
-        )
+        onus_without_mac = search_onus(search_query, onus_without_mac, ranked=False, match_state=True)
     
     # Apply sorting
     onus_without_mac = onus_without_mac.order_by(sort_by)
@@ -306,14 +273,7 @@ def list_onus_without_client(request):
     
     # Apply search if provided
     if search_query:
-        onus_without_client = onus_without_client.filter(
-            Q(pon__icontains=search_query) |
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |  # Include MAC address in search
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query) |
-            Q(oper_state__icontains=search_query)
-        )
+        onus_without_client = search_onus(search_query, onus_without_client, ranked=False, match_state=True)
     
     # Apply sorting
     onus_without_client = onus_without_client.order_by(sort_by)
@@ -342,28 +302,11 @@ def get_duplicated(request):
     items_per_page = request.GET.get('per_page', 10)
     sort_by = request.GET.get('sort', 'serial')
     
-    # Get duplicated ONUs
-    duplicates = []
-    base_query = ONU.objects.all()
-    
+    # ONUs duplicadas em uma única consulta (GROUP BY serial HAVING COUNT > 1)
+    duplicates_queryset = get_duplicated_onus()
     if search_query:
-        base_query = base_query.filter(
-            Q(pon__icontains=search_query) |
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |  # Include MAC address in search
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query) |
-            Q(oper_state__icontains=search_query)
-        )
-    
-    # Find duplicates
-    for onu in base_query:
-        if ONU.objects.filter(serial=onu.serial).count() > 1 and onu not in duplicates:
-            duplicates.append(onu)
-    
-    # Convert list to queryset for proper sorting
-    duplicates_ids = [onu.id for onu in duplicates]
-    duplicates_queryset = ONU.objects.filter(id__in=duplicates_ids).order_by(sort_by)
+        duplicates_queryset = search_onus(search_query, duplicates_queryset, ranked=False, match_state=True)
+    duplicates_queryset = duplicates_queryset.order_by(sort_by)
     
     # Pagination
     paginator = Paginator(duplicates_queryset, items_per_page)
@@ -394,13 +337,7 @@ def list_onus(request):
     
     # Apply search filter
     if search_query:
-        queryset = queryset.filter(
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |  # Include MAC address in search
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query) |
-            Q(pon__icontains=search_query)
-        )
+        queryset = search_onus(search_query, queryset, ranked=False)
     
     # Apply sorting
     queryset = queryset.order_by(sort_by)
@@ -434,13 +371,7 @@ def list_onus_with_oper_state_down(request):
 
     # Apply search if provided
     if search_query:
-        onus_with_oper_state_down = onus_with_oper_state_down.filter(
-            Q(pon__icontains=search_query) |
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query)
-        )
+        onus_with_oper_state_down = search_onus(search_query, onus_with_oper_state_down, ranked=False)
 
     # Apply sorting
     onus_with_oper_state_down = onus_with_oper_state_down.order_by(sort_by)
@@ -471,12 +402,7 @@ def clients_signal_below_27(request):
     queryset = ONU.objects.filter(olt_rx_sig__lt=-27)
 
     if search_query:
-        queryset = queryset.filter(
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query)
-        )
+        queryset = search_onus(search_query, queryset, ranked=False)
 
     queryset = queryset.order_by(sort_by)
 
@@ -505,12 +431,7 @@ def clients_signal_below_29(request):
     queryset = ONU.objects.filter(olt_rx_sig__lt=-29)
 
     if search_query:
-        queryset = queryset.filter(
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query)
-        )
+        queryset = search_onus(search_query, queryset, ranked=False)
 
     queryset = queryset.order_by(sort_by)
 
@@ -542,12 +463,7 @@ def list_onus_signal_between_27_and_29(request):
 
     # Apply search filter
     if search_query:
-        queryset = queryset.filter(
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query)
-        )
+        queryset = search_onus(search_query, queryset, ranked=False)
 
     # Apply sorting
     queryset = queryset.order_by(sort_by)
@@ -582,12 +498,7 @@ def get_itens_to_port(request, slot, port):
     
     # Apply search filter if provided
     if search_query:
-        queryset = queryset.filter(
-            Q(serial__icontains=search_query) |
-            Q(mac__icontains=search_query) |  # Include MAC address in search
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query)
-        )
+        queryset = search_onus(search_query, queryset, ranked=False)
     
     # Pagination
     paginator = Paginator(queryset, items_per_page)
@@ -626,6 +537,8 @@ def delete(request, slot, port, position):
 
     # Remove a ONU correspondente do banco de dados
     ONU.objects.filter(pon=f"1/1/{slot}/{port}", position=position).delete()
+    refresh_rollups([f"1/1/{slot}/{port}"])
+    mark_ingest()
 
     return redirect('olt:list_onus')
 
@@ -652,13 +565,7 @@ def search_view(request):
     if not query:
         return redirect('olt:home')
     
-    results = ONU.objects.filter(
-        Q(serial__icontains=query) |
-        Q(mac__icontains=query) |  # Include MAC address in search
-        Q(desc1__icontains=query) |
-        Q(desc2__icontains=query) |
-        Q(pon__icontains=query)
-    )
+    results = search_onus(query)
     
     context = {
         'duplicates': results,
@@ -673,7 +580,8 @@ def search_ixc(request):
     """View para atualizar clientes fibra"""
     job = update_clientes_task.delay(
         user=request.user.username,
-        menu_item='Atualização de Clientes Fibra'
+        menu_item='Atualização de Clientes Fibra',
+        mode='full'
     )
     request.session['task_message'] = 'Atualização de clientes fibra iniciada. Acompanhe o progresso na lista de tarefas.'
     request.session['job_id'] = job.id
@@ -692,10 +600,7 @@ def listar_clientes(request):
     
     # Apply search filter
     if search_query:
-        queryset = queryset.filter(
-            Q(nome__icontains=search_query) |
-            Q(mac__icontains=search_query)  # Include MAC address in search
-        )
+        queryset = search_clientes(search_query, queryset, ranked=False)
     
     # Apply sorting
     queryset = queryset.order_by(sort_by)
@@ -857,12 +762,7 @@ def list_all_macs(request):
 
     # Apply search filter
     if search_query:
-        queryset = queryset.filter(
-            Q(mac__icontains=search_query) |
-            Q(serial__icontains=search_query) |
-            Q(desc1__icontains=search_query) |
-            Q(desc2__icontains=search_query)
-        )
+        queryset = search_onus(search_query, queryset, ranked=False)
 
     # Apply sorting
     queryset = queryset.order_by(sort_by)